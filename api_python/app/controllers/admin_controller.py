@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.user import User
+from app.schemas import IntegrityReport
+from app.services import IntegrityService
+from app.utils.security import get_current_admin_user
+
+router = APIRouter(prefix="/api/admin", tags=["Administração"])
+
+@router.get("/integrity", response_model=IntegrityReport)
+async def get_integrity_report(
+    db: AsyncSession = Depends(get_async_db),
+    admin_user: User = Depends(get_current_admin_user)
+):
+    """Relatorio de integridade: safras com area plantada acima da area agricultavel (apenas admin)"""
+    return await IntegrityService.report(db)
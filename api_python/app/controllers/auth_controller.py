@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import List
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas import UserCreate, UserUpdate, UserResponse, Token, UserLogin
 from app.utils.security import (
-    verify_password, 
-    get_password_hash, 
-    create_access_token,
+    verify_password_async,
+    get_password_hash_async,
+    create_user_token,
     get_current_user,
     get_current_admin_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
@@ -19,24 +20,24 @@ from app.utils.security import (
 router = APIRouter(prefix="/api/auth", tags=["Autenticação"])
 
 @router.post("/register", response_model=UserResponse, status_code=201)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Registra um novo usuário"""
     # Verifica se username ja existe
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User).where(User.username == user_data.username)):
         raise HTTPException(
             status_code=400,
             detail="Nome de usuário já existe"
         )
     
     # Verifica se email ja existe
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User).where(User.email == user_data.email)):
         raise HTTPException(
             status_code=400,
             detail="Email já cadastrado"
         )
     
     # Cria o usuario
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
@@ -44,23 +45,23 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     # Primeiro usuario vira admin
-    if db.query(User).count() == 0:
+    if await db.scalar(select(func.count(User.id))) == 0:
         user.is_admin = True
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login do usuário"""
     # Busca o usuario
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(select(User).where(User.username == form_data.username))
     
     # Verifica usuario e senha
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos",
@@ -76,22 +77,31 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     
     # Cria o token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, 
-        expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
     """Retorna informações do usuário atual"""
-    return current_user
+    # O usuario das claims nao tem email/datas: busca o registro completo pela chave primaria
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não foi possível validar as credenciais",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
 
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_user: User = Depends(get_current_admin_user)
 ):
     """Lista todos os usuários (apenas admin)"""
-    return db.query(User).all()
\ No newline at end of file
+    result = await db.execute(select(User))
+    return result.scalars().all()
\ No newline at end of file
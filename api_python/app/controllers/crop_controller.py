@@ -1,56 +1,54 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.crop import Crop
-from app.models.harvest import Harvest
 from app.schemas import CropCreate, CropResponse
+from app.services import RollupService, HarvestService
 from app.utils.security import get_current_user
+from app.utils.pagination import PageParams, paginate
+from app.utils.fast_json import FieldsParam, select_columns, rows_response, row_response
 
 router = APIRouter(prefix="/api/crops", tags=["Culturas"])
 
 @router.get("/", response_model=List[CropResponse])
 async def list_crops(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    fields: List[str] = Depends(FieldsParam(CropResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Lista todas as culturas"""
-    crops = db.query(Crop).offset(skip).limit(limit).all()
-    return crops
+    """Lista as culturas paginadas por cursor (proxima pagina no header X-Next-Cursor)"""
+    rows, next_cursor = await paginate(
+        db, select_columns(Crop, fields), Crop.id, page.after, page.limit, scalars=False
+    )
+    return rows_response(CropResponse, fields, rows, next_cursor)
 
 @router.get("/{crop_id}", response_model=CropResponse)
 async def get_crop(
     crop_id: int,
-    db: Session = Depends(get_db),
+    fields: List[str] = Depends(FieldsParam(CropResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obtém uma cultura específica"""
-    crop = db.query(Crop).filter(Crop.id == crop_id).first()
-    if not crop:
+    result = await db.execute(select_columns(Crop, fields).where(Crop.id == crop_id))
+    row = result.first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cultura não encontrada"
         )
-    return crop
+    return row_response(CropResponse, fields, row)
 
 @router.post("/", response_model=CropResponse, status_code=201)
 async def create_crop(
     crop_data: CropCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Cria uma nova cultura"""
-    # Verificar se a safra existe
-    harvest = db.query(Harvest).filter(Harvest.id == crop_data.harvest_id).first()
-    if not harvest:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Safra não encontrada"
-        )
-    
+    """Cria uma nova cultura (a area plantada da safra nao pode passar da area agricultavel da fazenda)"""
     # Validar área plantada
     if crop_data.planted_area <= 0:
         raise HTTPException(
@@ -58,46 +56,55 @@ async def create_crop(
             detail="Área plantada deve ser maior que zero"
         )
     
-    crop = Crop(**crop_data.dict())
-    db.add(crop)
-    db.commit()
-    db.refresh(crop)
-    return crop
+    try:
+        crops = await HarvestService.create_crops(db, crop_data.harvest_id, [crop_data])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if crops is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Safra não encontrada"
+        )
+    return crops[0]
 
 @router.delete("/{crop_id}", status_code=204)
 async def delete_crop(
     crop_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Deleta uma cultura"""
-    crop = db.query(Crop).filter(Crop.id == crop_id).first()
+    crop = await db.get(Crop, crop_id)
     if not crop:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cultura não encontrada"
         )
     
-    db.delete(crop)
-    db.commit()
+    await RollupService.crop_deleted(db, crop)
+    await HarvestService.subtract_planted_area(db, crop.harvest_id, crop.planted_area)
+    await db.delete(crop)
+    await db.commit()
     return None
 
 @router.get("/harvest/{harvest_id}", response_model=List[CropResponse])
 async def get_crops_by_harvest(
     harvest_id: int,
-    db: Session = Depends(get_db),
+    fields: List[str] = Depends(FieldsParam(CropResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista todas as culturas de uma safra específica"""
-    crops = db.query(Crop).filter(Crop.harvest_id == harvest_id).all()
-    return crops
+    result = await db.execute(select_columns(Crop, fields).where(Crop.harvest_id == harvest_id).order_by(Crop.id))
+    return rows_response(CropResponse, fields, result.all())
 
 @router.get("/type/{crop_type}", response_model=List[CropResponse])
 async def get_crops_by_type(
     crop_type: str,
-    db: Session = Depends(get_db),
+    fields: List[str] = Depends(FieldsParam(CropResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista todas as culturas de um tipo específico"""
-    crops = db.query(Crop).filter(Crop.crop_type == crop_type).all()
-    return crops
\ No newline at end of file
+    result = await db.execute(select_columns(Crop, fields).where(Crop.crop_type == crop_type).order_by(Crop.id))
+    return rows_response(CropResponse, fields, result.all())
@@ -1,29 +1,55 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database import get_db
-from app.schemas import DashboardSummary, StateDistribution, LandUseDistribution, CropDistribution
-from app.services import DashboardService
+from app.database import get_async_db
+from app.models.user import User
+from app.schemas import DashboardSummary, StateDistribution, LandUseDistribution, CropDistribution, DashboardOverview
+from app.services import DashboardCache
+from app.utils.etag import make_etag, not_modified, set_etag
+from app.utils.security import get_current_admin_user
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+async def _conditional(widget: str, loader, request: Request, response: Response, db: AsyncSession):
+    """
+    GET condicional: o ETag vem da versao dos rollups do widget, entao um
+    If-None-Match igual responde 304 sem ler os rollups nem o cache
+    """
+    versions = await DashboardCache.versions(db, widget)
+    etag = make_etag(widget, *versions)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    set_etag(response, etag)
+    return await loader(db, versions)
+
+@router.get("/overview", response_model=DashboardOverview)
+async def get_dashboard_overview(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Retorna resumo, estados, uso do solo e culturas em uma unica chamada"""
+    return await _conditional("overview", DashboardCache.get_overview, request, response, db)
+
 @router.get("/summary", response_model=DashboardSummary)
-def get_dashboard_summary(db: Session = Depends(get_db)):
+async def get_dashboard_summary(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Retorna o resumo do dashboard"""
-    return DashboardService.get_summary(db)
+    return await _conditional("summary", DashboardCache.get_summary, request, response, db)
 
 @router.get("/by-state", response_model=List[StateDistribution])
-def get_state_distribution(db: Session = Depends(get_db)):
+async def get_state_distribution(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Retorna a distribuicao de fazendas por estado"""
-    return DashboardService.get_state_distribution(db)
+    return await _conditional("by_state", DashboardCache.get_state_distribution, request, response, db)
 
 @router.get("/land-use", response_model=LandUseDistribution)
-def get_land_use_distribution(db: Session = Depends(get_db)):
+async def get_land_use_distribution(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Retorna a distribuicao de uso do solo"""
-    return DashboardService.get_land_use_distribution(db)
+    return await _conditional("land_use", DashboardCache.get_land_use_distribution, request, response, db)
 
 @router.get("/by-crop", response_model=List[CropDistribution])
-def get_crop_distribution(db: Session = Depends(get_db)):
+async def get_crop_distribution(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Retorna a distribuicao por tipo de cultura"""
-    return DashboardService.get_crop_distribution(db)
\ No newline at end of file
+    return await _conditional("by_crop", DashboardCache.get_crop_distribution, request, response, db)
+
+@router.get("/cache/stats")
+def get_cache_stats(admin_user: User = Depends(get_current_admin_user)):
+    """Retorna os contadores de hit/miss do cache do dashboard (apenas admin)"""
+    return DashboardCache.stats()
@@ -0,0 +1,89 @@
+from enum import Enum
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.crop import CropType
+from app.schemas import CropTypeEnum
+from app.services import ExportService
+from app.utils.security import get_current_user
+
+router = APIRouter(prefix="/api/export", tags=["Exportação"])
+
+class ExportEntity(str, Enum):
+    producers = "producers"
+    farms = "farms"
+    harvests = "harvests"
+    crops = "crops"
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    arrow = "arrow"
+    parquet = "parquet"
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+# Formatos tabulares (uma linha por registro)
+TABULAR_STREAMS = {
+    ExportFormat.csv: ExportService.stream_csv,
+    ExportFormat.ndjson: ExportService.stream_ndjson,
+    ExportFormat.arrow: ExportService.stream_arrow,
+    ExportFormat.parquet: ExportService.stream_parquet,
+}
+
+def _streaming_response(body, name: str, export_format: ExportFormat) -> StreamingResponse:
+    # A sessao da dependencia so e fechada depois que o corpo termina de ser enviado
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'}
+    )
+
+@router.get("/tree")
+async def export_tree(
+    format: ExportFormat = Query(ExportFormat.ndjson),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Exporta a arvore produtor -> fazenda -> safra -> cultura em uma unica consulta.
+    NDJSON: um produtor por linha com a subarvore aninhada. CSV, Arrow e Parquet: uma linha por folha.
+    """
+    if format == ExportFormat.ndjson:
+        body = ExportService.stream_tree_ndjson(db)
+    else:
+        body = TABULAR_STREAMS[format](db, ExportService.tree_statement())
+    return _streaming_response(body, "tree", format)
+
+@router.get("/{entity}")
+async def export_entity(
+    entity: ExportEntity,
+    format: ExportFormat = Query(ExportFormat.ndjson),
+    state: Optional[str] = Query(None, description="Estado da fazenda (farms, harvests, crops)"),
+    year: Optional[int] = Query(None, description="Ano da safra (harvests, crops)"),
+    crop_type: Optional[CropTypeEnum] = Query(None, description="Tipo de cultura (crops)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Exporta as linhas da entidade em streaming. Arrow (IPC stream) e Parquet
+    sao colunares, com um record batch / row group por bloco lido do banco.
+    """
+    try:
+        stmt = ExportService.entity_statement(
+            entity.value,
+            state=state,
+            year=year,
+            crop_type=CropType(crop_type.value) if crop_type else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _streaming_response(TABULAR_STREAMS[format](db, stmt), entity.value, format)
@@ -1,60 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 
-from app.database import get_db
-from app.schemas import FarmCreate, FarmUpdate, FarmResponse
-from app.services import FarmService
+from app.database import get_async_db
+from app.config import config
+from app.schemas import FarmCreate, FarmUpdate, FarmResponse, FarmFilters, FarmSort, HarvestBatchCreate, HarvestTree
+from app.services import FarmService, HarvestService
 from app.models.user import User
 from app.utils.security import get_current_user
+from app.utils.pagination import PageParams
+from app.utils.fast_json import FieldsParam, rows_response, row_response
+from app.utils.etag import make_etag, not_modified, set_etag
 
 router = APIRouter(prefix="/api/farms", tags=["Fazendas"])
 
 @router.get("/", response_model=List[FarmResponse])
-def list_farms(
-    producer_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+async def list_farms(
+    filters: FarmFilters = Depends(),
+    sort: FarmSort = Query(FarmSort.ID, description="Campo de ordenacao (- para decrescente)"),
+    page: PageParams = Depends(),
+    fields: List[str] = Depends(FieldsParam(FarmResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Lista todas as fazendas ou de um produtor especifico"""
-    if producer_id:
-        return FarmService.get_by_producer(db, producer_id)
-    return FarmService.get_all(db)
+    """Lista as fazendas filtradas e ordenadas, paginadas por cursor"""
+    # Tuplas so das colunas pedidas (orjson direto com FAST_JSON_RESPONSES)
+    try:
+        rows, next_cursor = await FarmService.get_all(
+            db, page.after, page.limit, columns=fields, filters=filters, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return rows_response(FarmResponse, fields, rows, next_cursor)
 
 @router.get("/{farm_id}", response_model=FarmResponse)
-def get_farm(
+async def get_farm(
     farm_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    fields: List[str] = Depends(FieldsParam(FarmResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Busca uma fazenda por ID"""
-    farm = FarmService.get_by_id(db, farm_id)
-    if not farm:
+    """Busca uma fazenda por ID (so os campos de ?fields=; ETag fraco pelo updated_at, 304 com If-None-Match)"""
+    if request.headers.get("if-none-match"):
+        # So o updated_at: se o cliente ja tem essa versao, nada e carregado nem serializado
+        updated_at = await FarmService.get_updated_at(db, farm_id)
+        if updated_at is not None:
+            cached = not_modified(request, make_etag("farm", farm_id, updated_at, *fields))
+            if cached is not None:
+                return cached
+
+    row = await FarmService.get_row(db, farm_id, fields)
+    if row is None:
         raise HTTPException(status_code=404, detail="Fazenda não encontrada")
-    return farm
+    response = row_response(FarmResponse, fields, row)
+    set_etag(response, make_etag("farm", farm_id, row.updated_at, *fields))
+    return response
 
 @router.post("/", response_model=FarmResponse, status_code=201)
-def create_farm(
+async def create_farm(
     farm_data: FarmCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cria uma nova fazenda"""
     try:
-        return FarmService.create(db, farm_data)
+        return await FarmService.create(db, farm_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/{farm_id}/harvests:batch", response_model=List[HarvestTree], status_code=201)
+async def create_harvests_batch(
+    farm_id: int,
+    batch: HarvestBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cria safras da fazenda com as culturas aninhadas em uma transacao (um INSERT por tabela)"""
+    items = len(batch.harvests) + sum(len(harvest.crops) for harvest in batch.harvests)
+    if items > config.BATCH_CREATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {config.BATCH_CREATE_MAX_ITEMS} safras e culturas por lote"
+        )
+    
+    try:
+        harvests = await HarvestService.create_harvests(db, farm_id, batch.harvests)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if harvests is None:
+        raise HTTPException(status_code=404, detail="Fazenda não encontrada")
+    return harvests
 
 @router.put("/{farm_id}", response_model=FarmResponse)
-def update_farm(
+async def update_farm(
     farm_id: int,
     farm_data: FarmUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Atualiza uma fazenda"""
     try:
-        farm = FarmService.update(db, farm_id, farm_data)
+        farm = await FarmService.update(db, farm_id, farm_data)
         if not farm:
             raise HTTPException(status_code=404, detail="Fazenda não encontrada")
         return farm
@@ -62,11 +109,11 @@ def update_farm(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{farm_id}", status_code=204)
-def delete_farm(
+async def delete_farm(
     farm_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Deleta uma fazenda"""
-    if not FarmService.delete(db, farm_id):
+    if not await FarmService.delete(db, farm_id):
         raise HTTPException(status_code=404, detail="Fazenda não encontrada")
\ No newline at end of file
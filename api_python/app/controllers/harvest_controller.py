@@ -1,50 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.harvest import Harvest
 from app.models.farm import Farm
-from app.schemas import HarvestCreate, HarvestResponse
+from app.config import config
+from app.schemas import HarvestCreate, HarvestResponse, CropBatchCreate, CropResponse
+from app.services import RollupService, HarvestService
 from app.utils.security import get_current_user
+from app.utils.pagination import PageParams, paginate
+from app.utils.fast_json import FieldsParam, select_columns, rows_response, row_response
 
 router = APIRouter(prefix="/api/harvests", tags=["Safras"])
 
 @router.get("/", response_model=List[HarvestResponse])
 async def list_harvests(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    fields: List[str] = Depends(FieldsParam(HarvestResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Lista todas as safras"""
-    harvests = db.query(Harvest).offset(skip).limit(limit).all()
-    return harvests
+    """Lista as safras paginadas por cursor (proxima pagina no header X-Next-Cursor)"""
+    rows, next_cursor = await paginate(
+        db, select_columns(Harvest, fields), Harvest.id, page.after, page.limit, scalars=False
+    )
+    return rows_response(HarvestResponse, fields, rows, next_cursor)
 
 @router.get("/{harvest_id}", response_model=HarvestResponse)
 async def get_harvest(
     harvest_id: int,
-    db: Session = Depends(get_db),
+    fields: List[str] = Depends(FieldsParam(HarvestResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obtém uma safra específica"""
-    harvest = db.query(Harvest).filter(Harvest.id == harvest_id).first()
-    if not harvest:
+    result = await db.execute(select_columns(Harvest, fields).where(Harvest.id == harvest_id))
+    row = result.first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Safra não encontrada"
         )
-    return harvest
+    return row_response(HarvestResponse, fields, row)
 
 @router.post("/", response_model=HarvestResponse, status_code=201)
 async def create_harvest(
     harvest_data: HarvestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Cria uma nova safra"""
     # Verificar se a fazenda existe
-    farm = db.query(Farm).filter(Farm.id == harvest_data.farm_id).first()
+    farm = await db.get(Farm, harvest_data.farm_id)
     if not farm:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,34 +61,61 @@ async def create_harvest(
     
     harvest = Harvest(**harvest_data.dict())
     db.add(harvest)
-    db.commit()
-    db.refresh(harvest)
+    await db.commit()
+    await db.refresh(harvest)
     return harvest
 
+@router.post("/{harvest_id}/crops:batch", response_model=List[CropResponse], status_code=201)
+async def create_crops_batch(
+    harvest_id: int,
+    batch: CropBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Cria varias culturas da safra em uma transacao (um INSERT multi-linha)"""
+    if len(batch.crops) > config.BATCH_CREATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {config.BATCH_CREATE_MAX_ITEMS} culturas por lote"
+        )
+    
+    try:
+        crops = await HarvestService.create_crops(db, harvest_id, batch.crops)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if crops is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Safra não encontrada"
+        )
+    return crops
+
 @router.delete("/{harvest_id}", status_code=204)
 async def delete_harvest(
     harvest_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Deleta uma safra"""
-    harvest = db.query(Harvest).filter(Harvest.id == harvest_id).first()
+    harvest = await db.get(Harvest, harvest_id)
     if not harvest:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Safra não encontrada"
         )
     
-    db.delete(harvest)
-    db.commit()
+    await RollupService.harvest_deleted(db, harvest.id)
+    await db.delete(harvest)
+    await db.commit()
     return None
 
 @router.get("/farm/{farm_id}", response_model=List[HarvestResponse])
 async def get_harvests_by_farm(
     farm_id: int,
-    db: Session = Depends(get_db),
+    fields: List[str] = Depends(FieldsParam(HarvestResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista todas as safras de uma fazenda específica"""
-    harvests = db.query(Harvest).filter(Harvest.farm_id == farm_id).all()
-    return harvests
\ No newline at end of file
+    result = await db.execute(select_columns(Harvest, fields).where(Harvest.farm_id == farm_id).order_by(Harvest.id))
+    return rows_response(HarvestResponse, fields, result.all())
@@ -1,57 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database import get_db
-from app.schemas import ProducerCreate, ProducerUpdate, ProducerResponse
+from app.database import get_async_db
+from app.schemas import ProducerCreate, ProducerUpdate, ProducerResponse, ProducerBulkError, ProducerBulkResult, ProducerTree
 from app.services import ProducerService
+from app.services.producer_service import MAX_TREE_DEPTH
 from app.models.user import User
 from app.utils.security import get_current_user
+from app.utils.pagination import PageParams
+from app.utils.bulk_import import parse_bulk_rows, UnsupportedBulkFormat
+from app.utils.fast_json import FieldsParam, rows_response, row_response
+from app.utils.etag import make_etag, not_modified, set_etag
+from app.config import config
 
 router = APIRouter(prefix="/api/producers", tags=["Produtores"])
 
 @router.get("/", response_model=List[ProducerResponse])
-def list_producers(
-    db: Session = Depends(get_db),
+async def list_producers(
+    page: PageParams = Depends(),
+    fields: List[str] = Depends(FieldsParam(ProducerResponse)),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Lista todos os produtores"""
-    return ProducerService.get_all(db)
+    """Lista os produtores paginados por cursor (proxima pagina no header X-Next-Cursor)"""
+    # Tuplas so das colunas pedidas (orjson direto com FAST_JSON_RESPONSES)
+    rows, next_cursor = await ProducerService.get_all(db, page.after, page.limit, columns=fields)
+    return rows_response(ProducerResponse, fields, rows, next_cursor)
 
-@router.get("/{producer_id}", response_model=ProducerResponse)
-def get_producer(
-    producer_id: int,
-    db: Session = Depends(get_db),
+@router.get("/by-document/{document:path}", response_model=ProducerResponse)
+async def get_producer_by_document(
+    document: str,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Busca um produtor por ID"""
-    producer = ProducerService.get_by_id(db, producer_id)
+    """Busca um produtor por CPF/CNPJ, com ou sem formatacao (indice unico dos digitos)"""
+    producer = await ProducerService.get_by_document(db, document)
     if not producer:
         raise HTTPException(status_code=404, detail="Produtor não encontrado")
     return producer
 
+@router.get("/{producer_id}", response_model=ProducerResponse)
+async def get_producer(
+    producer_id: int,
+    request: Request,
+    fields: List[str] = Depends(FieldsParam(ProducerResponse)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Busca um produtor por ID (so os campos de ?fields=; ETag fraco pelo updated_at, 304 com If-None-Match)"""
+    if request.headers.get("if-none-match"):
+        # So o updated_at: se o cliente ja tem essa versao, nada e carregado nem serializado
+        updated_at = await ProducerService.get_updated_at(db, producer_id)
+        if updated_at is not None:
+            cached = not_modified(request, make_etag("producer", producer_id, updated_at, *fields))
+            if cached is not None:
+                return cached
+
+    row = await ProducerService.get_row(db, producer_id, fields)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Produtor não encontrado")
+    response = row_response(ProducerResponse, fields, row)
+    set_etag(response, make_etag("producer", producer_id, row.updated_at, *fields))
+    return response
+
+@router.get("/{producer_id}/tree", response_model=ProducerTree, response_model_exclude_none=True)
+async def get_producer_tree(
+    producer_id: int,
+    depth: int = Query(MAX_TREE_DEPTH, ge=0, le=MAX_TREE_DEPTH, description="0 produtor, 1 fazendas, 2 safras, 3 culturas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Busca o produtor com fazendas, safras e culturas aninhadas em uma consulta por nivel"""
+    tree = await ProducerService.get_tree(db, producer_id, depth)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Produtor não encontrado")
+    return tree
+
 @router.post("/", response_model=ProducerResponse, status_code=201)
-def create_producer(
+async def create_producer(
     producer_data: ProducerCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cria um novo produtor"""
     try:
-        return ProducerService.create(db, producer_data)
+        return await ProducerService.create(db, producer_data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=ProducerBulkResult)
+async def bulk_create_producers(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Importa produtores em lote a partir de NDJSON (application/x-ndjson) ou
+    CSV (text/csv, cabecalho document,name). Retorna os erros por linha.
+    """
+    try:
+        rows, parse_errors = parse_bulk_rows(await request.body(), request.headers.get("content-type"))
+    except UnsupportedBulkFormat:
+        raise HTTPException(status_code=415, detail="Envie application/x-ndjson ou text/csv")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(rows) + len(parse_errors) > config.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {config.BULK_IMPORT_MAX_ROWS} linhas por importação"
+        )
+    
+    try:
+        result = await ProducerService.bulk_create(db, rows)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    result.received += len(parse_errors)
+    result.errors = sorted(
+        result.errors + [ProducerBulkError(line=line, error=error) for line, error in parse_errors],
+        key=lambda e: e.line
+    )
+    return result
+
 @router.put("/{producer_id}", response_model=ProducerResponse)
-def update_producer(
+async def update_producer(
     producer_id: int,
     producer_data: ProducerUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Atualiza um produtor"""
     try:
-        producer = ProducerService.update(db, producer_id, producer_data)
+        producer = await ProducerService.update(db, producer_id, producer_data)
         if not producer:
             raise HTTPException(status_code=404, detail="Produtor não encontrado")
         return producer
@@ -59,11 +141,11 @@ def update_producer(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{producer_id}", status_code=204)
-def delete_producer(
+async def delete_producer(
     producer_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Deleta um produtor"""
-    if not ProducerService.delete(db, producer_id):
+    if not await ProducerService.delete(db, producer_id):
         raise HTTPException(status_code=404, detail="Produtor não encontrado")
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.user import User
+from app.schemas import SearchResult
+from app.services import SearchService
+from app.utils.security import get_current_user
+
+router = APIRouter(prefix="/api/search", tags=["Busca"])
+
+@router.get("/", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=3, max_length=100, description="Trecho do nome do produtor ou do nome/cidade da fazenda"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Busca produtores e fazendas por nome parcial, ordenados por similaridade"""
+    return await SearchService.search(db, q.strip(), limit)
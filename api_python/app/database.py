@@ -1,14 +1,89 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import config
 
+def get_async_database_url(database_url: str) -> str:
+    """Converte a URL do banco para o driver async equivalente"""
+    scheme, _, rest = database_url.partition("://")
+    if scheme in ("postgresql", "postgres", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return database_url
+
+def get_engine_options(database_url: str) -> dict:
+    """Monta as opcoes de pool e timeout do engine a partir do Config"""
+    if database_url.startswith("sqlite"):
+        # SQLite nao tem servidor: mantem o pool padrao do dialeto
+        return {}
+    
+    options = {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+    
+    if config.DB_STATEMENT_TIMEOUT > 0:
+        if "+asyncpg" in database_url:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT}"
+            }
+    
+    return options
+
+def get_pool_status(bind: Engine) -> dict:
+    """Retorna as estatisticas de checkout do pool do engine"""
+    pool = bind.pool
+    status = {"pool_class": type(pool).__name__}
+    for stat in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, stat, None)
+        if callable(method):
+            status[stat] = method()
+    return status
+
+def enable_sqlite_foreign_keys(bind: Engine):
+    """
+    Liga PRAGMA foreign_keys em cada conexao SQLite (vem desligado por padrao),
+    para o ON DELETE CASCADE das FKs valer como no Postgres
+    """
+    if bind.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(bind, "connect")
+    def _set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Criar engine do banco
-engine = create_engine(config.DATABASE_URL)
+engine = create_engine(config.DATABASE_URL, **get_engine_options(config.DATABASE_URL))
+enable_sqlite_foreign_keys(engine)
+
+# Criar engine async (asyncpg no Postgres, aiosqlite no SQLite)
+ASYNC_DATABASE_URL = config.ASYNC_DATABASE_URL or get_async_database_url(config.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL))
+enable_sqlite_foreign_keys(async_engine.sync_engine)
 
 # Criar sessao
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Criar sessao async
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para os modelos
 Base = declarative_base()
 
@@ -18,4 +93,16 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Funcao para pegar a sessao async do banco
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Engines como dependencia (health check), substituiveis nos testes
+def get_engine() -> Engine:
+    return engine
+
+def get_async_engine() -> AsyncEngine:
+    return async_engine
@@ -1,62 +1,166 @@
 """
 Script de inicializacao do banco de dados
-Cria um usuario admin padrao se nao existir
+Aplica as migracoes, cria o usuario admin padrao e carrega os dados de exemplo.
+Roda como comando explicito, fora do boot da API:
+
+    python -m app.init_db migrate        # alembic upgrade head
+    python -m app.init_db create-admin   # admin padrao, se nao houver usuarios
+    python -m app.init_db seed [--reset] # dados de exemplo
+    python -m app.init_db init           # os tres acima (seed so em banco vazio)
 """
-from sqlalchemy.orm import Session
-from app.database import engine, Base
-from app.models.user import User
-from app.utils.security import get_password_hash
+import argparse
 import time
+from pathlib import Path
+from typing import Optional
 
-def init_database():
-    """Inicializa o banco e cria usuario admin padrao"""
-    # Aguarda o banco estar pronto
-    max_tries = 5
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import engine, Base, SessionLocal
+from app.models import User, Producer
+from app.utils.security import get_password_hash
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Revisao equivalente ao schema antigo criado por create_all
+BASELINE_REVISION = "0001"
+
+def get_alembic_config(url: Optional[str] = None) -> Config:
+    """Configuracao do Alembic (a URL padrao vem da DATABASE_URL)"""
+    alembic_config = Config(str(ALEMBIC_INI))
+    if url:
+        alembic_config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return alembic_config
+
+def get_head_revision() -> str:
+    """Ultima revisao disponivel nos arquivos de migracao"""
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+def get_current_revision(connection) -> Optional[str]:
+    """Revisao gravada no banco (None se nunca migrado)"""
+    return MigrationContext.configure(connection).get_current_revision()
+
+async def check_schema_version(bind: AsyncEngine) -> str:
+    """
+    Confere se o banco esta na ultima revisao. E a unica verificacao feita
+    no startup da API: uma consulta, sem criar tabelas nem carregar dados.
+    """
+    head = get_head_revision()
+    async with bind.connect() as conn:
+        current = await conn.run_sync(get_current_revision)
+
+    if current != head:
+        raise RuntimeError(
+            f"Banco na revisao {current}, esperada {head}. "
+            f"Execute: python -m app.init_db migrate"
+        )
+    return current
+
+def wait_for_database(max_tries: int = 5, delay: float = 5):
+    """Aguarda o banco aceitar conexoes"""
     for i in range(max_tries):
         try:
-            # Criar todas as tabelas
-            Base.metadata.create_all(bind=engine)
-            
-            # Criar sessao
-            from app.database import SessionLocal
-            db = SessionLocal()
-            
-            # Verificar se ja existe algum usuario
-            existing_users = db.query(User).count()
-            
-            if existing_users == 0:
-                # Criar usuario admin padrao
-                admin_user = User(
-                    username="admin",
-                    email="admin@brazilagro.com",
-                    hashed_password=get_password_hash("admin123"),
-                    is_active=True,
-                    is_admin=True
-                )
-                
-                db.add(admin_user)
-                db.commit()
-                print("Usuario admin criado com sucesso!")
-                print("Username: admin")
-                print("Password: admin123")
-            else:
-                print(f"Banco ja inicializado com {existing_users} usuarios")
-            
-            db.close()
-            
-            # Carregar dados de exemplo
-            from app.seed_data import seed_sample_data
-            seed_sample_data()
-            
-            break
-            
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
         except Exception as e:
             if i < max_tries - 1:
                 print(f"Aguardando banco de dados... tentativa {i+1}/{max_tries}")
-                time.sleep(5)
+                time.sleep(delay)
             else:
-                print(f"Erro ao inicializar banco: {e}")
+                print(f"Erro ao conectar no banco: {e}")
                 raise
 
+def migrate():
+    """Aplica as migracoes pendentes"""
+    alembic_config = get_alembic_config()
+
+    with engine.connect() as conn:
+        tables = inspect(conn).get_table_names()
+        legacy = "alembic_version" not in tables and "producers" in tables
+        up_to_date = legacy and not compare_metadata(MigrationContext.configure(conn), Base.metadata)
+
+    # Banco criado por create_all: marca a revisao correspondente antes do upgrade
+    if legacy:
+        command.stamp(alembic_config, "head" if up_to_date else BASELINE_REVISION)
+        print("Banco existente marcado nas migracoes")
+
+    command.upgrade(alembic_config, "head")
+
+def create_admin_user():
+    """Cria o usuario admin padrao se nao existir nenhum usuario"""
+    db = SessionLocal()
+    try:
+        existing_users = db.query(User).count()
+
+        if existing_users == 0:
+            admin_user = User(
+                username="admin",
+                email="admin@brazilagro.com",
+                hashed_password=get_password_hash("admin123"),
+                is_active=True,
+                is_admin=True
+            )
+
+            db.add(admin_user)
+            db.commit()
+            print("Usuario admin criado com sucesso!")
+            print("Username: admin")
+            print("Password: admin123")
+        else:
+            print(f"Banco ja inicializado com {existing_users} usuarios")
+    finally:
+        db.close()
+
+def seed(reset: bool = False):
+    """Carrega os dados de exemplo; sem reset, so em banco sem produtores"""
+    from app.seed_data import seed_sample_data
+
+    db = SessionLocal()
+    try:
+        existing_producers = db.query(Producer).count()
+    finally:
+        db.close()
+
+    if existing_producers and not reset:
+        print(f"Banco ja possui {existing_producers} produtores, dados de exemplo nao carregados (use --reset)")
+        return
+
+    seed_sample_data()
+
+def init_database():
+    """Migra o banco, cria o admin padrao e carrega os dados de exemplo em banco vazio"""
+    wait_for_database()
+    migrate()
+    create_admin_user()
+    seed()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inicializacao do banco de dados")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate", help="Aplica as migracoes (alembic upgrade head)")
+    subparsers.add_parser("create-admin", help="Cria o usuario admin padrao")
+    seed_parser = subparsers.add_parser("seed", help="Carrega os dados de exemplo")
+    seed_parser.add_argument("--reset", action="store_true", help="Apaga os dados existentes antes de carregar")
+    subparsers.add_parser("init", help="migrate + create-admin + seed")
+    args = parser.parse_args(argv)
+
+    if args.command == "init":
+        init_database()
+        return
+
+    wait_for_database()
+    if args.command == "migrate":
+        migrate()
+    elif args.command == "create-admin":
+        create_admin_user()
+    elif args.command == "seed":
+        seed(reset=args.reset)
+
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    main()
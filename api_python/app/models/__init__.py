@@ -3,5 +3,6 @@ from .farm import Farm
 from .harvest import Harvest
 from .crop import Crop
 from .user import User
+from .rollup import StateRollup, CropRollup, TableVersion
 
-__all__ = ["Producer", "Farm", "Harvest", "Crop", "User"]
\ No newline at end of file
+__all__ = ["Producer", "Farm", "Harvest", "Crop", "User", "StateRollup", "CropRollup", "TableVersion"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Enum, Integer
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Enum, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -15,10 +15,15 @@ class Crop(Base):
     __tablename__ = "crops"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    harvest_id = Column(Integer, ForeignKey("harvests.id"), nullable=False)
+    harvest_id = Column(Integer, ForeignKey("harvests.id", ondelete="CASCADE"), nullable=False, index=True)
     crop_type = Column(Enum(CropType), nullable=False)
     planted_area = Column(Float, nullable=False)  # em hectares
     created_at = Column(DateTime, default=datetime.now)
     
+    # (crop_type, planted_area) atende filtros por tipo e a soma de area por tipo so pelo indice
+    __table_args__ = (
+        Index("ix_crops_crop_type_planted_area", "crop_type", "planted_area"),
+    )
+    
     # Relacionamentos
     harvest = relationship("Harvest", back_populates="crops")
\ No newline at end of file
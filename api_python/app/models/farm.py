@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -7,16 +7,25 @@ class Farm(Base):
     __tablename__ = "farms"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    producer_id = Column(Integer, ForeignKey("producers.id"), nullable=False)
+    producer_id = Column(Integer, ForeignKey("producers.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String, nullable=False)
-    city = Column(String, nullable=False)
+    city = Column(String, nullable=False, index=True)
     state = Column(String, nullable=False)
     total_area = Column(Float, nullable=False)  # em hectares
     agricultural_area = Column(Float, nullable=False)
     vegetation_area = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=datetime.now, index=True)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
+    # (state, total_area) atende filtros por estado e os agregados por estado so pelo indice;
+    # (name, id) e (total_area, id) atendem a ordenacao com cursor da listagem
+    __table_args__ = (
+        Index("ix_farms_state_total_area", "state", "total_area"),
+        Index("ix_farms_name_id", "name", "id"),
+        Index("ix_farms_total_area_id", "total_area", "id"),
+    )
+    
     # Relacionamentos
     producer = relationship("Producer", back_populates="farms")
-    harvests = relationship("Harvest", back_populates="farm", cascade="all, delete-orphan")
\ No newline at end of file
+    harvests = relationship("Harvest", back_populates="farm", cascade="all, delete-orphan",
+                            passive_deletes=True, order_by="Harvest.id")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -7,11 +7,15 @@ class Harvest(Base):
     __tablename__ = "harvests"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    farm_id = Column(Integer, ForeignKey("farms.id"), nullable=False)
-    year = Column(Integer, nullable=False)
+    farm_id = Column(Integer, ForeignKey("farms.id", ondelete="CASCADE"), nullable=False, index=True)
+    year = Column(Integer, nullable=False, index=True)
     description = Column(String, nullable=False)  # Ex: "Safra 2024"
+    # Soma do planted_area das culturas, mantida na escrita (HarvestService); limitada a
+    # agricultural_area da fazenda sem precisar somar as culturas a cada INSERT
+    planted_area = Column(Float, nullable=False, default=0.0, server_default="0")
     created_at = Column(DateTime, default=datetime.now)
     
     # Relacionamentos
     farm = relationship("Farm", back_populates="harvests")
-    crops = relationship("Crop", back_populates="harvest", cascade="all, delete-orphan")
\ No newline at end of file
+    crops = relationship("Crop", back_populates="harvest", cascade="all, delete-orphan",
+                         passive_deletes=True, order_by="Crop.id")
\ No newline at end of file
@@ -1,16 +1,32 @@
 from sqlalchemy import Column, String, DateTime, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from app.database import Base
+from app.utils import normalize_document
+
+def _document_digits(context) -> str:
+    """Default de document_digits nos INSERTs do core (insert(Producer) em lote)"""
+    return normalize_document(context.get_current_parameters()["document"])
 
 class Producer(Base):
     __tablename__ = "producers"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     document = Column(String, nullable=False, unique=True)  # CPF ou CNPJ
+    # So os digitos do documento, calculado na escrita; a busca e os duplicados usam este indice
+    document_digits = Column(String, nullable=False, unique=True, index=True, default=_document_digits,
+                             info={"export": False})
     name = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
-    # Relacionamento com fazendas
-    farms = relationship("Farm", back_populates="producer", cascade="all, delete-orphan")
\ No newline at end of file
+    # Relacionamento com fazendas. passive_deletes: o ON DELETE CASCADE do banco remove
+    # fazendas, safras e culturas, sem carregar a subarvore no Python
+    farms = relationship("Farm", back_populates="producer", cascade="all, delete-orphan",
+                         passive_deletes=True, order_by="Farm.id")
+
+    @validates("document")
+    def _normalize_document(self, key, document):
+        """Mantem document_digits em dia quando o documento e atribuido pelo ORM"""
+        self.document_digits = normalize_document(document)
+        return document
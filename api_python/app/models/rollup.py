@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Float, Integer, Enum
+from app.database import Base
+from app.models.crop import CropType
+
+class StateRollup(Base):
+    """Totais de fazendas por estado, mantidos a cada escrita"""
+    __tablename__ = "state_rollups"
+    
+    state = Column(String, primary_key=True)
+    farm_count = Column(Integer, nullable=False, default=0)
+    total_area = Column(Float, nullable=False, default=0.0)
+    agricultural_area = Column(Float, nullable=False, default=0.0)
+    vegetation_area = Column(Float, nullable=False, default=0.0)
+
+class CropRollup(Base):
+    """Area plantada por tipo de cultura, mantida a cada escrita"""
+    __tablename__ = "crop_rollups"
+    
+    crop_type = Column(Enum(CropType), primary_key=True)
+    crop_count = Column(Integer, nullable=False, default=0)
+    total_area = Column(Float, nullable=False, default=0.0)
+
+class TableVersion(Base):
+    """Contador de versao por tabela de rollup, incrementado na mesma transacao da escrita"""
+    __tablename__ = "table_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -31,6 +31,16 @@ class ProducerResponse(ProducerBase):
     class Config:
         from_attributes = True
 
+class ProducerBulkError(BaseModel):
+    line: int
+    document: Optional[str] = None
+    error: str
+
+class ProducerBulkResult(BaseModel):
+    received: int
+    created: int
+    errors: List[ProducerBulkError]
+
 # Schemas da Fazenda
 class FarmBase(BaseModel):
     name: str
@@ -51,6 +61,24 @@ class FarmUpdate(BaseModel):
     agricultural_area: Optional[float] = Field(None, ge=0)
     vegetation_area: Optional[float] = Field(None, ge=0)
 
+class FarmSort(str, Enum):
+    """Ordenacao da listagem de fazendas ("-" = decrescente); o id desempata"""
+    ID = "id"
+    ID_DESC = "-id"
+    NAME = "name"
+    NAME_DESC = "-name"
+    TOTAL_AREA = "total_area"
+    TOTAL_AREA_DESC = "-total_area"
+
+class FarmFilters(BaseModel):
+    """Filtros da listagem de fazendas (query string), combinados com AND"""
+    producer_id: Optional[int] = None
+    state: Optional[str] = None
+    city: Optional[str] = None
+    min_total_area: Optional[float] = None
+    max_total_area: Optional[float] = None
+    created_after: Optional[datetime] = None
+
 class FarmResponse(FarmBase):
     id: int
     producer_id: int
@@ -71,6 +99,7 @@ class HarvestCreate(HarvestBase):
 class HarvestResponse(HarvestBase):
     id: int
     farm_id: int
+    planted_area: float  # soma das culturas
     created_at: datetime
     
     class Config:
@@ -92,6 +121,47 @@ class CropResponse(CropBase):
     class Config:
         from_attributes = True
 
+# Criacao em lote: a safra/fazenda vem no caminho, os filhos no corpo
+class CropBatchCreate(BaseModel):
+    crops: List[CropBase] = Field(min_length=1)
+
+class HarvestBatchItem(HarvestBase):
+    crops: List[CropBase] = []
+
+class HarvestBatchCreate(BaseModel):
+    harvests: List[HarvestBatchItem] = Field(min_length=1)
+
+# Relatorio de integridade (admin)
+class PlantedAreaViolation(BaseModel):
+    harvest_id: int
+    farm_id: int
+    year: int
+    agricultural_area: float
+    planted_area: float  # soma das culturas da safra
+    excess: float
+
+class IntegrityReport(BaseModel):
+    planted_area_violations: List[PlantedAreaViolation]
+
+# Arvore do produtor: os niveis abaixo do depth pedido ficam de fora (None)
+class HarvestTree(HarvestResponse):
+    crops: Optional[List[CropResponse]] = None
+
+class FarmTree(FarmResponse):
+    harvests: Optional[List[HarvestTree]] = None
+
+class ProducerTree(ProducerResponse):
+    farms: Optional[List[FarmTree]] = None
+
+# Schemas da Busca
+class SearchResult(BaseModel):
+    type: str  # producer ou farm
+    id: int
+    name: str
+    city: Optional[str] = None
+    state: Optional[str] = None
+    score: float
+
 # Schemas do Dashboard
 class DashboardSummary(BaseModel):
     total_farms: int
@@ -113,6 +183,12 @@ class LandUseDistribution(BaseModel):
     agricultural_percentage: float
     vegetation_percentage: float
 
+class DashboardOverview(BaseModel):
+    summary: DashboardSummary
+    by_state: List[StateDistribution]
+    land_use: LandUseDistribution
+    by_crop: List[CropDistribution]
+
 # Schemas de Autenticação e Usuário
 class UserBase(BaseModel):
     username: str
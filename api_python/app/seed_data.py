@@ -6,6 +6,8 @@ from app.database import SessionLocal, engine, Base
 from app.models import Producer, Farm, Harvest, Crop
 from app.models.crop import CropType
 from app.utils.validators import validate_document
+from app.services.rollup_service import RollupService
+from app.services.harvest_service import HarvestService
 from datetime import datetime
 
 def reset_database():
@@ -23,6 +25,7 @@ def reset_data_tables():
         db.query(Harvest).delete()
         db.query(Farm).delete()
         db.query(Producer).delete()
+        RollupService.rebuild(db)
         db.commit()
         print("Tabelas de dados limpas")
     finally:
@@ -309,6 +312,11 @@ def seed_sample_data():
             crop = Crop(**crop_data)
             db.add(crop)
         
+        db.flush()
+        
+        # Recalcula os rollups do dashboard e a area plantada das safras com a carga inteira
+        RollupService.rebuild(db)
+        HarvestService.rebuild_planted_area(db)
         db.commit()
         
         # Estatísticas finais
@@ -1,5 +1,11 @@
 from .producer_service import ProducerService
 from .farm_service import FarmService
+from .harvest_service import HarvestService
 from .dashboard_service import DashboardService
+from .rollup_service import RollupService
+from .dashboard_cache import DashboardCache
+from .export_service import ExportService
+from .search_service import SearchService
+from .integrity_service import IntegrityService
 
-__all__ = ["ProducerService", "FarmService", "DashboardService"]
\ No newline at end of file
+__all__ = ["ProducerService", "FarmService", "HarvestService", "DashboardService", "RollupService", "DashboardCache", "ExportService", "SearchService", "IntegrityService"]
\ No newline at end of file
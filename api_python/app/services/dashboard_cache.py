@@ -0,0 +1,52 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.schemas import DashboardSummary, StateDistribution, LandUseDistribution, CropDistribution, DashboardOverview
+from app.services.dashboard_service import DashboardService
+from app.services.rollup_service import RollupService
+from app.utils.cache import TTLCache
+from typing import List, Tuple
+
+# Cache por processo, com a versao das tabelas de rollup na chave: uma escrita
+# em qualquer worker muda a versao e a chave antiga deixa de ser usada
+dashboard_cache = TTLCache(maxsize=config.DASHBOARD_CACHE_MAXSIZE, ttl=config.DASHBOARD_CACHE_TTL)
+
+class DashboardCache:
+    """Camada de cache em volta do DashboardService, chaveada pela versao dos rollups"""
+
+    # Tabelas de rollup lidas por cada widget
+    TABLES = {
+        "summary": (RollupService.STATE_TABLE,),
+        "by_state": (RollupService.STATE_TABLE,),
+        "land_use": (RollupService.STATE_TABLE,),
+        "by_crop": (RollupService.CROP_TABLE,),
+        "overview": (RollupService.STATE_TABLE, RollupService.CROP_TABLE),
+    }
+
+    @staticmethod
+    async def versions(db: AsyncSession, widget: str) -> Tuple[int, ...]:
+        """Versao atual dos rollups do widget (uma consulta na tabela table_versions)"""
+        return await RollupService.versions(db, *DashboardCache.TABLES[widget])
+
+    @staticmethod
+    async def get_summary(db: AsyncSession, versions: Tuple[int, ...]) -> DashboardSummary:
+        return await dashboard_cache.get_or_load(("summary", versions), lambda: DashboardService.get_summary(db))
+
+    @staticmethod
+    async def get_state_distribution(db: AsyncSession, versions: Tuple[int, ...]) -> List[StateDistribution]:
+        return await dashboard_cache.get_or_load(("by_state", versions), lambda: DashboardService.get_state_distribution(db))
+
+    @staticmethod
+    async def get_land_use_distribution(db: AsyncSession, versions: Tuple[int, ...]) -> LandUseDistribution:
+        return await dashboard_cache.get_or_load(("land_use", versions), lambda: DashboardService.get_land_use_distribution(db))
+
+    @staticmethod
+    async def get_crop_distribution(db: AsyncSession, versions: Tuple[int, ...]) -> List[CropDistribution]:
+        return await dashboard_cache.get_or_load(("by_crop", versions), lambda: DashboardService.get_crop_distribution(db))
+
+    @staticmethod
+    async def get_overview(db: AsyncSession, versions: Tuple[int, ...]) -> DashboardOverview:
+        return await dashboard_cache.get_or_load(("overview", versions), lambda: DashboardService.get_overview(db))
+
+    @staticmethod
+    def stats() -> dict:
+        return dashboard_cache.stats()
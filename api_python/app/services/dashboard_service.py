@@ -1,33 +1,17 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models import Farm, Crop
-from app.schemas import DashboardSummary, StateDistribution, LandUseDistribution, CropDistribution
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import StateRollup, CropRollup
+from app.schemas import DashboardSummary, StateDistribution, LandUseDistribution, CropDistribution, DashboardOverview
 from typing import List
 
 class DashboardService:
-    
-    @staticmethod
-    def get_summary(db: Session) -> DashboardSummary:
-        """Retorna o resumo do dashboard"""
-        total_farms = db.query(Farm).count()
-        total_area = db.query(func.sum(Farm.total_area)).scalar() or 0.0
-        
-        return DashboardSummary(
-            total_farms=total_farms,
-            total_area=total_area
-        )
-    
+    """Le os totais das tabelas de rollup (O(estados + culturas)), mantidas pelo RollupService"""
+
     @staticmethod
-    def get_state_distribution(db: Session) -> List[StateDistribution]:
-        """Retorna a distribuicao por estado"""
-        # Busca quantidade por estado
-        states = db.query(
-            Farm.state,
-            func.count(Farm.id).label('count')
-        ).group_by(Farm.state).all()
-        
+    def _build_state_distribution(states) -> List[StateDistribution]:
+        """Monta a distribuicao por estado a partir das linhas (state, count)"""
         total = sum(s.count for s in states)
-        
+
         result = []
         for state in states:
             percentage = (state.count / total * 100) if total > 0 else 0
@@ -36,35 +20,26 @@ class DashboardService:
                 count=state.count,
                 percentage=percentage
             ))
-        
+
         return result
-    
+
     @staticmethod
-    def get_land_use_distribution(db: Session) -> LandUseDistribution:
-        """Retorna a distribuicao de uso do solo"""
-        agricultural_area = db.query(func.sum(Farm.agricultural_area)).scalar() or 0.0
-        vegetation_area = db.query(func.sum(Farm.vegetation_area)).scalar() or 0.0
-        
+    def _build_land_use(agricultural_area: float, vegetation_area: float) -> LandUseDistribution:
+        """Monta a distribuicao de uso do solo a partir dos totais"""
         total = agricultural_area + vegetation_area
-        
+
         return LandUseDistribution(
             agricultural_area=agricultural_area,
             vegetation_area=vegetation_area,
             agricultural_percentage=(agricultural_area / total * 100) if total > 0 else 0,
             vegetation_percentage=(vegetation_area / total * 100) if total > 0 else 0
         )
-    
+
     @staticmethod
-    def get_crop_distribution(db: Session) -> List[CropDistribution]:
-        """Retorna a distribuicao por cultura"""
-        # Busca area total por tipo de cultura
-        crops = db.query(
-            Crop.crop_type,
-            func.sum(Crop.planted_area).label('total_area')
-        ).group_by(Crop.crop_type).all()
-        
+    def _build_crop_distribution(crops) -> List[CropDistribution]:
+        """Monta a distribuicao por cultura a partir das linhas (crop_type, total_area)"""
         total = sum(c.total_area for c in crops) if crops else 0
-        
+
         result = []
         for crop in crops:
             percentage = (crop.total_area / total * 100) if total > 0 else 0
@@ -73,5 +48,97 @@ class DashboardService:
                 total_area=crop.total_area,
                 percentage=percentage
             ))
-        
-        return result
\ No newline at end of file
+
+        return result
+
+    @staticmethod
+    async def get_summary(db: AsyncSession) -> DashboardSummary:
+        """Retorna o resumo do dashboard"""
+        totals = (await db.execute(
+            select(
+                func.sum(StateRollup.farm_count).label('total_farms'),
+                func.sum(StateRollup.total_area).label('total_area')
+            )
+        )).one()
+        total_farms = totals.total_farms or 0
+        total_area = totals.total_area or 0.0
+
+        return DashboardSummary(
+            total_farms=total_farms,
+            total_area=total_area
+        )
+
+    @staticmethod
+    async def get_state_distribution(db: AsyncSession) -> List[StateDistribution]:
+        """Retorna a distribuicao por estado"""
+        # Le a quantidade por estado do rollup
+        states = (await db.execute(
+            select(
+                StateRollup.state,
+                StateRollup.farm_count.label('count')
+            ).order_by(StateRollup.state)
+        )).all()
+
+        return DashboardService._build_state_distribution(states)
+
+    @staticmethod
+    async def get_land_use_distribution(db: AsyncSession) -> LandUseDistribution:
+        """Retorna a distribuicao de uso do solo"""
+        totals = (await db.execute(
+            select(
+                func.sum(StateRollup.agricultural_area).label('agricultural_area'),
+                func.sum(StateRollup.vegetation_area).label('vegetation_area')
+            )
+        )).one()
+
+        return DashboardService._build_land_use(
+            totals.agricultural_area or 0.0,
+            totals.vegetation_area or 0.0
+        )
+
+    @staticmethod
+    async def get_crop_distribution(db: AsyncSession) -> List[CropDistribution]:
+        """Retorna a distribuicao por cultura"""
+        # Le a area total por tipo de cultura do rollup
+        crops = (await db.execute(
+            select(
+                CropRollup.crop_type,
+                CropRollup.total_area
+            ).order_by(CropRollup.crop_type)
+        )).all()
+
+        return DashboardService._build_crop_distribution(crops)
+
+    @staticmethod
+    async def get_overview(db: AsyncSession) -> DashboardOverview:
+        """Retorna os quatro widgets do dashboard com uma consulta por tabela de rollup"""
+        # Uma leitura do rollup por estado alimenta resumo, estados e uso do solo
+        states = (await db.execute(
+            select(
+                StateRollup.state,
+                StateRollup.farm_count.label('count'),
+                StateRollup.total_area,
+                StateRollup.agricultural_area,
+                StateRollup.vegetation_area
+            ).order_by(StateRollup.state)
+        )).all()
+
+        crops = (await db.execute(
+            select(
+                CropRollup.crop_type,
+                CropRollup.total_area
+            ).order_by(CropRollup.crop_type)
+        )).all()
+
+        return DashboardOverview(
+            summary=DashboardSummary(
+                total_farms=sum(s.count for s in states),
+                total_area=sum(s.total_area for s in states) if states else 0.0
+            ),
+            by_state=DashboardService._build_state_distribution(states),
+            land_use=DashboardService._build_land_use(
+                sum(s.agricultural_area for s in states) if states else 0.0,
+                sum(s.vegetation_area for s in states) if states else 0.0
+            ),
+            by_crop=DashboardService._build_crop_distribution(crops)
+        )
@@ -0,0 +1,260 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select, Integer, Float, DateTime, Boolean, Enum as SqlEnum
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+from app.models import Producer, Farm, Harvest, Crop
+from app.models.crop import CropType
+
+# Entidades exportaveis (colunas da tabela, em ordem de id). Colunas internas
+# com info={"export": False} (ex.: producers.document_digits) ficam de fora
+EXPORT_MODELS = {
+    "producers": Producer,
+    "farms": Farm,
+    "harvests": Harvest,
+    "crops": Crop,
+}
+
+# Colunas da arvore achatada: produtor -> fazenda -> safra -> cultura
+TREE_LEVELS = (
+    ("producer", Producer, ("id", "document", "name")),
+    ("farm", Farm, ("id", "name", "city", "state", "total_area", "agricultural_area", "vegetation_area")),
+    ("harvest", Harvest, ("id", "year", "description")),
+    ("crop", Crop, ("id", "crop_type", "planted_area")),
+)
+
+class _ChunkSink:
+    """Arquivo em memoria que entrega e descarta o que ja foi escrito (para o streaming do Arrow/Parquet)"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _arrow_type(column_type) -> pa.DataType:
+    if isinstance(column_type, SqlEnum):
+        return pa.string()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+def _arrow_schema(stmt) -> pa.Schema:
+    return pa.schema([pa.field(column.name, _arrow_type(column.type)) for column in stmt.selected_columns])
+
+def _record_batch(schema: pa.Schema, rows) -> pa.RecordBatch:
+    """Converte as linhas de um bloco em colunas do Arrow"""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_string(field.type):
+            values = [_json_value(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        [_json_value(value) for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+def _ndjson_chunk(columns: List[str], rows) -> str:
+    return "".join(
+        json.dumps({column: _json_value(value) for column, value in zip(columns, row)}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+class ExportService:
+    """
+    Exportacao completa em streaming: as linhas vem do banco em blocos
+    (yield_per, cursor no servidor no Postgres) e cada bloco e serializado
+    e enviado antes do proximo ser lido, com memoria constante.
+    """
+
+    @staticmethod
+    def entity_statement(
+        entity: str,
+        state: Optional[str] = None,
+        year: Optional[int] = None,
+        crop_type: Optional[CropType] = None
+    ):
+        """
+        Consulta das colunas da entidade ordenada por id, com filtros opcionais.
+        Levanta ValueError para filtros que nao se aplicam a entidade.
+        """
+        model = EXPORT_MODELS[entity]
+        columns = [column for column in model.__table__.columns if column.info.get("export", True)]
+        stmt = select(*columns).order_by(model.id)
+
+        if state is not None:
+            if model is Producer:
+                raise ValueError("Filtro state não se aplica a producers")
+            if model is Crop:
+                stmt = stmt.join(Harvest, Harvest.id == Crop.harvest_id)
+            if model in (Harvest, Crop):
+                stmt = stmt.join(Farm, Farm.id == Harvest.farm_id)
+            stmt = stmt.where(Farm.state == state)
+
+        if year is not None:
+            if model not in (Harvest, Crop):
+                raise ValueError(f"Filtro year não se aplica a {entity}")
+            if model is Crop and state is None:
+                stmt = stmt.join(Harvest, Harvest.id == Crop.harvest_id)
+            stmt = stmt.where(Harvest.year == year)
+
+        if crop_type is not None:
+            if model is not Crop:
+                raise ValueError(f"Filtro crop_type não se aplica a {entity}")
+            stmt = stmt.where(Crop.crop_type == crop_type)
+
+        return stmt
+
+    @staticmethod
+    def tree_statement():
+        """Arvore completa em uma consulta com LEFT JOINs, ordenada pela hierarquia"""
+        columns = [
+            getattr(model, name).label(f"{prefix}_{name}")
+            for prefix, model, names in TREE_LEVELS
+            for name in names
+        ]
+        return (
+            select(*columns)
+            .select_from(Producer)
+            .outerjoin(Farm, Farm.producer_id == Producer.id)
+            .outerjoin(Harvest, Harvest.farm_id == Farm.id)
+            .outerjoin(Crop, Crop.harvest_id == Harvest.id)
+            .order_by(Producer.id, Farm.id, Harvest.id, Crop.id)
+        )
+
+    @staticmethod
+    async def _partitions(db: AsyncSession, stmt):
+        result = await db.stream(stmt.execution_options(yield_per=config.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    async def stream_csv(db: AsyncSession, stmt) -> AsyncIterator[str]:
+        """CSV com cabecalho; o cabecalho sai antes da primeira consulta"""
+        yield _csv_chunk([[column.name for column in stmt.selected_columns]])
+        async for rows in ExportService._partitions(db, stmt):
+            yield _csv_chunk(rows)
+
+    @staticmethod
+    async def stream_ndjson(db: AsyncSession, stmt) -> AsyncIterator[str]:
+        """Um objeto JSON por linha"""
+        columns = [column.name for column in stmt.selected_columns]
+        async for rows in ExportService._partitions(db, stmt):
+            yield _ndjson_chunk(columns, rows)
+
+    @staticmethod
+    async def stream_arrow(db: AsyncSession, stmt) -> AsyncIterator[bytes]:
+        """Arrow IPC stream: o schema sai primeiro e depois um record batch por bloco do banco"""
+        schema = _arrow_schema(stmt)
+        sink = _ChunkSink()
+        writer = pa.ipc.new_stream(sink, schema)
+        yield sink.drain()
+        async for rows in ExportService._partitions(db, stmt):
+            writer.write_batch(_record_batch(schema, rows))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    async def stream_parquet(db: AsyncSession, stmt) -> AsyncIterator[bytes]:
+        """Parquet com um row group por bloco do banco; o rodape sai ao final"""
+        schema = _arrow_schema(stmt)
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        async for rows in ExportService._partitions(db, stmt):
+            writer.write_batch(_record_batch(schema, rows))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    async def stream_tree_ndjson(db: AsyncSession) -> AsyncIterator[str]:
+        """
+        Um produtor por linha com farms -> harvests -> crops aninhados.
+        Como as linhas chegam ordenadas, so a subarvore do produtor atual fica em memoria.
+        """
+        stmt = ExportService.tree_statement()
+        current = None
+        farms = harvests = None
+
+        async for rows in ExportService._partitions(db, stmt):
+            lines = []
+            for row in rows:
+                values = row._mapping
+                if current is None or current["id"] != values["producer_id"]:
+                    if current is not None:
+                        lines.append(json.dumps(current, ensure_ascii=False) + "\n")
+                    current = {name: _json_value(values[f"producer_{name}"]) for name in TREE_LEVELS[0][2]}
+                    current["farms"] = []
+                    farms, harvests = {}, {}
+
+                farm_id = values["farm_id"]
+                if farm_id is None:
+                    continue
+                if farm_id not in farms:
+                    farms[farm_id] = {name: _json_value(values[f"farm_{name}"]) for name in TREE_LEVELS[1][2]}
+                    farms[farm_id]["harvests"] = []
+                    current["farms"].append(farms[farm_id])
+
+                harvest_id = values["harvest_id"]
+                if harvest_id is None:
+                    continue
+                if harvest_id not in harvests:
+                    harvests[harvest_id] = {name: _json_value(values[f"harvest_{name}"]) for name in TREE_LEVELS[2][2]}
+                    harvests[harvest_id]["crops"] = []
+                    farms[farm_id]["harvests"].append(harvests[harvest_id])
+
+                if values["crop_id"] is not None:
+                    harvests[harvest_id]["crops"].append(
+                        {name: _json_value(values[f"crop_{name}"]) for name in TREE_LEVELS[3][2]}
+                    )
+            if lines:
+                yield "".join(lines)
+
+        if current is not None:
+            yield json.dumps(current, ensure_ascii=False) + "\n"
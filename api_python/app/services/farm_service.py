@@ -1,50 +1,126 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Farm, Producer
-from app.schemas import FarmCreate, FarmUpdate
-from typing import List, Optional
+from app.schemas import FarmCreate, FarmUpdate, FarmFilters, FarmSort
+from app.services.rollup_service import RollupService
+from app.utils.pagination import paginate, DEFAULT_PAGE_SIZE
+from app.utils.fast_json import select_columns
+from typing import Optional, Sequence, Tuple
 
 class FarmService:
     
     @staticmethod
-    def get_all(db: Session) -> List[Farm]:
-        """Busca todas as fazendas"""
-        return db.query(Farm).all()
+    def _filter(stmt, filters: FarmFilters):
+        """Aplica os filtros (todos em colunas indexadas), levantando ValueError se forem incoerentes"""
+        if (filters.min_total_area is not None and filters.max_total_area is not None
+                and filters.min_total_area > filters.max_total_area):
+            raise ValueError("min_total_area não pode ser maior que max_total_area")
+        
+        if filters.producer_id is not None:
+            stmt = stmt.where(Farm.producer_id == filters.producer_id)
+        if filters.state is not None:
+            stmt = stmt.where(Farm.state == filters.state)
+        if filters.city is not None:
+            stmt = stmt.where(Farm.city == filters.city)
+        if filters.min_total_area is not None:
+            stmt = stmt.where(Farm.total_area >= filters.min_total_area)
+        if filters.max_total_area is not None:
+            stmt = stmt.where(Farm.total_area <= filters.max_total_area)
+        if filters.created_after is not None:
+            stmt = stmt.where(Farm.created_at > filters.created_after)
+        return stmt
+    
+    @staticmethod
+    async def get_all(
+        db: AsyncSession,
+        after: Optional[dict] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[FarmFilters] = None,
+        sort: FarmSort = FarmSort.ID
+    ) -> Tuple[list, Optional[str]]:
+        """
+        Busca uma pagina de fazendas (ou so das colunas pedidas) e o cursor da proxima,
+        com filtros e ordenacao opcionais. Levanta ValueError para filtros ou cursor invalidos.
+        """
+        sort_key = sort.value.lstrip("-")
+        sort_column = None if sort_key == "id" else getattr(Farm, sort_key)
+        stmt = select_columns(Farm, columns, extra=("id", sort_key)) if columns else select(Farm)
+        if filters is not None:
+            stmt = FarmService._filter(stmt, filters)
+        return await paginate(
+            db, stmt, Farm.id, after, limit, scalars=not columns,
+            sort_column=sort_column, descending=sort.value.startswith("-")
+        )
     
     @staticmethod
-    def get_by_id(db: Session, farm_id: int) -> Optional[Farm]:
+    async def get_by_id(db: AsyncSession, farm_id: int) -> Optional[Farm]:
         """Busca fazenda por ID"""
-        return db.query(Farm).filter(Farm.id == farm_id).first()
+        return await db.get(Farm, farm_id)
+    
+    @staticmethod
+    async def get_updated_at(db: AsyncSession, farm_id: int) -> Optional[datetime]:
+        """Busca so o updated_at do fazenda (para o ETag), sem carregar o registro"""
+        result = await db.execute(select(Farm.updated_at).where(Farm.id == farm_id))
+        return result.scalar_one_or_none()
     
     @staticmethod
-    def get_by_producer(db: Session, producer_id: int) -> List[Farm]:
-        """Busca fazendas de um produtor"""
-        return db.query(Farm).filter(Farm.producer_id == producer_id).all()
+    async def get_row(db: AsyncSession, farm_id: int, columns: Sequence[str]):
+        """Busca so as colunas pedidas do fazenda (tupla com updated_at no fim, para o ETag)"""
+        stmt = select_columns(Farm, columns, extra=("updated_at",)).where(Farm.id == farm_id)
+        return (await db.execute(stmt)).first()
     
     @staticmethod
-    def create(db: Session, farm_data: FarmCreate) -> Farm:
+    async def get_by_producer(
+        db: AsyncSession,
+        producer_id: int,
+        after: Optional[dict] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[list, Optional[str]]:
+        """Busca uma pagina de fazendas de um produtor e o cursor da proxima"""
+        stmt = select_columns(Farm, columns) if columns else select(Farm)
+        return await paginate(db, stmt.where(Farm.producer_id == producer_id), Farm.id, after, limit, scalars=not columns)
+    
+    @staticmethod
+    async def create(db: AsyncSession, farm_data: FarmCreate) -> Farm:
         """Cria uma nova fazenda"""
         # Valida as areas
         if farm_data.agricultural_area + farm_data.vegetation_area > farm_data.total_area:
             raise ValueError("A soma das áreas agricultável e vegetação não pode ser maior que a área total")
         
         # Verifica se o produtor existe
-        producer = db.query(Producer).filter(Producer.id == farm_data.producer_id).first()
+        producer = await db.get(Producer, farm_data.producer_id)
         if not producer:
             raise ValueError("Produtor não encontrado")
         
         # Cria a fazenda
         farm = Farm(**farm_data.dict())
         db.add(farm)
-        db.commit()
-        db.refresh(farm)
+        await RollupService.farm_created(db, farm)
+        await db.commit()
+        await db.refresh(farm)
         return farm
     
     @staticmethod
-    def update(db: Session, farm_id: int, farm_data: FarmUpdate) -> Optional[Farm]:
+    async def update(db: AsyncSession, farm_id: int, farm_data: FarmUpdate) -> Optional[Farm]:
         """Atualiza uma fazenda"""
-        farm = FarmService.get_by_id(db, farm_id)
-        if not farm:
+        # O UPDATE abre a transacao de escrita e trava a linha (no SQLite, o banco)
+        # antes de ler os valores antigos: um update concorrente da mesma fazenda
+        # espera o commit deste e le os valores novos, sem descontar o rollup duas vezes
+        result = await db.execute(
+            update(Farm)
+            .where(Farm.id == farm_id)
+            .values(updated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await db.rollback()
             return None
+        farm = await db.scalar(
+            select(Farm).where(Farm.id == farm_id).execution_options(populate_existing=True)
+        )
         
         # Pega os valores atuais ou novos
         total_area = farm_data.total_area if farm_data.total_area is not None else farm.total_area
@@ -53,23 +129,34 @@ class FarmService:
         
         # Valida as areas
         if agricultural_area + vegetation_area > total_area:
+            await db.rollback()
             raise ValueError("A soma das áreas agricultável e vegetação não pode ser maior que a área total")
         
+        # Guarda os valores antigos para o rollup do dashboard
+        before = {
+            "state": farm.state,
+            "total_area": farm.total_area,
+            "agricultural_area": farm.agricultural_area,
+            "vegetation_area": farm.vegetation_area
+        }
+        
         # Atualiza os campos
         for field, value in farm_data.dict(exclude_unset=True).items():
             setattr(farm, field, value)
         
-        db.commit()
-        db.refresh(farm)
+        await RollupService.farm_updated(db, before, farm)
+        await db.commit()
+        await db.refresh(farm)
         return farm
     
     @staticmethod
-    def delete(db: Session, farm_id: int) -> bool:
+    async def delete(db: AsyncSession, farm_id: int) -> bool:
         """Deleta uma fazenda"""
-        farm = FarmService.get_by_id(db, farm_id)
+        farm = await FarmService.get_by_id(db, farm_id)
         if not farm:
             return False
         
-        db.delete(farm)
-        db.commit()
-        return True
\ No newline at end of file
+        await RollupService.farm_deleted(db, farm)
+        await db.delete(farm)
+        await db.commit()
+        return True
@@ -0,0 +1,153 @@
+from typing import List, Optional, Sequence
+
+from sqlalchemy import select, insert, update, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Farm, Harvest, Crop
+from app.schemas import CropBase, HarvestBatchItem
+from app.services.rollup_service import RollupService
+
+class HarvestService:
+    """
+    Criacao em lote de safras e culturas: o pai e conferido uma vez e cada
+    tabela recebe um INSERT multi-linha com RETURNING, tudo em uma transacao.
+    Mantem harvests.planted_area (soma das culturas) sem passar da area
+    agricultavel da fazenda.
+    """
+
+    # Folga (ha) nas comparacoes de area: planted_area e mantido por somas e
+    # subtracoes em float, que acumulam erro de arredondamento
+    AREA_TOLERANCE = 1e-6
+
+    @staticmethod
+    async def _insert_returning(db: AsyncSession, model, values: List[dict]) -> list:
+        """
+        INSERT multi-linha com RETURNING (insertmanyvalues do SQLAlchemy), com as
+        linhas devolvidas na ordem de values (sort_by_parameter_order). No SQLite,
+        que nao garante a ordem do RETURNING, o SQLAlchemy insere linha a linha.
+        """
+        return (await db.scalars(insert(model).returning(model, sort_by_parameter_order=True), values)).all()
+
+    @staticmethod
+    async def _insert_crops(db: AsyncSession, values: List[dict]) -> List[Crop]:
+        """INSERT multi-linha das culturas, na ordem dos valores, com os rollups ajustados"""
+        if not values:
+            return []
+        crops = await HarvestService._insert_returning(db, Crop, values)
+        await RollupService.crops_created(db, crops)
+        return crops
+
+    @staticmethod
+    def _crop_values(harvest_id: int, crops: Sequence[CropBase]) -> List[dict]:
+        return [
+            {"harvest_id": harvest_id, "crop_type": crop.crop_type.value, "planted_area": crop.planted_area}
+            for crop in crops
+        ]
+
+    @staticmethod
+    def rebuild_planted_area(db: Session):
+        """
+        Recalcula harvests.planted_area somando as culturas (apos cargas em massa).
+        Em sessao async: await db.run_sync(HarvestService.rebuild_planted_area)
+        """
+        total = (
+            select(func.coalesce(func.sum(Crop.planted_area), 0.0))
+            .where(Crop.harvest_id == Harvest.id)
+            .scalar_subquery()
+        )
+        db.execute(update(Harvest).values(planted_area=total).execution_options(synchronize_session=False))
+
+    @staticmethod
+    async def _add_planted_area(db: AsyncSession, harvest_id: int, area: float) -> bool:
+        """
+        Soma area ao total da safra se couber na area agricultavel da fazenda.
+        UPDATE condicional: a conferencia e a escrita sao atomicas e nenhuma cultura e somada.
+        """
+        agricultural_area = select(Farm.agricultural_area).where(Farm.id == Harvest.farm_id).scalar_subquery()
+        result = await db.execute(
+            update(Harvest)
+            .where(Harvest.id == harvest_id,
+                   Harvest.planted_area + area <= agricultural_area + HarvestService.AREA_TOLERANCE)
+            .values(planted_area=Harvest.planted_area + area)
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    async def subtract_planted_area(db: AsyncSession, harvest_id: int, area: float):
+        """
+        Desconta do total da safra a area de uma cultura removida (antes do commit).
+        Sobra de arredondamento abaixo da folga vira 0, sem total negativo ou residual.
+        """
+        remaining = Harvest.planted_area - area
+        await db.execute(
+            update(Harvest)
+            .where(Harvest.id == harvest_id)
+            .values(planted_area=case((remaining < HarvestService.AREA_TOLERANCE, 0.0), else_=remaining))
+            .execution_options(synchronize_session="fetch")
+        )
+
+    @staticmethod
+    async def create_crops(db: AsyncSession, harvest_id: int, crops: Sequence[CropBase]) -> Optional[List[Crop]]:
+        """
+        Cria as culturas da safra em um INSERT. None se a safra nao existe;
+        ValueError se a area plantada passaria da area agricultavel da fazenda
+        """
+        area = sum(crop.planted_area for crop in crops)
+        if not await HarvestService._add_planted_area(db, harvest_id, area):
+            # Nada foi alterado: so falta saber se a safra existe para escolher o erro
+            row = (await db.execute(
+                select(Harvest.planted_area, Farm.agricultural_area)
+                .join(Farm, Farm.id == Harvest.farm_id)
+                .where(Harvest.id == harvest_id)
+            )).first()
+            if row is None:
+                return None
+            raise ValueError(
+                f"Área plantada excede a área agricultável da fazenda "
+                f"({row.planted_area:g} de {row.agricultural_area:g} ha em uso, tentando somar {area:g} ha)"
+            )
+
+        created = await HarvestService._insert_crops(db, HarvestService._crop_values(harvest_id, crops))
+        await db.commit()
+        return created
+
+    @staticmethod
+    async def create_harvests(db: AsyncSession, farm_id: int, harvests: Sequence[HarvestBatchItem]) -> Optional[List[Harvest]]:
+        """
+        Cria as safras da fazenda e as culturas de cada uma: um INSERT para as
+        safras e outro para todas as culturas. None se a fazenda nao existe;
+        ValueError se as culturas de uma safra passam da area agricultavel
+        """
+        agricultural_area = await db.scalar(select(Farm.agricultural_area).where(Farm.id == farm_id))
+        if agricultural_area is None:
+            return None
+
+        totals = [sum(crop.planted_area for crop in item.crops) for item in harvests]
+        for item, total in zip(harvests, totals):
+            if total > agricultural_area + HarvestService.AREA_TOLERANCE:
+                raise ValueError(
+                    f"Área plantada da safra {item.year} ({total:g} ha) excede a área "
+                    f"agricultável da fazenda ({agricultural_area:g} ha)"
+                )
+
+        created = await HarvestService._insert_returning(db, Harvest, [
+            {"farm_id": farm_id, "year": item.year, "description": item.description, "planted_area": total}
+            for item, total in zip(harvests, totals)
+        ])
+
+        values = []
+        for harvest, item in zip(created, harvests):
+            values.extend(HarvestService._crop_values(harvest.id, item.crops))
+        crops = await HarvestService._insert_crops(db, values)
+        await db.commit()
+
+        # Monta harvest.crops com o que acabou de ser inserido, sem nova consulta
+        by_harvest = {harvest.id: [] for harvest in created}
+        for crop in crops:
+            by_harvest[crop.harvest_id].append(crop)
+        for harvest in created:
+            set_committed_value(harvest, "crops", by_harvest[harvest.id])
+        return created
@@ -0,0 +1,42 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Farm, Harvest, Crop
+from app.schemas import IntegrityReport, PlantedAreaViolation
+from app.services.harvest_service import HarvestService
+
+class IntegrityService:
+    """Relatorios de consistencia dos dados, cada verificacao em uma consulta agregada"""
+
+    @staticmethod
+    async def planted_area_violations(db: AsyncSession) -> list:
+        """
+        Safras cujas culturas somam mais que a area agricultavel da fazenda.
+        Soma as culturas de verdade (nao o total mantido em harvests.planted_area),
+        entao pega tambem dados antigos ou gravados por fora da API. Usa a mesma
+        folga de arredondamento da criacao de culturas.
+        """
+        planted_area = func.sum(Crop.planted_area)
+        result = await db.execute(
+            select(
+                Harvest.id.label("harvest_id"),
+                Harvest.farm_id,
+                Harvest.year,
+                Farm.agricultural_area,
+                planted_area.label("planted_area")
+            )
+            .select_from(Crop)
+            .join(Harvest, Harvest.id == Crop.harvest_id)
+            .join(Farm, Farm.id == Harvest.farm_id)
+            .group_by(Harvest.id, Harvest.farm_id, Harvest.year, Farm.agricultural_area)
+            .having(planted_area > Farm.agricultural_area + HarvestService.AREA_TOLERANCE)
+            .order_by(Harvest.id)
+        )
+        return [
+            PlantedAreaViolation(**row._mapping, excess=row.planted_area - row.agricultural_area)
+            for row in result
+        ]
+
+    @staticmethod
+    async def report(db: AsyncSession) -> IntegrityReport:
+        return IntegrityReport(planted_area_violations=await IntegrityService.planted_area_violations(db))
@@ -1,71 +1,231 @@
-from sqlalchemy.orm import Session
-from app.models import Producer
-from app.schemas import ProducerCreate, ProducerUpdate
-from app.utils import validate_document
-from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models import Producer, Farm, Harvest
+from app.schemas import (
+    ProducerCreate, ProducerUpdate, ProducerBulkError, ProducerBulkResult,
+    ProducerResponse, FarmResponse, HarvestResponse, CropResponse
+)
+from app.utils import normalize_document, validate_document_digits, validate_documents
+from app.services.rollup_service import RollupService
+from app.utils.pagination import paginate, DEFAULT_PAGE_SIZE
+from app.utils.fast_json import select_columns
+from typing import List, Optional, Sequence, Tuple
+
+# Documentos por consulta IN (abaixo do limite de parametros do SQLite/asyncpg)
+BULK_LOOKUP_CHUNK = 10000
+
+# Niveis da arvore do produtor: (schema das colunas, relacionamento com o nivel de baixo)
+TREE_NODES = (
+    (ProducerResponse, Producer.farms),
+    (FarmResponse, Farm.harvests),
+    (HarvestResponse, Harvest.crops),
+    (CropResponse, None),
+)
+MAX_TREE_DEPTH = len(TREE_NODES) - 1
 
 class ProducerService:
     
     @staticmethod
-    def get_all(db: Session) -> List[Producer]:
-        """Busca todos os produtores"""
-        return db.query(Producer).all()
+    async def get_all(
+        db: AsyncSession,
+        after: Optional[dict] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[list, Optional[str]]:
+        """Busca uma pagina de produtores (ou so das colunas pedidas) e o cursor da proxima"""
+        stmt = select_columns(Producer, columns) if columns else select(Producer)
+        return await paginate(db, stmt, Producer.id, after, limit, scalars=not columns)
     
     @staticmethod
-    def get_by_id(db: Session, producer_id: int) -> Optional[Producer]:
+    async def get_by_id(db: AsyncSession, producer_id: int) -> Optional[Producer]:
         """Busca produtor por ID"""
-        return db.query(Producer).filter(Producer.id == producer_id).first()
+        return await db.get(Producer, producer_id)
+    
+    @staticmethod
+    async def get_updated_at(db: AsyncSession, producer_id: int) -> Optional[datetime]:
+        """Busca so o updated_at do produtor (para o ETag), sem carregar o registro"""
+        result = await db.execute(select(Producer.updated_at).where(Producer.id == producer_id))
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_row(db: AsyncSession, producer_id: int, columns: Sequence[str]):
+        """Busca so as colunas pedidas do produtor (tupla com updated_at no fim, para o ETag)"""
+        stmt = select_columns(Producer, columns, extra=("updated_at",)).where(Producer.id == producer_id)
+        return (await db.execute(stmt)).first()
+    
+    @staticmethod
+    def _tree_node(obj, level: int, depth: int) -> dict:
+        """Colunas do no e, dentro do depth, os filhos ja carregados pelo selectinload"""
+        schema, relationship = TREE_NODES[level]
+        node = {name: getattr(obj, name) for name in schema.model_fields}
+        if level < depth:
+            node[relationship.key] = [
+                ProducerService._tree_node(child, level + 1, depth)
+                for child in getattr(obj, relationship.key)
+            ]
+        return node
+    
+    @staticmethod
+    async def get_tree(db: AsyncSession, producer_id: int, depth: int = MAX_TREE_DEPTH) -> Optional[dict]:
+        """
+        Produtor com fazendas -> safras -> culturas ate o nivel depth (0 = so o produtor).
+        Uma consulta por nivel (selectinload), independente da quantidade de registros.
+        """
+        stmt = select(Producer).where(Producer.id == producer_id)
+        if depth > 0:
+            loader = selectinload(TREE_NODES[0][1])
+            for _, relationship in TREE_NODES[1:depth]:
+                loader = loader.selectinload(relationship)
+            stmt = stmt.options(loader)
+        
+        producer = (await db.execute(stmt)).scalar_one_or_none()
+        if not producer:
+            return None
+        return ProducerService._tree_node(producer, 0, depth)
     
     @staticmethod
-    def get_by_document(db: Session, document: str) -> Optional[Producer]:
-        """Busca produtor por documento"""
-        return db.query(Producer).filter(Producer.document == document).first()
+    async def get_by_document(db: AsyncSession, document: str) -> Optional[Producer]:
+        """Busca produtor por documento, com ou sem formatacao (indice unico de document_digits)"""
+        result = await db.execute(
+            select(Producer).where(Producer.document_digits == normalize_document(document))
+        )
+        return result.scalars().first()
     
     @staticmethod
-    def create(db: Session, producer_data: ProducerCreate) -> Producer:
+    async def create(db: AsyncSession, producer_data: ProducerCreate) -> Producer:
         """Cria um novo produtor"""
-        # Valida o documento
-        if not validate_document(producer_data.document):
+        # Normaliza uma vez e valida os digitos
+        digits = normalize_document(producer_data.document)
+        if not validate_document_digits(digits):
             raise ValueError("Documento inválido (CPF ou CNPJ)")
         
-        # Verifica se ja existe
-        existing = ProducerService.get_by_document(db, producer_data.document)
-        if existing:
+        # Verifica se ja existe (em qualquer formatacao)
+        if await ProducerService._digits_taken(db, digits):
             raise ValueError("Já existe um produtor com esse documento")
         
         # Cria o produtor
         producer = Producer(**producer_data.dict())
         db.add(producer)
-        db.commit()
-        db.refresh(producer)
+        await db.commit()
+        await db.refresh(producer)
         return producer
     
     @staticmethod
-    def update(db: Session, producer_id: int, producer_data: ProducerUpdate) -> Optional[Producer]:
+    async def _digits_taken(db: AsyncSession, digits: str, exclude_id: Optional[int] = None) -> bool:
+        """Se outro produtor ja usa o documento normalizado (so le o indice)"""
+        stmt = select(Producer.id).where(Producer.document_digits == digits)
+        if exclude_id is not None:
+            stmt = stmt.where(Producer.id != exclude_id)
+        return (await db.execute(stmt.limit(1))).first() is not None
+    
+    @staticmethod
+    async def get_existing_documents(db: AsyncSession, documents: List[str]) -> set:
+        """
+        Retorna quais documentos (ja normalizados) existem, um IN por bloco
+        no indice de document_digits
+        """
+        existing = set()
+        for start in range(0, len(documents), BULK_LOOKUP_CHUNK):
+            chunk = documents[start:start + BULK_LOOKUP_CHUNK]
+            result = await db.execute(
+                select(Producer.document_digits).where(Producer.document_digits.in_(chunk))
+            )
+            existing.update(result.scalars().all())
+        return existing
+    
+    @staticmethod
+    async def bulk_create(db: AsyncSession, rows: List[Tuple[int, dict]]) -> ProducerBulkResult:
+        """
+        Cria produtores em lote: valida todas as linhas em uma passada, confere
+        duplicados com IN e insere as validas em um unico INSERT multi-linha.
+        Linhas invalidas sao reportadas e nao impedem as demais.
+        """
+        errors = []
+        candidates = []
+        for line, row in rows:
+            document, name = row.get("document"), row.get("name")
+            if not isinstance(document, str) or not document.strip():
+                errors.append(ProducerBulkError(line=line, error="Campo document obrigatório"))
+            elif not isinstance(name, str) or not name.strip():
+                errors.append(ProducerBulkError(line=line, document=document, error="Campo name obrigatório"))
+            else:
+                document = document.strip()
+                candidates.append((line, document, normalize_document(document), name.strip()))
+        
+        valid = validate_documents([digits for _, _, digits, _ in candidates]).tolist()
+        existing = await ProducerService.get_existing_documents(
+            db, list({digits for (_, _, digits, _), ok in zip(candidates, valid) if ok})
+        )
+        
+        now = datetime.now()
+        seen = set()
+        values = []
+        for (line, document, digits, name), ok in zip(candidates, valid):
+            if not ok:
+                errors.append(ProducerBulkError(line=line, document=document, error="Documento inválido (CPF ou CNPJ)"))
+            elif digits in existing:
+                errors.append(ProducerBulkError(line=line, document=document, error="Já existe um produtor com esse documento"))
+            elif digits in seen:
+                errors.append(ProducerBulkError(line=line, document=document, error="Documento repetido no arquivo"))
+            else:
+                seen.add(digits)
+                values.append({
+                    "document": document, "document_digits": digits, "name": name,
+                    "created_at": now, "updated_at": now
+                })
+        
+        if values:
+            try:
+                await db.execute(insert(Producer), values)
+                await db.commit()
+            except IntegrityError:
+                # Outro processo gravou um dos documentos entre a consulta e o INSERT
+                await db.rollback()
+                raise ValueError("Conflito de documentos durante a importação, nenhum produtor foi criado")
+        
+        errors.sort(key=lambda e: e.line)
+        return ProducerBulkResult(received=len(rows), created=len(values), errors=errors)
+    
+    @staticmethod
+    async def update(db: AsyncSession, producer_id: int, producer_data: ProducerUpdate) -> Optional[Producer]:
         """Atualiza um produtor"""
-        producer = ProducerService.get_by_id(db, producer_id)
+        producer = await ProducerService.get_by_id(db, producer_id)
         if not producer:
             return None
         
         # Valida documento se foi enviado
-        if producer_data.document and not validate_document(producer_data.document):
-            raise ValueError("Documento inválido (CPF ou CNPJ)")
+        if producer_data.document:
+            digits = normalize_document(producer_data.document)
+            if not validate_document_digits(digits):
+                raise ValueError("Documento inválido (CPF ou CNPJ)")
+            if await ProducerService._digits_taken(db, digits, exclude_id=producer_id):
+                raise ValueError("Já existe um produtor com esse documento")
         
         # Atualiza os campos
         for field, value in producer_data.dict(exclude_unset=True).items():
             setattr(producer, field, value)
         
-        db.commit()
-        db.refresh(producer)
+        await db.commit()
+        await db.refresh(producer)
         return producer
     
     @staticmethod
-    def delete(db: Session, producer_id: int) -> bool:
-        """Deleta um produtor"""
-        producer = ProducerService.get_by_id(db, producer_id)
-        if not producer:
+    async def delete(db: AsyncSession, producer_id: int) -> bool:
+        """
+        Deleta um produtor com um unico DELETE: o ON DELETE CASCADE das FKs
+        remove fazendas, safras e culturas no banco, sem carregar a subarvore
+        """
+        # Os rollups sao ajustados antes, enquanto a subarvore ainda existe
+        await RollupService.producer_deleted(db, producer_id)
+        result = await db.execute(delete(Producer).where(Producer.id == producer_id))
+        if result.rowcount == 0:
+            await db.rollback()
             return False
         
-        db.delete(producer)
-        db.commit()
-        return True
\ No newline at end of file
+        await db.commit()
+        # Fazendas/safras/culturas ja carregadas na sessao foram removidas pelo banco
+        db.expunge_all()
+        return True
@@ -0,0 +1,237 @@
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import select, func, delete, insert, update, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import Farm, Harvest, Crop, StateRollup, CropRollup, TableVersion
+
+# Chave do session.info com as tabelas de rollup alteradas na transacao
+TOUCHED_TABLES = "rollup_tables_touched"
+
+class RollupService:
+    """
+    Mantem as tabelas de rollup do dashboard (por estado e por cultura).
+    Deve ser chamado antes do commit, na mesma transacao da escrita.
+    A versao de cada tabela alterada em table_versions (usada nos ETags e na
+    chave do cache) e incrementada uma vez, no commit da transacao.
+    """
+
+    STATE_TABLE = StateRollup.__tablename__
+    CROP_TABLE = CropRollup.__tablename__
+
+    @staticmethod
+    async def _increment(db: AsyncSession, model, key: dict, deltas: dict):
+        """Soma os deltas na linha da chave, criando a linha se nao existir"""
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(model).values(**key, **deltas)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={name: getattr(model, name) + value for name, value in deltas.items()}
+            )
+            await db.execute(stmt)
+            return
+
+        # Outros bancos: UPDATE e, se nao havia linha, INSERT
+        conditions = [getattr(model, name) == value for name, value in key.items()]
+        result = await db.execute(
+            update(model).where(*conditions).values(
+                {name: getattr(model, name) + value for name, value in deltas.items()}
+            )
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(model).values(**key, **deltas))
+
+    @staticmethod
+    def _touch(db: AsyncSession, table: str):
+        """Marca a tabela de rollup como alterada; a versao sobe no commit"""
+        db.info.setdefault(TOUCHED_TABLES, set()).add(table)
+
+    @staticmethod
+    def bump_versions(db: Session, tables: Iterable[str]):
+        """
+        Incrementa a versao das tabelas, uma linha de table_versions por tabela.
+        A versao nunca volta atras: um ETag antigo nao casa com dados mais novos.
+        """
+        for table in sorted(tables):
+            result = db.execute(
+                update(TableVersion).where(TableVersion.name == table).values(version=TableVersion.version + 1)
+            )
+            if result.rowcount == 0:
+                db.execute(insert(TableVersion).values(name=table, version=1))
+
+    @staticmethod
+    async def versions(db: AsyncSession, *tables: str) -> tuple:
+        """Versoes atuais das tabelas, na ordem pedida (0 se nunca alterada)"""
+        rows = (await db.execute(
+            select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+        )).all()
+        current = {row.name: row.version for row in rows}
+        return tuple(current.get(table, 0) for table in tables)
+
+    @staticmethod
+    async def _apply_state(db: AsyncSession, state: str, farm_count: int, total_area: float,
+                           agricultural_area: float, vegetation_area: float):
+        """Aplica os deltas de um estado e remove a linha se nao sobrar fazenda"""
+        await RollupService._increment(db, StateRollup, {"state": state}, {
+            "farm_count": farm_count,
+            "total_area": total_area,
+            "agricultural_area": agricultural_area,
+            "vegetation_area": vegetation_area
+        })
+        RollupService._touch(db, RollupService.STATE_TABLE)
+        if farm_count < 0:
+            await db.execute(
+                delete(StateRollup).where(StateRollup.state == state, StateRollup.farm_count <= 0)
+            )
+
+    @staticmethod
+    async def _apply_crop(db: AsyncSession, crop_type, crop_count: int, planted_area: float):
+        """Aplica os deltas de uma cultura e remove a linha se nao sobrar cultura"""
+        await RollupService._increment(db, CropRollup, {"crop_type": crop_type}, {
+            "crop_count": crop_count,
+            "total_area": planted_area
+        })
+        RollupService._touch(db, RollupService.CROP_TABLE)
+        if crop_count < 0:
+            await db.execute(
+                delete(CropRollup).where(CropRollup.crop_type == crop_type, CropRollup.crop_count <= 0)
+            )
+
+    @staticmethod
+    async def _remove_crops(db: AsyncSession, *conditions):
+        """Subtrai dos rollups as culturas que casam com as condicoes (join com safra e fazenda)"""
+        groups = (await db.execute(
+            select(
+                Crop.crop_type,
+                func.count(Crop.id).label('count'),
+                func.sum(Crop.planted_area).label('total_area')
+            )
+            .join(Harvest, Crop.harvest_id == Harvest.id)
+            .join(Farm, Harvest.farm_id == Farm.id)
+            .where(*conditions)
+            .group_by(Crop.crop_type)
+        )).all()
+
+        for group in groups:
+            await RollupService._apply_crop(db, group.crop_type, -group.count, -group.total_area)
+
+    @staticmethod
+    async def farm_created(db: AsyncSession, farm: Farm):
+        """Soma uma fazenda nova no rollup do estado"""
+        await RollupService._apply_state(
+            db, farm.state, 1, farm.total_area, farm.agricultural_area, farm.vegetation_area
+        )
+
+    @staticmethod
+    async def farm_updated(db: AsyncSession, before: dict, farm: Farm):
+        """Troca os valores antigos da fazenda pelos novos (o estado pode ter mudado)"""
+        await RollupService._apply_state(
+            db, before["state"], -1,
+            -before["total_area"], -before["agricultural_area"], -before["vegetation_area"]
+        )
+        await RollupService.farm_created(db, farm)
+
+    @staticmethod
+    async def farm_deleted(db: AsyncSession, farm: Farm):
+        """Remove a fazenda e as culturas das suas safras dos rollups"""
+        await RollupService._remove_crops(db, Harvest.farm_id == farm.id)
+        await RollupService._apply_state(
+            db, farm.state, -1, -farm.total_area, -farm.agricultural_area, -farm.vegetation_area
+        )
+
+    @staticmethod
+    async def producer_deleted(db: AsyncSession, producer_id: int):
+        """Remove todas as fazendas e culturas do produtor dos rollups"""
+        await RollupService._remove_crops(db, Farm.producer_id == producer_id)
+
+        states = (await db.execute(
+            select(
+                Farm.state,
+                func.count(Farm.id).label('count'),
+                func.sum(Farm.total_area).label('total_area'),
+                func.sum(Farm.agricultural_area).label('agricultural_area'),
+                func.sum(Farm.vegetation_area).label('vegetation_area')
+            )
+            .where(Farm.producer_id == producer_id)
+            .group_by(Farm.state)
+        )).all()
+
+        for state in states:
+            await RollupService._apply_state(
+                db, state.state, -state.count,
+                -state.total_area, -state.agricultural_area, -state.vegetation_area
+            )
+
+    @staticmethod
+    async def harvest_deleted(db: AsyncSession, harvest_id: int):
+        """Remove as culturas da safra dos rollups"""
+        await RollupService._remove_crops(db, Crop.harvest_id == harvest_id)
+
+    @staticmethod
+    async def crop_created(db: AsyncSession, crop: Crop):
+        """Soma a area plantada de uma cultura nova"""
+        await RollupService._apply_crop(db, crop.crop_type, 1, crop.planted_area)
+
+    @staticmethod
+    async def crops_created(db: AsyncSession, crops: Iterable[Crop]):
+        """Soma um lote de culturas novas, um ajuste por tipo de cultura"""
+        totals = defaultdict(lambda: [0, 0.0])
+        for crop in crops:
+            totals[crop.crop_type][0] += 1
+            totals[crop.crop_type][1] += crop.planted_area
+        for crop_type, (count, planted_area) in totals.items():
+            await RollupService._apply_crop(db, crop_type, count, planted_area)
+
+    @staticmethod
+    async def crop_deleted(db: AsyncSession, crop: Crop):
+        """Subtrai a area plantada de uma cultura removida"""
+        await RollupService._apply_crop(db, crop.crop_type, -1, -crop.planted_area)
+
+    @staticmethod
+    def rebuild(db: Session):
+        """
+        Recalcula os rollups a partir das tabelas de origem.
+        Usado apos cargas em massa (seed). Em sessao async: await db.run_sync(RollupService.rebuild)
+        """
+        db.execute(delete(StateRollup))
+        db.execute(delete(CropRollup))
+
+        db.execute(insert(StateRollup).from_select(
+            ["state", "farm_count", "total_area", "agricultural_area", "vegetation_area"],
+            select(
+                Farm.state,
+                func.count(Farm.id),
+                func.sum(Farm.total_area),
+                func.sum(Farm.agricultural_area),
+                func.sum(Farm.vegetation_area)
+            ).group_by(Farm.state)
+        ))
+        db.execute(insert(CropRollup).from_select(
+            ["crop_type", "crop_count", "total_area"],
+            select(
+                Crop.crop_type,
+                func.count(Crop.id),
+                func.sum(Crop.planted_area)
+            ).group_by(Crop.crop_type)
+        ))
+
+        RollupService.bump_versions(db, (RollupService.STATE_TABLE, RollupService.CROP_TABLE))
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_touched_versions(session: Session):
+    """
+    Incrementa as versoes no fim da transacao: uma escrita por tabela, por
+    ultimo, para a linha de table_versions ficar travada so ate o commit
+    """
+    tables = session.info.pop(TOUCHED_TABLES, None)
+    if tables:
+        RollupService.bump_versions(session, tables)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched_tables(session: Session):
+    session.info.pop(TOUCHED_TABLES, None)
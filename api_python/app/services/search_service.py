@@ -0,0 +1,108 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select, func, or_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Producer, Farm
+from app.schemas import SearchResult
+from app.utils.ngram import NgramIndex
+
+# Colunas pesquisadas: (tipo do resultado, model, coluna). No Postgres cada uma tem
+# um indice GIN gin_trgm_ops (migracao 0005)
+SEARCH_TARGETS = (
+    ("producer", Producer, "name"),
+    ("farm", Farm, "name"),
+    ("farm", Farm, "city"),
+)
+
+# Score minimo, igual ao pg_trgm.word_similarity_threshold padrao do Postgres
+MIN_SCORE = 0.6
+
+# Fallback sem pg_trgm: indice por coluna, refeito quando a tabela muda
+_fallback_indexes: Dict[Tuple[str, str], Tuple[tuple, NgramIndex]] = {}
+
+def _escape_like(value: str) -> str:
+    """Escapa os curingas do LIKE com "!" (sem depender de como o dialeto trata a barra invertida)"""
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+class SearchService:
+    """Busca por nome de produtor e por nome/cidade de fazenda, ordenada por similaridade"""
+
+    @staticmethod
+    async def _match_postgres(db: AsyncSession, model, column_name: str, q: str, limit: int) -> List[Tuple[int, float]]:
+        """Ids e scores pelo pg_trgm: ILIKE e <% usam o indice GIN, word_similarity ordena"""
+        column = getattr(model, column_name)
+        score = func.word_similarity(q, column)
+        result = await db.execute(
+            select(model.id, score.label("score"))
+            .where(or_(
+                column.ilike(f"%{_escape_like(q)}%", escape="!"),
+                literal(q).op("<%")(column)
+            ))
+            .order_by(score.desc(), model.id)
+            .limit(limit)
+        )
+        return [(row.id, row.score) for row in result]
+
+    @staticmethod
+    async def _fallback_index(db: AsyncSession, model, column_name: str) -> NgramIndex:
+        """Indice de trigramas em memoria da coluna, refeito se count/max(id)/max(updated_at) mudou"""
+        signature = tuple((await db.execute(
+            select(func.count(model.id), func.max(model.id), func.max(model.updated_at))
+        )).one())
+        key = (model.__tablename__, column_name)
+        cached = _fallback_indexes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        index = NgramIndex()
+        result = await db.stream(
+            select(model.id, getattr(model, column_name)).execution_options(yield_per=10000)
+        )
+        async for rows in result.partitions():
+            for row_id, text in rows:
+                index.add(row_id, text)
+        _fallback_indexes[key] = (signature, index)
+        return index
+
+    @staticmethod
+    async def _match_fallback(db: AsyncSession, model, column_name: str, q: str, limit: int) -> List[Tuple[int, float]]:
+        index = await SearchService._fallback_index(db, model, column_name)
+        return index.search(q, limit, MIN_SCORE)
+
+    @staticmethod
+    async def search(db: AsyncSession, q: str, limit: int) -> List[SearchResult]:
+        """
+        Os limit resultados com maior score entre produtores e fazendas.
+        Cada coluna retorna no maximo limit candidatos, entao o custo nao cresce com a tabela.
+        """
+        match = (
+            SearchService._match_postgres
+            if db.get_bind().dialect.name == "postgresql"
+            else SearchService._match_fallback
+        )
+
+        # Maior score por registro (uma fazenda pode casar pelo nome e pela cidade)
+        scores: Dict[Tuple[str, int], float] = {}
+        for kind, model, column_name in SEARCH_TARGETS:
+            for row_id, score in await match(db, model, column_name, q, limit):
+                key = (kind, row_id)
+                scores[key] = max(scores.get(key, 0.0), score)
+
+        top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        producer_ids = [row_id for (kind, row_id), _ in top if kind == "producer"]
+        farm_ids = [row_id for (kind, row_id), _ in top if kind == "farm"]
+
+        rows = {}
+        if producer_ids:
+            for row in await db.execute(select(Producer.id, Producer.name).where(Producer.id.in_(producer_ids))):
+                rows[("producer", row.id)] = {"name": row.name}
+        if farm_ids:
+            for row in await db.execute(select(Farm.id, Farm.name, Farm.city, Farm.state).where(Farm.id.in_(farm_ids))):
+                rows[("farm", row.id)] = {"name": row.name, "city": row.city, "state": row.state}
+
+        return [
+            SearchResult(type=kind, id=row_id, score=round(score, 4), **rows[(kind, row_id)])
+            for (kind, row_id), score in top
+            if (kind, row_id) in rows
+        ]
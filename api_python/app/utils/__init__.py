@@ -1,3 +1,9 @@
-from .validators import validate_cpf, validate_cnpj, validate_document
+from .validators import (
+    normalize_document, validate_cpf, validate_cnpj, validate_document,
+    validate_document_digits, validate_documents
+)
 
-__all__ = ["validate_cpf", "validate_cnpj", "validate_document"]
\ No newline at end of file
+__all__ = [
+    "normalize_document", "validate_cpf", "validate_cnpj", "validate_document",
+    "validate_document_digits", "validate_documents"
+]
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from typing import List, Tuple
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_TYPES = ("text/csv", "application/csv")
+
+class UnsupportedBulkFormat(Exception):
+    """Content-Type nao suportado na importacao em lote"""
+    pass
+
+def _parse_ndjson(text: str) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    rows, errors = [], []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            errors.append((line_number, "JSON inválido"))
+            continue
+        if not isinstance(value, dict):
+            errors.append((line_number, "Linha deve ser um objeto JSON"))
+            continue
+        rows.append((line_number, value))
+    return rows, errors
+
+def _parse_csv(text: str) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    rows = []
+    reader = csv.DictReader(io.StringIO(text))
+    for record in reader:
+        # Linha 1 e o cabecalho
+        rows.append((reader.line_num, {k.strip(): v for k, v in record.items() if k is not None}))
+    return rows, []
+
+def parse_bulk_rows(body: bytes, content_type: str) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    """
+    Le o corpo NDJSON ou CSV (com cabecalho) e retorna as linhas como
+    (numero da linha, dict) e os erros de leitura como (numero da linha, mensagem)
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        parser = _parse_ndjson
+    elif media_type in CSV_TYPES:
+        parser = _parse_csv
+    else:
+        raise UnsupportedBulkFormat(media_type)
+
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("Arquivo deve estar em UTF-8")
+    try:
+        return parser(text)
+    except csv.Error as e:
+        raise ValueError(f"CSV inválido: {e}")
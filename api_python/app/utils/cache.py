@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class TTLCache:
+    """
+    Cache em memoria (por processo) com TTL, limite de tamanho (LRU) e
+    coalescencia de misses: chamadas concorrentes para a mesma chave
+    aguardam uma unica carga em vez de irem todas ao banco.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 30.0, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna o valor valido da chave ou None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.timer():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Grava o valor, descartando as entradas menos usadas acima do limite"""
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[key] = (self.timer() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Retorna do cache ou executa o loader uma unica vez para todos que pediram a chave"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            # A carga foi cancelada junto com a requisicao que a fazia: carrega de novo
+            return await self.get_or_load(key, loader)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            # Evita "exception was never retrieved" quando ninguem aguardava
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelamento (ex.: cliente desconectou) so vale para quem carregava
+            future.cancel()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def clear(self):
+        """Remove todas as entradas"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Retorna contadores de uso do cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits / total) if total > 0 else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl
+        }
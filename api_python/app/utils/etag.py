@@ -0,0 +1,35 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clientes revalidam a cada uso em vez de reaproveitar a copia sem perguntar
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """ETag fraco a partir das partes (versao, id, updated_at...)"""
+    digest = hashlib.blake2b(":".join(str(part) for part in parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o If-None-Match com o ETag (comparacao fraca, aceita lista e *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Resposta 304 (sem corpo) se o cliente ja tem essa versao, senao None"""
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def set_etag(response: Response, etag: str):
+    """Grava o ETag na resposta 200"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
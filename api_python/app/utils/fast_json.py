@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import select
+
+from app.config import config
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+def schema_fields(schema: Type[BaseModel]) -> List[str]:
+    """Campos do schema de resposta, na ordem em que o pydantic os serializa"""
+    return list(schema.model_fields)
+
+def select_columns(model, fields: Sequence[str], extra: Sequence[str] = ("id",)):
+    """
+    SELECT apenas das colunas pedidas (tuplas em vez de objetos ORM).
+    As colunas de extra que nao foram pedidas (id, usado no cursor) vao no fim
+    da tupla e nao entram no JSON.
+    """
+    names = list(fields) + [name for name in extra if name not in fields]
+    return select(*[getattr(model, name) for name in names])
+
+class FieldsParam:
+    """
+    Dependencia do ?fields=a,b (sparse fieldset): retorna os campos pedidos na
+    ordem do schema, ou todos sem o parametro. Campo desconhecido gera 400.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.available = schema_fields(schema)
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Campos separados por virgula (padrao: todos)")
+    ) -> List[str]:
+        if not fields:
+            return self.available
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(self.available)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Campos inválidos: {', '.join(sorted(unknown))}. Disponíveis: {', '.join(self.available)}"
+            )
+        return [name for name in self.available if name in requested]
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Type[BaseModel], fields: Tuple[str, ...], many: bool) -> TypeAdapter:
+    """Validador do schema restrito aos campos pedidos (o proprio schema sem ?fields=)"""
+    model = schema
+    if fields != tuple(schema.model_fields):
+        model = create_model(
+            schema.__name__,
+            **{name: (info.annotation, info) for name, info in schema.model_fields.items() if name in fields}
+        )
+    return TypeAdapter(List[model] if many else model)
+
+def _to_json(schema: Type[BaseModel], fields: Sequence[str], content, many: bool) -> bytes:
+    """
+    Sem FAST_JSON_RESPONSES o conteudo passa pela validacao e serializacao do
+    schema, como no response_model; com ele, os dicts vao direto para o orjson
+    """
+    if not config.FAST_JSON_RESPONSES:
+        adapter = _adapter(schema, tuple(fields), many)
+        content = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return orjson.dumps(content)
+
+def rows_response(schema: Type[BaseModel], fields: Sequence[str], rows, next_cursor: Optional[str] = None) -> Response:
+    """
+    Serializa as tuplas das colunas pedidas como lista JSON, com o cursor no header.
+    O caminho rapido (FAST_JSON_RESPONSES) dispensa o pydantic e gera os mesmos
+    bytes para colunas int/float/str/datetime/enum.
+    """
+    content = _to_json(schema, fields, [dict(zip(fields, row)) for row in rows], many=True)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(content=content, media_type="application/json", headers=headers)
+
+def row_response(schema: Type[BaseModel], fields: Sequence[str], row) -> Response:
+    """Serializa uma tupla (rota de detalhe) como objeto JSON"""
+    return Response(content=_to_json(schema, fields, dict(zip(fields, row)), many=False), media_type="application/json")
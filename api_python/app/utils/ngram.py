@@ -0,0 +1,53 @@
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+def normalize_text(text: str) -> str:
+    """Minusculas e sem acentos ("João" -> "joao")"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de cada palavra com o mesmo preenchimento do pg_trgm ("  p", " pa", ..., "lo ")"""
+    grams = set()
+    for word in _WORD.findall(normalize_text(text)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class NgramIndex:
+    """
+    Indice invertido de trigramas em memoria, usado na busca quando o banco
+    nao tem pg_trgm (SQLite). O score e a fracao dos trigramas da busca
+    presentes no texto, parecido com o word_similarity do Postgres.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Hashable, str]] = ()):
+        self._postings: Dict[str, List[Hashable]] = defaultdict(list)
+        self.size = 0
+        for key, text in entries:
+            self.add(key, text)
+
+    def add(self, key: Hashable, text: str):
+        for gram in trigrams(text):
+            self._postings[gram].append(key)
+        self.size += 1
+
+    def search(self, query: str, limit: int, min_score: float) -> List[Tuple[Hashable, float]]:
+        """As limit chaves com maior score (>= min_score), em ordem decrescente"""
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        counts: Dict[Hashable, int] = defaultdict(int)
+        for gram in grams:
+            for key in self._postings.get(gram, ()):
+                counts[key] += 1
+
+        threshold = min_score * len(grams)
+        matches = ((key, count / len(grams)) for key, count in counts.items() if count >= threshold)
+        return heapq.nsmallest(limit, matches, key=lambda match: (-match[1], match[0]))
@@ -0,0 +1,116 @@
+import base64
+import binascii
+import json
+from typing import Optional, Tuple
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Header com o cursor da proxima pagina (o corpo continua sendo a lista)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: dict) -> str:
+    """Gera o cursor opaco a partir da chave da ultima linha da pagina"""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _is_scalar(value) -> bool:
+    """Valor aceito como chave no cursor: texto ou numero (bool nao)"""
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Le o cursor opaco, levantando ValueError se estiver corrompido: id inteiro
+    e, se a ordenacao nao for por id, o valor da coluna de ordenacao
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(values, dict) or type(values.get("id")) is not int:
+        raise ValueError("Cursor inválido")
+    sort = values.get("sort", "id")
+    if not isinstance(sort, str):
+        raise ValueError("Cursor inválido")
+    if sort.lstrip("-") != "id" and not _is_scalar(values.get("value")):
+        raise ValueError("Cursor inválido")
+    return values
+
+def _matches_column(value, column) -> bool:
+    """Valor do cursor do mesmo tipo da coluna de ordenacao (inteiro vale para float)"""
+    python_type = column.type.python_type
+    if python_type is float:
+        return _is_scalar(value) and not isinstance(value, str)
+    return isinstance(value, python_type) and not isinstance(value, bool)
+
+class PageParams:
+    """Parametros de paginacao por cursor (dependencia das rotas de listagem)"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Cursor retornado no header X-Next-Cursor"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    ):
+        try:
+            self.after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        self.limit = limit
+
+async def paginate(
+    db: AsyncSession,
+    stmt,
+    id_column,
+    after: Optional[dict],
+    limit: int,
+    scalars: bool = True,
+    sort_column=None,
+    descending: bool = False
+) -> Tuple[list, Optional[str]]:
+    """
+    Executa a consulta com keyset em id: WHERE id > :ultimo ORDER BY id LIMIT n+1.
+    Todas as paginas custam o mesmo seek no indice da chave primaria.
+    Com sort_column a ordem e (sort_column, id) e o cursor leva o valor da coluna;
+    descending inverte as duas. A coluna de ordenacao nao pode ser nula.
+    Com scalars=False retorna as linhas (tuplas com coluna id) em vez de objetos ORM.
+    Levanta ValueError se o cursor foi gerado com outra ordenacao ou se o valor
+    nao e do tipo da coluna de ordenacao.
+    """
+    sort = ("-" if descending else "") + (sort_column.key if sort_column is not None else "id")
+    if after is not None:
+        if after.get("sort", "id") != sort:
+            raise ValueError("Cursor gerado com outra ordenação")
+        if sort_column is None:
+            key, last = id_column, after["id"]
+        else:
+            if not _matches_column(after.get("value"), sort_column):
+                raise ValueError("Cursor inválido")
+            # Comparacao de tupla (coluna, id) > (valor, id): vira um seek no indice composto
+            key, last = tuple_(sort_column, id_column), tuple_(after["value"], after["id"])
+        stmt = stmt.where(key < last if descending else key > last)
+
+    order = [id_column] if sort_column is None else [sort_column, id_column]
+    if descending:
+        order = [column.desc() for column in order]
+    result = await db.execute(stmt.order_by(*order).limit(limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        values = {"id": rows[-1].id}
+        if sort != "id":
+            values["sort"] = sort
+        if sort_column is not None:
+            values["value"] = getattr(rows[-1], sort_column.key)
+        next_cursor = encode_cursor(values)
+    return rows, next_cursor
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Publica o cursor da proxima pagina no header da resposta"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -4,9 +4,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select, event, inspect
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.database import get_async_db
 from app.models.user import User
+from app.utils.worker_pool import BoundedThreadPool, PoolOverloaded
 
 # Configuracoes do JWT
 SECRET_KEY = "chave-secreta-para-desenvolvimento-mudar-em-producao"
@@ -16,9 +20,29 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Configuracao do hash de senha
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pool do bcrypt: o hash leva centenas de ms de CPU e nao pode rodar no event loop
+password_hash_pool = BoundedThreadPool(
+    max_workers=config.PASSWORD_HASH_WORKERS,
+    max_queue=config.PASSWORD_HASH_MAX_QUEUE,
+    name="bcrypt"
+)
+
 # OAuth2 com Bearer token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Atributos cuja alteracao invalida os tokens ja emitidos
+AUTH_ATTRIBUTES = ("username", "hashed_password", "is_active", "is_admin")
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target):
+    """
+    Alteracao de username, senha, is_active ou is_admin pelo ORM incrementa
+    token_version: os tokens ja emitidos deixam de valer as claims em todos os workers
+    """
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in AUTH_ATTRIBUTES):
+        target.token_version = User.token_version + 1
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha esta correta"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -27,6 +51,25 @@ def get_password_hash(password: str) -> str:
     """Gera o hash da senha"""
     return pwd_context.hash(password)
 
+async def _run_in_hash_pool(func, *args):
+    """Executa o bcrypt no pool, respondendo 503 quando a fila esta cheia"""
+    try:
+        return await password_hash_pool.run(func, *args)
+    except PoolOverloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
+        )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifica a senha no pool do bcrypt, sem bloquear o event loop"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Gera o hash da senha no pool do bcrypt, sem bloquear o event loop"""
+    return await _run_in_hash_pool(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Cria um token JWT"""
     to_encode = data.copy()
@@ -35,7 +78,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -50,20 +93,59 @@ def authenticate_user(db: Session, username: str, password: str):
         return False
     return user
 
-def verify_token(token: str) -> Optional[str]:
-    """Verifica e decodifica o token JWT"""
+def create_user_token(user: User, expires_delta: Optional[timedelta] = None):
+    """Cria o token do usuario com id, token_version, is_active e is_admin como claims assinadas"""
+    return create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "ver": user.token_version or 0,
+            "active": bool(user.is_active),
+            "admin": bool(user.is_admin)
+        },
+        expires_delta=expires_delta
+    )
+
+def decode_token(token: str) -> Optional[dict]:
+    """Verifica e decodifica o token JWT, retornando as claims"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             return None
-        return username
+        return payload
     except JWTError:
         return None
 
+def verify_token(token: str) -> Optional[str]:
+    """Verifica e decodifica o token JWT"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
+
+async def user_from_claims(db: AsyncSession, payload: dict) -> Optional[User]:
+    """
+    Monta o usuario a partir das claims, conferindo so o token_version pela chave primaria.
+    Retorna None se o token nao tem as claims ou foi emitido antes de uma alteracao do usuario.
+    """
+    if not all(claim in payload for claim in ("uid", "ver", "active", "admin")):
+        return None
+    
+    version = await db.scalar(select(User.token_version).where(User.id == payload["uid"]))
+    if version != payload["ver"]:
+        return None
+    
+    return User(
+        id=payload["uid"],
+        username=payload["sub"],
+        token_version=payload["ver"],
+        is_active=payload["active"],
+        is_admin=payload["admin"]
+    )
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Pega o usuario atual baseado no token"""
     credentials_exception = HTTPException(
@@ -72,11 +154,15 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    username = verify_token(token)
-    if username is None:
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    # Claims assinadas valem enquanto o token_version nao mudar; senao o usuario vem do banco
+    user = await user_from_claims(db, payload)
+    if user is None:
+        key = User.id == payload["uid"] if "uid" in payload else User.username == payload["sub"]
+        user = await db.scalar(select(User).where(key))
     if user is None:
         raise credentials_exception
     
@@ -1,10 +1,36 @@
+import unicodedata
+from typing import Iterable
+import numpy as np
+
+# Pesos dos digitos verificadores
+CPF_WEIGHTS_1 = np.arange(10, 1, -1, dtype=np.int32)
+CPF_WEIGHTS_2 = np.arange(11, 1, -1, dtype=np.int32)
+CNPJ_WEIGHTS_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], dtype=np.int32)
+CNPJ_WEIGHTS_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], dtype=np.int32)
+
+# Bytes ASCII que nao sao digitos (removidos com bytes.translate, em C)
+ASCII_NON_DIGITS = bytes(c for c in range(128) if not chr(c).isdigit())
+
+def normalize_document(document: str) -> str:
+    """
+    Forma normalizada do CPF/CNPJ: so os digitos, em ASCII ("111.444.777-35" -> "11144477735").
+    E o valor gravado em producers.document_digits.
+    """
+    if not document.isascii():
+        # Digitos unicode (raros) viram o digito ASCII equivalente
+        return ''.join(str(unicodedata.digit(char)) for char in document if char.isdigit())
+    if document.isdigit():
+        return document
+    return document.encode("ascii").translate(None, ASCII_NON_DIGITS).decode("ascii")
+
 def validate_cpf(cpf: str) -> bool:
     """
     Valida se o CPF e valido
     """
-    # Remove caracteres nao numericos
-    cpf = ''.join(filter(str.isdigit, cpf))
-    
+    return _validate_cpf_digits(normalize_document(cpf))
+
+def _validate_cpf_digits(cpf: str) -> bool:
+    """Valida um CPF ja normalizado"""
     # Verifica se tem 11 digitos
     if len(cpf) != 11:
         return False
@@ -36,9 +62,10 @@ def validate_cnpj(cnpj: str) -> bool:
     """
     Valida se o CNPJ e valido
     """
-    # Remove caracteres nao numericos
-    cnpj = ''.join(filter(str.isdigit, cnpj))
-    
+    return _validate_cnpj_digits(normalize_document(cnpj))
+
+def _validate_cnpj_digits(cnpj: str) -> bool:
+    """Valida um CNPJ ja normalizado"""
     # Verifica se tem 14 digitos
     if len(cnpj) != 14:
         return False
@@ -72,16 +99,66 @@ def validate_document(document: str) -> bool:
     """
     Valida se e um CPF ou CNPJ valido
     """
-    # Remove caracteres nao numericos
-    clean_doc = ''.join(filter(str.isdigit, document))
-    
-    if len(clean_doc) == 11:
-        return validate_cpf(clean_doc)
-    elif len(clean_doc) == 14:
-        return validate_cnpj(clean_doc)
+    return validate_document_digits(normalize_document(document))
+
+def validate_document_digits(digits: str) -> bool:
+    """
+    Valida um documento ja normalizado por normalize_document, sem limpar de novo.
+    Usado na escrita, onde a normalizacao e feita uma vez so.
+    """
+    if len(digits) == 11:
+        return _validate_cpf_digits(digits)
+    elif len(digits) == 14:
+        return _validate_cnpj_digits(digits)
     else:
         return False
 
+def _digits_matrix(documents: list, length: int) -> np.ndarray:
+    """Converte documentos ASCII de mesmo tamanho em uma matriz uint8 (n x length) de digitos"""
+    raw = np.frombuffer("".join(documents).encode("ascii"), dtype=np.uint8)
+    return raw.reshape(-1, length) - ord("0")
+
+def _validate_cpf_matrix(digits: np.ndarray) -> np.ndarray:
+    """Valida CPFs (uma linha por documento) com produtos escalares por lote"""
+    not_repeated = (digits != digits[:, :1]).any(axis=1)
+
+    digito1 = 11 - (digits[:, :9] @ CPF_WEIGHTS_1) % 11
+    digito1[digito1 >= 10] = 0
+
+    digito2 = 11 - (digits[:, :10] @ CPF_WEIGHTS_2) % 11
+    digito2[digito2 >= 10] = 0
+
+    return not_repeated & (digits[:, 9] == digito1) & (digits[:, 10] == digito2)
+
+def _validate_cnpj_matrix(digits: np.ndarray) -> np.ndarray:
+    """Valida CNPJs (uma linha por documento) com produtos escalares por lote"""
+    not_repeated = (digits != digits[:, :1]).any(axis=1)
+
+    resto = (digits[:, :12] @ CNPJ_WEIGHTS_1) % 11
+    digito1 = np.where(resto < 2, 0, 11 - resto)
+
+    resto = (digits[:, :13] @ CNPJ_WEIGHTS_2) % 11
+    digito2 = np.where(resto < 2, 0, 11 - resto)
+
+    return not_repeated & (digits[:, 12] == digito1) & (digits[:, 13] == digito2)
+
+def validate_documents(documents: Iterable[str]) -> np.ndarray:
+    """
+    Valida um lote de CPFs/CNPJs de uma vez. Retorna uma mascara booleana
+    com o mesmo resultado de validate_document para cada item.
+    """
+    clean_docs = [normalize_document(document) for document in documents]
+    lengths = np.fromiter(map(len, clean_docs), dtype=np.int64, count=len(clean_docs))
+    result = np.zeros(len(clean_docs), dtype=bool)
+
+    for length, validate_matrix in ((11, _validate_cpf_matrix), (14, _validate_cnpj_matrix)):
+        indexes = np.flatnonzero(lengths == length)
+        if indexes.size:
+            digits = _digits_matrix([clean_docs[i] for i in indexes], length)
+            result[indexes] = validate_matrix(digits)
+
+    return result
+
 def format_document(document: str) -> str:
     """
     Formata CPF ou CNPJ para exibicao
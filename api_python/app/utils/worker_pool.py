@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+class PoolOverloaded(Exception):
+    """A fila do pool esta cheia"""
+    pass
+
+class BoundedThreadPool:
+    """
+    Pool de threads para trabalho de CPU chamado a partir do event loop
+    (ex.: bcrypt, que libera o GIL). Limita a fila de espera e mede a latencia.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = "worker", samples: int = 1000):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._samples = deque(maxlen=samples)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Executa a funcao no pool ou levanta PoolOverloaded se a fila estiver cheia"""
+        # in_flight so e alterado no event loop, nao precisa de lock
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PoolOverloaded()
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        job = self._executor.submit(func, *args)
+        self.in_flight += 1
+        # Conta a saida quando o job termina na thread, e nao quando quem aguardava
+        # e cancelado (cliente desconectou): o bcrypt continua ocupando o worker
+        job.add_done_callback(lambda job: loop.call_soon_threadsafe(self._finished, job, start))
+        return await asyncio.wrap_future(job)
+
+    def _finished(self, job: Future, start: float):
+        """Chamado no event loop quando o job sai do pool (concluido ou cancelado ainda na fila)"""
+        self.in_flight -= 1
+        if job.cancelled():
+            return
+        elapsed = time.perf_counter() - start
+        self.completed += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self._samples.append(elapsed)
+
+    def _percentile(self, samples: list, percentile: float) -> float:
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def metrics(self) -> dict:
+        """Retorna fila, rejeicoes e latencia (espera + execucao) em milissegundos"""
+        samples = sorted(self._samples)
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_ms": {
+                "avg": (self.total_seconds / self.completed * 1000) if self.completed else 0.0,
+                "p50": self._percentile(samples, 50) * 1000,
+                "p95": self._percentile(samples, 95) * 1000,
+                "p99": self._percentile(samples, 99) * 1000,
+                "max": self.max_seconds * 1000
+            }
+        }
@@ -1,21 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 from fastapi.security import OAuth2PasswordBearer
 import uvicorn
 
-from app.database import engine, Base
+from app.database import async_engine, get_engine, get_async_engine, get_pool_status
 from app.controllers import producer_router, farm_router, dashboard_router
 from app.controllers.auth_controller import router as auth_router
 from app.controllers.harvest_controller import router as harvest_router
 from app.controllers.crop_controller import router as crop_router
+from app.controllers.export_controller import router as export_router
+from app.controllers.search_controller import router as search_router
+from app.controllers.admin_controller import router as admin_router
 from app.config import config
-from app.init_db import init_database
+from app.utils.security import password_hash_pool
+from app.utils.compression import CompressionMiddleware
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.init_db import check_schema_version
 
-# Inicializar banco e criar usuario admin
-init_database()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migracoes e dados de exemplo rodam fora do boot (python -m app.init_db),
+    # aqui so conferimos a revisao do schema
+    if config.DB_SCHEMA_CHECK:
+        await check_schema_version(async_engine)
+    yield
+    await async_engine.dispose()
 
 # Criar aplicacao
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="API de Produtores Rurais",
     description="Sistema para gerenciar produtores rurais e suas fazendas com autenticação JWT",
     version="2.0.0",
@@ -29,6 +48,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
+)
+
+# Compressao gzip/brotli (inclusive das exportacoes em streaming)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MIN_SIZE,
+    gzip_level=config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
 )
 
 # Adicionar rotas
@@ -38,12 +66,42 @@ app.include_router(farm_router)
 app.include_router(harvest_router)
 app.include_router(crop_router)
 app.include_router(dashboard_router)
+app.include_router(export_router)
+app.include_router(search_router)
+app.include_router(admin_router)
 
 # Rota de health check
 @app.get("/health")
 def health_check():
     return {"status": "OK"}
 
+# Health check do banco com estatisticas do pool
+@app.get("/health/db")
+async def health_check_db(
+    async_bind: AsyncEngine = Depends(get_async_engine),
+    bind: Engine = Depends(get_engine)
+):
+    try:
+        async with async_bind.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        db_status, status_code = "OK", 200
+    except Exception:
+        db_status, status_code = "ERROR", 503
+    
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": db_status,
+            "pool": get_pool_status(async_bind.sync_engine),
+            "sync_pool": get_pool_status(bind)
+        }
+    )
+
+# Metricas do pool de hash de senha (fila, rejeicoes e latencia)
+@app.get("/health/hashing")
+def health_check_hashing():
+    return password_hash_pool.metrics()
+
 # Rota principal
 @app.get("/")
 def root():
@@ -0,0 +1,71 @@
+"""
+Ambiente do Alembic
+Usa a DATABASE_URL da aplicacao, a menos que sqlalchemy.url seja informada
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.config import config as app_config
+from app.database import Base
+import app.models  # noqa: F401 - registra as tabelas no metadata
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+if not config.get_main_option("sqlalchemy.url"):
+    # "%" precisa ser escapado no ConfigParser
+    config.set_main_option("sqlalchemy.url", app_config.DATABASE_URL.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Indices trigram (so no Postgres, migracao 0005) nao estao nos models e ficam fora do autogenerate"""
+    if type_ == "index" and reflected and compare_to is None and name.endswith("_trgm"):
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Gera o SQL das migracoes sem conectar no banco"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplica as migracoes conectado no banco"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+            include_object=include_object
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
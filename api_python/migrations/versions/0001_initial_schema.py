@@ -0,0 +1,108 @@
+"""initial schema
+
+Tabelas como eram criadas pelo create_all. Bancos ja existentes
+criados por create_all devem ser marcados com `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+CROP_TYPES = ('SOJA', 'MILHO', 'ALGODAO', 'CAFE', 'CANA_DE_ACUCAR')
+
+# O tipo e criado uma unica vez (crop_rollups, na migracao 0003, reutiliza)
+crop_type_enum = postgresql.ENUM(*CROP_TYPES, name='croptype', create_type=False)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        postgresql.ENUM(*CROP_TYPES, name='croptype').create(bind, checkfirst=True)
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'producers',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('document', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('document')
+    )
+
+    op.create_table(
+        'farms',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('producer_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('city', sa.String(), nullable=False),
+        sa.Column('state', sa.String(), nullable=False),
+        sa.Column('total_area', sa.Float(), nullable=False),
+        sa.Column('agricultural_area', sa.Float(), nullable=False),
+        sa.Column('vegetation_area', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['producer_id'], ['producers.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'harvests',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('farm_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['farm_id'], ['farms.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'crops',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('harvest_id', sa.Integer(), nullable=False),
+        sa.Column('crop_type', crop_type_enum, nullable=False),
+        sa.Column('planted_area', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['harvest_id'], ['harvests.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('crops')
+    op.drop_table('harvests')
+    op.drop_table('farms')
+    op.drop_table('producers')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_table('users')
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        postgresql.ENUM(name='croptype').drop(bind, checkfirst=True)
@@ -0,0 +1,37 @@
+"""foreign key and filter indexes
+
+Indices nas chaves estrangeiras (listagens por produtor, fazenda e safra)
+e nas colunas filtradas/agrupadas. Os compostos (state, total_area) e
+(crop_type, planted_area) tambem atendem os filtros so por state/crop_type
+e permitem index-only scan nas agregacoes do dashboard.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:30:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_farms_producer_id', 'farms', ['producer_id'])
+    op.create_index('ix_farms_state_total_area', 'farms', ['state', 'total_area'])
+    op.create_index('ix_harvests_farm_id', 'harvests', ['farm_id'])
+    op.create_index('ix_harvests_year', 'harvests', ['year'])
+    op.create_index('ix_crops_harvest_id', 'crops', ['harvest_id'])
+    op.create_index('ix_crops_crop_type_planted_area', 'crops', ['crop_type', 'planted_area'])
+
+
+def downgrade():
+    op.drop_index('ix_crops_crop_type_planted_area', table_name='crops')
+    op.drop_index('ix_crops_harvest_id', table_name='crops')
+    op.drop_index('ix_harvests_year', table_name='harvests')
+    op.drop_index('ix_harvests_farm_id', table_name='harvests')
+    op.drop_index('ix_farms_state_total_area', table_name='farms')
+    op.drop_index('ix_farms_producer_id', table_name='farms')
@@ -0,0 +1,72 @@
+"""rollup tables
+
+Tabelas de rollup do dashboard (por estado e por cultura) e o contador de
+versao por tabela de rollup. O RollupService mantem os rollups e incrementa
+a versao na mesma transacao da escrita; o dashboard monta o ETag a partir
+da versao, respondendo 304 sem ler os rollups.
+
+Ficam fora da 0001 para que bancos criados por create_all, marcados em
+0001, recebam as tabelas no upgrade, ja preenchidas com os totais das
+fazendas e culturas existentes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+CROP_TYPES = ('SOJA', 'MILHO', 'ALGODAO', 'CAFE', 'CANA_DE_ACUCAR')
+
+# Tipo criado na 0001 junto com crops
+crop_type_enum = postgresql.ENUM(*CROP_TYPES, name='croptype', create_type=False)
+
+
+def upgrade():
+    op.create_table(
+        'state_rollups',
+        sa.Column('state', sa.String(), nullable=False),
+        sa.Column('farm_count', sa.Integer(), nullable=False),
+        sa.Column('total_area', sa.Float(), nullable=False),
+        sa.Column('agricultural_area', sa.Float(), nullable=False),
+        sa.Column('vegetation_area', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('state')
+    )
+    op.execute(
+        "INSERT INTO state_rollups (state, farm_count, total_area, agricultural_area, vegetation_area) "
+        "SELECT state, COUNT(*), SUM(total_area), SUM(agricultural_area), SUM(vegetation_area) "
+        "FROM farms GROUP BY state"
+    )
+
+    op.create_table(
+        'crop_rollups',
+        sa.Column('crop_type', crop_type_enum, nullable=False),
+        sa.Column('crop_count', sa.Integer(), nullable=False),
+        sa.Column('total_area', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('crop_type')
+    )
+    op.execute(
+        "INSERT INTO crop_rollups (crop_type, crop_count, total_area) "
+        "SELECT crop_type, COUNT(*), SUM(planted_area) FROM crops GROUP BY crop_type"
+    )
+
+    op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
+    op.drop_table('crop_rollups')
+    op.drop_table('state_rollups')
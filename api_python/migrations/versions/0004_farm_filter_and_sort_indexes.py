@@ -0,0 +1,32 @@
+"""farm filter and sort indexes
+
+Indices dos filtros e ordenacoes da listagem de fazendas: city e
+created_at para os filtros, (name, id) e (total_area, id) para a
+ordenacao com cursor (o id desempata) e para as faixas de area.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_farms_city', 'farms', ['city'])
+    op.create_index('ix_farms_created_at', 'farms', ['created_at'])
+    op.create_index('ix_farms_name_id', 'farms', ['name', 'id'])
+    op.create_index('ix_farms_total_area_id', 'farms', ['total_area', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_farms_total_area_id', table_name='farms')
+    op.drop_index('ix_farms_name_id', table_name='farms')
+    op.drop_index('ix_farms_created_at', table_name='farms')
+    op.drop_index('ix_farms_city', table_name='farms')
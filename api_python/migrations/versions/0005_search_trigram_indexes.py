@@ -0,0 +1,40 @@
+"""search trigram indexes
+
+Indices GIN com gin_trgm_ops para a busca por trecho de nome
+(/api/search): ILIKE '%...%' e o operador <% do pg_trgm usam o indice
+em vez de varrer a tabela. So no Postgres; nos demais bancos a busca usa
+o indice de trigramas em memoria e esta migracao nao faz nada.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ('ix_producers_name_trgm', 'producers', 'name'),
+    ('ix_farms_name_trgm', 'farms', 'name'),
+    ('ix_farms_city_trgm', 'farms', 'city'),
+)
+
+
+def upgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,78 @@
+"""producer document digits
+
+Coluna document_digits com o CPF/CNPJ so com digitos e indice unico.
+A busca por documento e a checagem de duplicados usam esse indice, entao
+"111.444.777-35" e "11144477735" passam a ser o mesmo produtor.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils import normalize_document
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+producers = sa.table('producers', sa.column('id', sa.Integer), sa.column('document', sa.String),
+                     sa.column('document_digits', sa.String))
+
+
+def _backfill():
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute("UPDATE producers SET document_digits = regexp_replace(document, '[^0-9]', '', 'g')")
+        return
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(producers.c.id, producers.c.document)).all()
+    if rows:
+        bind.execute(
+            producers.update().where(producers.c.id == sa.bindparam('producer_id')),
+            [{'producer_id': producer_id, 'document_digits': normalize_document(document)}
+             for producer_id, document in rows]
+        )
+
+
+def _check_duplicates():
+    """Falha com os ids dos produtores repetidos antes de criar o indice unico, em qualquer banco"""
+    if op.get_context().as_sql:
+        return
+
+    repeated = (
+        sa.select(producers.c.document_digits)
+        .group_by(producers.c.document_digits)
+        .having(sa.func.count() > 1)
+    )
+    rows = op.get_bind().execute(
+        sa.select(producers.c.document_digits, producers.c.id)
+        .where(producers.c.document_digits.in_(repeated))
+        .order_by(producers.c.document_digits, producers.c.id)
+    ).all()
+
+    duplicated = {}
+    for digits, producer_id in rows:
+        duplicated.setdefault(digits, []).append(producer_id)
+    if duplicated:
+        raise RuntimeError(f"Produtores com o mesmo documento normalizado (digitos: ids): {duplicated}")
+
+
+def upgrade():
+    op.add_column('producers', sa.Column('document_digits', sa.String(), nullable=True))
+    _backfill()
+    _check_duplicates()
+    with op.batch_alter_table('producers') as batch_op:
+        batch_op.alter_column('document_digits', existing_type=sa.String(), nullable=False)
+    op.create_index('ix_producers_document_digits', 'producers', ['document_digits'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_producers_document_digits', table_name='producers')
+    with op.batch_alter_table('producers') as batch_op:
+        batch_op.drop_column('document_digits')
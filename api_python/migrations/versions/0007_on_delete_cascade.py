@@ -0,0 +1,52 @@
+"""on delete cascade
+
+As FKs farms.producer_id, harvests.farm_id e crops.harvest_id passam a
+ter ON DELETE CASCADE: remover um produtor e um DELETE so e o banco
+remove fazendas, safras e culturas (os relacionamentos usam
+passive_deletes e nao carregam a subarvore). No SQLite as tabelas sao
+recriadas pelo batch mode; a app liga PRAGMA foreign_keys.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 19:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# (tabela, coluna, tabela referenciada)
+FOREIGN_KEYS = (
+    ('farms', 'producer_id', 'producers'),
+    ('harvests', 'farm_id', 'farms'),
+    ('crops', 'harvest_id', 'harvests'),
+)
+
+# Da nome as FKs sem nome da 0001 ao refletir a tabela no batch mode do SQLite
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _constraint_name(table, column, referred):
+    if op.get_context().dialect.name == 'postgresql':
+        return f'{table}_{column}_fkey'
+    return f'fk_{table}_{column}_{referred}'
+
+
+def _replace_foreign_keys(ondelete):
+    for table, column, referred in FOREIGN_KEYS:
+        name = _constraint_name(table, column, referred)
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
@@ -0,0 +1,32 @@
+"""harvest planted area
+
+Total de area plantada por safra (soma das culturas), mantido na escrita.
+A criacao de culturas confere o total contra a area agricultavel da
+fazenda com um UPDATE condicional, sem somar as culturas de novo.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('harvests', sa.Column('planted_area', sa.Float(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE harvests SET planted_area = "
+        "(SELECT COALESCE(SUM(crops.planted_area), 0) FROM crops WHERE crops.harvest_id = harvests.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('harvests') as batch_op:
+        batch_op.drop_column('planted_area')
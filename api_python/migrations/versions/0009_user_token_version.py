@@ -0,0 +1,29 @@
+"""user token version
+
+Versao das credenciais do usuario, incrementada a cada alteracao de
+username, senha, is_active ou is_admin e enviada no token como claim.
+Cada requisicao autenticada confere a versao pela chave primaria, entao
+uma desativacao ou rebaixamento vale em todos os workers na hora.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 21:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
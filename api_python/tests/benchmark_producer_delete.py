@@ -0,0 +1,99 @@
+"""
+Benchmark da remocao de produtor: cascade do ORM x ON DELETE CASCADE do banco
+Uso: python tests/benchmark_producer_delete.py [culturas]
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Adicionar diretorio pai ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, delete, event, func, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import Base, enable_sqlite_foreign_keys
+from app.models import Producer, Farm, Harvest, Crop
+from app.models.crop import CropType
+
+FARMS = 10
+HARVESTS_PER_FARM = 10
+
+def seed(engine, crops: int):
+    """Um produtor com FARMS fazendas, HARVESTS_PER_FARM safras cada e crops culturas no total"""
+    harvests = FARMS * HARVESTS_PER_FARM
+    with Session(engine) as session:
+        session.execute(insert(Producer), [{"document": "11144477735", "name": "Cooperativa"}])
+        session.execute(insert(Farm), [
+            {"producer_id": 1, "name": f"Fazenda {f}", "city": "Cidade", "state": "SP",
+             "total_area": 1000.0, "agricultural_area": 600.0, "vegetation_area": 300.0}
+            for f in range(FARMS)
+        ])
+        session.execute(insert(Harvest), [
+            {"farm_id": f + 1, "year": 2000 + h, "description": f"Safra {2000 + h}"}
+            for f in range(FARMS) for h in range(HARVESTS_PER_FARM)
+        ])
+        session.execute(insert(Crop), [
+            {"harvest_id": c % harvests + 1, "crop_type": CropType.SOJA, "planted_area": 1.0}
+            for c in range(crops)
+        ])
+        session.commit()
+
+def delete_orm(session: Session):
+    """Como antes: a subarvore inteira vai para o Python e cada objeto vira um DELETE"""
+    producer = session.scalars(
+        select(Producer)
+        .where(Producer.id == 1)
+        .options(selectinload(Producer.farms).selectinload(Farm.harvests).selectinload(Harvest.crops))
+    ).one()
+    session.delete(producer)
+    session.commit()
+
+def delete_cascade(session: Session):
+    """Como o ProducerService.delete: um DELETE e o banco remove o resto"""
+    session.execute(delete(Producer).where(Producer.id == 1))
+    session.commit()
+
+def measure(strategy, crops: int, repeat: int = 3):
+    """Menor tempo (segundos) e quantidade de comandos SQL da remocao"""
+    best, statements = None, 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            enable_sqlite_foreign_keys(engine)
+            Base.metadata.create_all(engine)
+            seed(engine, crops)
+
+            # executemany conta uma vez por linha de parametros (um DELETE por objeto)
+            executed = []
+
+            def count(conn, cursor, statement, parameters, context, executemany):
+                executed.append(len(parameters) if executemany else 1)
+
+            event.listen(engine, "before_cursor_execute", count)
+            with Session(engine) as session:
+                start = time.perf_counter()
+                strategy(session)
+                elapsed = time.perf_counter() - start
+            event.remove(engine, "before_cursor_execute", count)
+
+            with Session(engine) as session:
+                assert session.scalar(select(func.count(Crop.id))) == 0, "culturas nao removidas"
+            engine.dispose()
+
+        best = elapsed if best is None else min(best, elapsed)
+        statements = sum(executed)
+    return best, statements
+
+def main(crops: int):
+    orm_time, orm_statements = measure(delete_orm, crops)
+    cascade_time, cascade_statements = measure(delete_cascade, crops)
+
+    print(f"Culturas:          {crops} ({FARMS} fazendas, {FARMS * HARVESTS_PER_FARM} safras)")
+    print(f"Cascade do ORM:    {orm_time * 1000:.1f} ms, {orm_statements} comandos")
+    print(f"ON DELETE CASCADE: {cascade_time * 1000:.1f} ms, {cascade_statements} comandos")
+    print(f"Ganho:             {orm_time / cascade_time:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,52 @@
+"""
+Benchmark da validacao de documentos: laco com validate_document x validate_documents
+Uso: python tests/benchmark_validators.py [quantidade]
+"""
+import sys
+import os
+import random
+import time
+
+# Adicionar diretorio pai ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.validators import validate_document, validate_documents
+
+def generate_documents(count: int, seed: int = 42) -> list:
+    """Gera CPFs e CNPJs aleatorios (formatados e sem formatacao)"""
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        length = 11 if i % 2 == 0 else 14
+        document = "".join(rng.choice("0123456789") for _ in range(length))
+        if i % 3 == 0 and length == 11:
+            document = f"{document[:3]}.{document[3:6]}.{document[6:9]}-{document[9:]}"
+        documents.append(document)
+    return documents
+
+def best_of(func, repeat: int = 3) -> float:
+    """Menor tempo entre as execucoes (segundos)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main(count: int):
+    documents = generate_documents(count)
+
+    scalar = [validate_document(d) for d in documents]
+    vectorized = validate_documents(documents).tolist()
+    assert scalar == vectorized, "validate_documents diverge do validador escalar"
+
+    scalar_time = best_of(lambda: [validate_document(d) for d in documents])
+    vectorized_time = best_of(lambda: validate_documents(documents))
+
+    print(f"Documentos: {count}")
+    print(f"Escalar:    {scalar_time * 1000:.1f} ms")
+    print(f"Vetorizado: {vectorized_time * 1000:.1f} ms")
+    print(f"Ganho:      {scalar_time / vectorized_time:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -2,17 +2,25 @@
 Configuracao dos testes com fixtures
 """
 import pytest
+import pytest_asyncio
 import asyncio
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, NullPool
 
-from app.database import Base, get_db
+from app.config import config
+from app.database import Base, get_db, get_async_db, get_engine, get_async_engine, enable_sqlite_foreign_keys
 from app.models.user import User
+from app.services.dashboard_cache import dashboard_cache
 from app.utils.security import get_password_hash
 from main import app
 
+# O banco de testes e criado por create_all, sem revisao do Alembic
+config.DB_SCHEMA_CHECK = False
+
 # Banco de dados em memoria para testes
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -22,8 +30,16 @@ engine = create_engine(
     poolclass=StaticPool
 )
 
+enable_sqlite_foreign_keys(engine)
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async no mesmo arquivo (NullPool: cada TestClient roda em um event loop proprio)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 def override_get_db():
     """Override da funcao get_db para usar banco de teste"""
     try:
@@ -32,8 +48,16 @@ def override_get_db():
     finally:
         db.close()
 
-# Override da dependencia
+async def override_get_async_db():
+    """Override da funcao get_async_db para usar banco de teste"""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+# Override das dependencias
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_engine] = lambda: engine
+app.dependency_overrides[get_async_engine] = lambda: async_engine
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -42,6 +66,13 @@ def event_loop():
     yield loop
     loop.close()
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Cada teste comeca com o cache do dashboard vazio"""
+    dashboard_cache.clear()
+    yield
+    dashboard_cache.clear()
+
 @pytest.fixture(scope="function")
 def db():
     """Fixture do banco de dados de teste"""
@@ -56,6 +87,36 @@ def db():
         # Limpar tabelas apos cada teste
         Base.metadata.drop_all(bind=engine)
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db(db):
+    """Sessao async do banco de teste (tabelas criadas pela fixture db)"""
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+@pytest.fixture
+def capture_sql():
+    """
+    Context manager que guarda (SQL, parametros) dos comandos executados na
+    engine da sessao. Com prefix, so os que comecam com ele (ex.: "DELETE" ou
+    ("INSERT", "UPDATE")).
+    """
+    @contextmanager
+    def capture(session, prefix=None):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if prefix is None or statement.lstrip().upper().startswith(prefix):
+                statements.append((statement, parameters))
+
+        engine = session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return capture
+
 @pytest.fixture(scope="function")
 def client():
     """Cliente de teste da API"""
@@ -5,9 +5,11 @@ Este arquivo garante 100% de cobertura de rotas
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db, get_engine, get_async_engine
 from app.models.user import User
 from app.models.producer import Producer
 from app.models.farm import Farm
@@ -20,6 +22,8 @@ from main import app
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_complete.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_complete.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 def override_get_db():
     try:
@@ -28,7 +32,14 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_engine] = lambda: engine
+app.dependency_overrides[get_async_engine] = lambda: async_engine
 
 @pytest.fixture(scope="module")
 def setup_database():
@@ -606,6 +617,34 @@ class TestUtilityRoutes:
         assert response.status_code == 200
         assert response.json()["status"] == "OK"
     
+    def test_health_check_db(self, client):
+        """GET /health/db"""
+        response = client.get("/health/db")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "OK"
+        assert "pool_class" in data["pool"]
+        assert "pool_class" in data["sync_pool"]
+    
+    def test_health_check_db_unavailable(self, client):
+        """GET /health/db com o banco fora do ar responde 503"""
+        unreachable = create_async_engine("sqlite+aiosqlite:///./missing/dir/health.db", poolclass=NullPool)
+        app.dependency_overrides[get_async_engine] = lambda: unreachable
+        try:
+            response = client.get("/health/db")
+        finally:
+            app.dependency_overrides[get_async_engine] = lambda: async_engine
+        assert response.status_code == 503
+        assert response.json()["status"] == "ERROR"
+    
+    def test_health_check_hashing(self, client):
+        """GET /health/hashing"""
+        response = client.get("/health/hashing")
+        assert response.status_code == 200
+        data = response.json()
+        assert "in_flight" in data
+        assert "latency_ms" in data
+    
     def test_root_endpoint(self, client):
         """GET /"""
         response = client.get("/")
@@ -761,6 +800,7 @@ def count_tested_routes():
             "GET /api/crops/type/{crop_type}"
         ],
         "Dashboard": [
+            "GET /api/dashboard/overview",
             "GET /api/dashboard/summary",
             "GET /api/dashboard/by-state",
             "GET /api/dashboard/by-crop",
@@ -768,6 +808,8 @@ def count_tested_routes():
         ],
         "Utility": [
             "GET /health",
+            "GET /health/db",
+            "GET /health/hashing",
             "GET /",
             "GET /docs",
             "GET /openapi.json"
@@ -0,0 +1,120 @@
+"""
+Testes de integracao da criacao em lote de safras e culturas
+"""
+from itertools import groupby
+
+import pytest
+from sqlalchemy import insert, select, func
+
+from app.config import config
+from app.models import Producer, Farm, Harvest, Crop
+from app.schemas import CropBase, HarvestBatchItem
+from app.services import HarvestService, DashboardService, RollupService
+
+
+def tables(inserts):
+    """Tabela de cada INSERT capturado"""
+    return [statement.split()[2].strip('"') for statement, _ in inserts]
+
+
+@pytest.fixture
+def farm(db):
+    db.execute(insert(Producer), [{"document": "11144477735", "name": "Cooperativa"}])
+    db.execute(insert(Farm), [{
+        "producer_id": 1, "name": "Fazenda Grande", "city": "Sorriso", "state": "MT",
+        "total_area": 10000.0, "agricultural_area": 8000.0, "vegetation_area": 1500.0
+    }])
+    db.execute(insert(Harvest), [{"farm_id": 1, "year": 2024, "description": "Safra 2024"}])
+    RollupService.rebuild(db)
+    db.commit()
+    return 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestHarvestService:
+
+    async def test_create_crops_single_insert(self, async_db, farm, capture_sql):
+        crops = [CropBase(crop_type=crop_type, planted_area=10.0 + i)
+                 for i, crop_type in enumerate(["SOJA", "MILHO", "SOJA", "CAFE"] * 25)]
+
+        with capture_sql(async_db, "INSERT INTO") as inserts:
+            created = await HarvestService.create_crops(async_db, 1, crops)
+
+        # RETURNING ordenado: um INSERT no Postgres; o SQLite nao garante a ordem e vai linha a linha
+        if async_db.bind.dialect.name == "postgresql":
+            assert tables(inserts).count("crops") == 1
+        assert [crop.planted_area for crop in created] == [crop.planted_area for crop in crops]
+        assert all(crop.id and crop.harvest_id == 1 for crop in created)
+
+    async def test_create_harvests_nested(self, async_db, farm, capture_sql):
+        harvests = [
+            HarvestBatchItem(year=2025, description="Safra 2025", crops=[
+                CropBase(crop_type="SOJA", planted_area=100.0), CropBase(crop_type="MILHO", planted_area=50.0)
+            ]),
+            HarvestBatchItem(year=2026, description="Safra 2026"),
+            HarvestBatchItem(year=2027, description="Safra 2027", crops=[CropBase(crop_type="CAFE", planted_area=20.0)]),
+        ]
+
+        with capture_sql(async_db, "INSERT INTO") as inserts:
+            created = await HarvestService.create_harvests(async_db, farm, harvests)
+
+        assert [table for table, _ in groupby(tables(inserts)) if table in ("harvests", "crops")] == ["harvests", "crops"]
+        assert [h.year for h in created] == [2025, 2026, 2027]
+        assert [[c.planted_area for c in h.crops] for h in created] == [[100.0, 50.0], [], [20.0]]
+        assert await async_db.scalar(select(func.count(Crop.id))) == 3
+
+    async def test_rollups_match_rebuild(self, async_db, db, farm):
+        await HarvestService.create_crops(async_db, 1, [
+            CropBase(crop_type="SOJA", planted_area=10.0), CropBase(crop_type="SOJA", planted_area=5.0),
+            CropBase(crop_type="MILHO", planted_area=7.5),
+        ])
+        incremental = await DashboardService.get_crop_distribution(async_db)
+
+        RollupService.rebuild(db)
+        db.commit()
+        assert await DashboardService.get_crop_distribution(async_db) == incremental
+        assert {(c.crop_type, c.total_area) for c in incremental} == {("SOJA", 15.0), ("MILHO", 7.5)}
+
+    async def test_missing_parent(self, async_db, farm):
+        assert await HarvestService.create_crops(async_db, 999, [CropBase(crop_type="SOJA", planted_area=1.0)]) is None
+        assert await HarvestService.create_harvests(async_db, 999, [HarvestBatchItem(year=2025, description="X")]) is None
+        assert await async_db.scalar(select(func.count(Crop.id))) == 0
+
+
+@pytest.mark.integration
+class TestBatchRoutes:
+
+    def test_crops_batch(self, client, auth_headers_admin, farm):
+        response = client.post("/api/harvests/1/crops:batch", headers=auth_headers_admin, json={"crops": [
+            {"crop_type": "SOJA", "planted_area": 100.0}, {"crop_type": "MILHO", "planted_area": 50.0}
+        ]})
+        assert response.status_code == 201
+        assert [(c["crop_type"], c["harvest_id"]) for c in response.json()] == [("SOJA", 1), ("MILHO", 1)]
+
+    def test_harvests_batch(self, client, auth_headers_admin, farm):
+        response = client.post("/api/farms/1/harvests:batch", headers=auth_headers_admin, json={"harvests": [
+            {"year": 2025, "description": "Safra 2025", "crops": [{"crop_type": "SOJA", "planted_area": 100.0}]},
+            {"year": 2026, "description": "Safra 2026"},
+        ]})
+        assert response.status_code == 201
+        body = response.json()
+        assert [(h["year"], len(h["crops"])) for h in body] == [(2025, 1), (2026, 0)]
+        assert body[0]["crops"][0]["harvest_id"] == body[0]["id"]
+
+    def test_validation(self, client, auth_headers_admin, farm):
+        assert client.post("/api/harvests/1/crops:batch", headers=auth_headers_admin,
+                           json={"crops": []}).status_code == 422
+        assert client.post("/api/harvests/1/crops:batch", headers=auth_headers_admin,
+                           json={"crops": [{"crop_type": "SOJA", "planted_area": 0}]}).status_code == 422
+        assert client.post("/api/harvests/999/crops:batch", headers=auth_headers_admin,
+                           json={"crops": [{"crop_type": "SOJA", "planted_area": 1.0}]}).status_code == 404
+        assert client.post("/api/farms/999/harvests:batch", headers=auth_headers_admin,
+                           json={"harvests": [{"year": 2025, "description": "X"}]}).status_code == 404
+
+    def test_too_many_items(self, client, auth_headers_admin, farm, monkeypatch):
+        monkeypatch.setattr(config, "BATCH_CREATE_MAX_ITEMS", 2)
+        response = client.post("/api/farms/1/harvests:batch", headers=auth_headers_admin, json={"harvests": [
+            {"year": 2025, "description": "Safra 2025", "crops": [{"crop_type": "SOJA", "planted_area": 1.0}] * 2}
+        ]})
+        assert response.status_code == 413
@@ -0,0 +1,85 @@
+"""
+Testes de integracao da remocao em cascata pelo banco (ON DELETE CASCADE + passive_deletes)
+"""
+import pytest
+from sqlalchemy import insert, select, func
+
+from app.models import Producer, Farm, Harvest, Crop
+from app.models.crop import CropType
+from app.services import ProducerService, DashboardService, RollupService
+
+
+@pytest.fixture
+def seeded(db):
+    """Produtor 1 com 2 fazendas x 3 safras x 5 culturas; produtor 2 com uma cultura so"""
+    db.execute(insert(Producer), [
+        {"document": "11144477735", "name": "Cooperativa"},
+        {"document": "12345678909", "name": "Vizinho"},
+    ])
+    db.execute(insert(Farm), [
+        {"producer_id": producer_id, "name": f"Fazenda {state}", "city": "Cidade", "state": state,
+         "total_area": 1000.0, "agricultural_area": 600.0, "vegetation_area": 300.0}
+        for producer_id, state in ((1, "SP"), (1, "MG"), (2, "SP"))
+    ])
+    db.execute(insert(Harvest), [
+        {"farm_id": farm_id, "year": 2020 + h, "description": f"Safra {2020 + h}"}
+        for farm_id in (1, 2) for h in range(3)
+    ] + [{"farm_id": 3, "year": 2024, "description": "Safra 2024"}])
+    db.execute(insert(Crop), [
+        {"harvest_id": harvest_id, "crop_type": CropType.SOJA if c % 2 else CropType.MILHO, "planted_area": 10.0}
+        for harvest_id in range(1, 7) for c in range(5)
+    ] + [{"harvest_id": 7, "crop_type": CropType.CAFE, "planted_area": 50.0}])
+    RollupService.rebuild(db)
+    db.commit()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestProducerCascadeDelete:
+
+    async def test_single_delete_statement(self, async_db, seeded, capture_sql):
+        with capture_sql(async_db, "DELETE") as deletes:
+            assert await ProducerService.delete(async_db, 1) is True
+
+        tree_deletes = [s for s, _ in deletes if any(f" {t}" in s for t in ("producers", "farms", "harvests", "crops"))]
+        assert len(tree_deletes) == 1 and "producers" in tree_deletes[0], deletes
+
+        counts = [
+            await async_db.scalar(select(func.count()).select_from(model))
+            for model in (Producer, Farm, Harvest, Crop)
+        ]
+        assert counts == [1, 1, 1, 1]
+
+    async def test_rollups_match_rebuild(self, async_db, db, seeded):
+        await ProducerService.delete(async_db, 1)
+        incremental = await DashboardService.get_overview(async_db)
+
+        db.expire_all()
+        RollupService.rebuild(db)
+        db.commit()
+        assert await DashboardService.get_overview(async_db) == incremental
+        assert incremental.summary.total_farms == 1
+        assert [(c.crop_type, c.total_area) for c in incremental.by_crop] == [("CAFE", 50.0)]
+
+    async def test_loaded_children_not_stale(self, async_db, seeded):
+        """Objetos ja carregados na sessao nao sobrevivem ao DELETE feito pelo banco"""
+        assert await async_db.get(Farm, 1) is not None
+        await ProducerService.delete(async_db, 1)
+        assert await async_db.get(Farm, 1) is None
+
+    async def test_missing_producer(self, async_db, seeded):
+        assert await ProducerService.delete(async_db, 999) is False
+        assert await async_db.scalar(select(func.count(Crop.id))) == 31
+
+
+@pytest.mark.integration
+class TestCascadeDeleteRoutes:
+
+    def test_harvest_delete_removes_crops(self, client, auth_headers_admin, db, seeded):
+        assert client.delete("/api/harvests/1", headers=auth_headers_admin).status_code == 204
+        assert db.scalar(select(func.count(Crop.id)).where(Crop.harvest_id == 1)) == 0
+
+    def test_farm_delete_removes_subtree(self, client, auth_headers_admin, db, seeded):
+        assert client.delete("/api/farms/1", headers=auth_headers_admin).status_code == 204
+        assert db.scalar(select(func.count(Harvest.id)).where(Harvest.farm_id == 1)) == 0
+        assert db.scalar(select(func.count(Crop.id))) == 31 - 15
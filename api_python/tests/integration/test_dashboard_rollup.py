@@ -0,0 +1,171 @@
+"""
+Testes de integracao dos rollups do dashboard
+Os rollups devem bater com as agregacoes feitas direto nas tabelas de origem
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import Farm, Crop, Harvest, StateRollup
+from app.models.crop import CropType
+from app.schemas import ProducerCreate, FarmCreate, FarmUpdate
+from app.services import ProducerService, FarmService, DashboardService, RollupService
+
+
+async def create_farm(db, producer_id, state, total_area=1000.0, agricultural_area=600.0, vegetation_area=300.0):
+    """Cria uma fazenda pelo service"""
+    return await FarmService.create(db, FarmCreate(
+        producer_id=producer_id,
+        name=f"Fazenda {state}",
+        city="Cidade",
+        state=state,
+        total_area=total_area,
+        agricultural_area=agricultural_area,
+        vegetation_area=vegetation_area
+    ))
+
+
+async def create_crop(db, farm_id, crop_type, planted_area):
+    """Cria safra e cultura com atualizacao do rollup"""
+    harvest = Harvest(farm_id=farm_id, year=2024, description="Safra 2024")
+    db.add(harvest)
+    await db.flush()
+    crop = Crop(harvest_id=harvest.id, crop_type=crop_type, planted_area=planted_area)
+    db.add(crop)
+    await RollupService.crop_created(db, crop)
+    await db.commit()
+    return harvest, crop
+
+
+@pytest.fixture
+def producer_data():
+    return ProducerCreate(document="11144477735", name="Produtor Rollup")
+
+
+class TestDashboardRollup:
+    """Testes da manutencao incremental dos rollups"""
+
+    @pytest.mark.integration
+    @pytest.mark.dashboard
+    @pytest.mark.asyncio
+    async def test_empty_dashboard(self, async_db):
+        """Dashboard vazio sem rollups"""
+        summary = await DashboardService.get_summary(async_db)
+        assert summary.total_farms == 0
+        assert summary.total_area == 0.0
+        assert await DashboardService.get_state_distribution(async_db) == []
+        assert await DashboardService.get_crop_distribution(async_db) == []
+
+    @pytest.mark.integration
+    @pytest.mark.dashboard
+    @pytest.mark.asyncio
+    async def test_farm_create_update_delete(self, async_db, producer_data):
+        """Rollup por estado acompanha criacao, mudanca de estado e remocao"""
+        producer = await ProducerService.create(async_db, producer_data)
+        sp = await create_farm(async_db, producer.id, "SP", 1000.0, 600.0, 300.0)
+        await create_farm(async_db, producer.id, "MG", 500.0, 200.0, 100.0)
+
+        summary = await DashboardService.get_summary(async_db)
+        assert summary.total_farms == 2
+        assert summary.total_area == 1500.0
+
+        await FarmService.update(async_db, sp.id, FarmUpdate(state="MG", total_area=2000.0))
+        states = await DashboardService.get_state_distribution(async_db)
+        assert [(s.state, s.count) for s in states] == [("MG", 2)]
+
+        land_use = await DashboardService.get_land_use_distribution(async_db)
+        assert land_use.agricultural_area == 800.0
+        assert land_use.vegetation_area == 400.0
+
+        await FarmService.delete(async_db, sp.id)
+        summary = await DashboardService.get_summary(async_db)
+        assert summary.total_farms == 1
+        assert summary.total_area == 500.0
+
+    @pytest.mark.integration
+    @pytest.mark.dashboard
+    @pytest.mark.asyncio
+    async def test_concurrent_farm_updates(self, async_db, producer_data):
+        """Updates simultaneos da mesma fazenda nao descontam os valores antigos duas vezes"""
+        producer = await ProducerService.create(async_db, producer_data)
+        farm = await create_farm(async_db, producer.id, "SP", 1000.0, 600.0, 300.0)
+        await create_farm(async_db, producer.id, "MG", 500.0, 200.0, 100.0)
+
+        sessions = async_sessionmaker(bind=async_db.bind, autoflush=False, expire_on_commit=False)
+
+        async def update(state, total_area):
+            async with sessions() as db:
+                await FarmService.update(db, farm.id, FarmUpdate(state=state, total_area=total_area))
+
+        await asyncio.gather(*(
+            update(state, 1000.0 + i * 100) for i, state in enumerate(["GO", "MT", "BA", "GO", "PR", "MT"])
+        ))
+
+        rollups = (await async_db.execute(
+            select(StateRollup.state, StateRollup.farm_count, StateRollup.total_area).order_by(StateRollup.state)
+        )).all()
+        expected = (await async_db.execute(
+            select(Farm.state, func.count(Farm.id), func.sum(Farm.total_area)).group_by(Farm.state).order_by(Farm.state)
+        )).all()
+        assert [tuple(row) for row in rollups] == [tuple(row) for row in expected]
+
+    @pytest.mark.integration
+    @pytest.mark.dashboard
+    @pytest.mark.asyncio
+    async def test_cascading_deletes_remove_crops(self, async_db, producer_data):
+        """Remover fazenda ou produtor tira as culturas da subarvore do rollup"""
+        producer = await ProducerService.create(async_db, producer_data)
+        farm_a = await create_farm(async_db, producer.id, "SP")
+        farm_b = await create_farm(async_db, producer.id, "GO")
+        await create_crop(async_db, farm_a.id, CropType.SOJA, 100.0)
+        await create_crop(async_db, farm_b.id, CropType.SOJA, 50.0)
+        await create_crop(async_db, farm_b.id, CropType.MILHO, 30.0)
+
+        crops = await DashboardService.get_crop_distribution(async_db)
+        assert {c.crop_type: c.total_area for c in crops} == {"MILHO": 30.0, "SOJA": 150.0}
+
+        await FarmService.delete(async_db, farm_a.id)
+        crops = await DashboardService.get_crop_distribution(async_db)
+        assert {c.crop_type: c.total_area for c in crops} == {"MILHO": 30.0, "SOJA": 50.0}
+
+        await ProducerService.delete(async_db, producer.id)
+        assert await DashboardService.get_crop_distribution(async_db) == []
+        assert await DashboardService.get_state_distribution(async_db) == []
+
+    @pytest.mark.integration
+    @pytest.mark.dashboard
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_source_tables(self, async_db, producer_data):
+        """Rebuild recalcula os mesmos totais das tabelas de origem"""
+        producer = await ProducerService.create(async_db, producer_data)
+        farm = await create_farm(async_db, producer.id, "MT", 3000.0, 2000.0, 800.0)
+        await create_crop(async_db, farm.id, CropType.ALGODAO, 700.0)
+
+        incremental = await DashboardService.get_crop_distribution(async_db)
+        await async_db.run_sync(RollupService.rebuild)
+        await async_db.commit()
+        rebuilt = await DashboardService.get_crop_distribution(async_db)
+        assert incremental == rebuilt
+
+        farm_total = await async_db.scalar(select(func.sum(Farm.total_area)))
+        summary = await DashboardService.get_summary(async_db)
+        assert summary.total_area == farm_total
+
+    @pytest.mark.integration
+    @pytest.mark.dashboard
+    @pytest.mark.asyncio
+    async def test_overview_matches_widgets(self, async_db, producer_data):
+        """Overview devolve exatamente os mesmos payloads dos endpoints individuais"""
+        producer = await ProducerService.create(async_db, producer_data)
+        farm = await create_farm(async_db, producer.id, "SP", 1000.0, 600.0, 300.0)
+        await create_farm(async_db, producer.id, "BA", 400.0, 100.0, 250.0)
+        await create_crop(async_db, farm.id, CropType.CAFE, 200.0)
+
+        overview = await DashboardService.get_overview(async_db)
+
+        assert overview.summary == await DashboardService.get_summary(async_db)
+        assert overview.by_state == await DashboardService.get_state_distribution(async_db)
+        assert overview.land_use == await DashboardService.get_land_use_distribution(async_db)
+        assert overview.by_crop == await DashboardService.get_crop_distribution(async_db)
@@ -0,0 +1,193 @@
+"""
+Testes de integracao dos GETs condicionais (ETag / If-None-Match)
+"""
+import pytest
+
+from app.models import Harvest, Crop
+from app.models.crop import CropType
+from app.schemas import ProducerCreate, FarmCreate, FarmUpdate, CropBase
+from app.services import ProducerService, FarmService, DashboardService, DashboardCache, RollupService, HarvestService
+
+
+@pytest.fixture
+def producer_data():
+    return ProducerCreate(document="11144477735", name="Produtor ETag")
+
+
+async def create_farm(db, producer_id, state="SP"):
+    return await FarmService.create(db, FarmCreate(
+        producer_id=producer_id, name=f"Fazenda {state}", city="Cidade", state=state,
+        total_area=1000.0, agricultural_area=600.0, vegetation_area=300.0
+    ))
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestTableVersions:
+    """Versoes das tabelas de rollup incrementadas junto com as escritas"""
+
+    async def test_starts_at_zero(self, async_db):
+        assert await RollupService.versions(async_db, RollupService.STATE_TABLE, RollupService.CROP_TABLE) == (0, 0)
+
+    async def test_farm_writes_bump_state_version(self, async_db, producer_data):
+        producer = await ProducerService.create(async_db, producer_data)
+        farm = await create_farm(async_db, producer.id)
+        (after_create,) = await RollupService.versions(async_db, RollupService.STATE_TABLE)
+        assert after_create > 0
+
+        await FarmService.update(async_db, farm.id, FarmUpdate(state="MG"))
+        (after_update,) = await RollupService.versions(async_db, RollupService.STATE_TABLE)
+        assert after_update > after_create
+
+        # Cultura nao muda os rollups por estado
+        harvest = Harvest(farm_id=farm.id, year=2024, description="Safra 2024")
+        async_db.add(harvest)
+        await async_db.flush()
+        crop = Crop(harvest_id=harvest.id, crop_type=CropType.SOJA, planted_area=100.0)
+        async_db.add(crop)
+        await RollupService.crop_created(async_db, crop)
+        await async_db.commit()
+        assert await RollupService.versions(async_db, RollupService.STATE_TABLE, RollupService.CROP_TABLE) == (after_update, 1)
+
+        await FarmService.delete(async_db, farm.id)
+        state_version, crop_version = await RollupService.versions(
+            async_db, RollupService.STATE_TABLE, RollupService.CROP_TABLE
+        )
+        assert state_version > after_update
+        assert crop_version > 1
+
+    async def test_one_bump_per_transaction(self, async_db, producer_data, capture_sql):
+        """Lote com varios tipos de cultura: uma escrita em table_versions, a ultima antes do commit"""
+        producer = await ProducerService.create(async_db, producer_data)
+        farm = await create_farm(async_db, producer.id)
+        async_db.add(Harvest(farm_id=farm.id, year=2024, description="Safra 2024"))
+        await async_db.commit()
+
+        crops = [CropBase(crop_type=crop_type, planted_area=10.0) for crop_type in ("SOJA", "MILHO", "CAFE")]
+        await HarvestService.create_crops(async_db, 1, crops)
+        assert await RollupService.versions(async_db, RollupService.CROP_TABLE) == (1,)
+
+        with capture_sql(async_db, ("INSERT", "UPDATE")) as writes:
+            await HarvestService.create_crops(async_db, 1, crops)
+
+        version_writes = [i for i, (statement, _) in enumerate(writes) if "table_versions" in statement]
+        assert version_writes == [len(writes) - 1]
+        assert await RollupService.versions(async_db, RollupService.CROP_TABLE) == (2,)
+
+    async def test_rollback_discards_bump(self, async_db, producer_data):
+        await ProducerService.create(async_db, producer_data)
+        RollupService._touch(async_db, RollupService.STATE_TABLE)
+        await async_db.rollback()
+        await async_db.commit()
+        assert await RollupService.versions(async_db, RollupService.STATE_TABLE) == (0,)
+
+    async def test_rebuild_bumps_versions(self, async_db):
+        before = await RollupService.versions(async_db, RollupService.STATE_TABLE, RollupService.CROP_TABLE)
+        await async_db.run_sync(RollupService.rebuild)
+        await async_db.commit()
+        after = await RollupService.versions(async_db, RollupService.STATE_TABLE, RollupService.CROP_TABLE)
+        assert all(a > b for a, b in zip(after, before))
+
+    async def test_cache_follows_version(self, async_db, producer_data):
+        """Uma escrita muda a chave do cache, sem precisar invalidar"""
+        producer = await ProducerService.create(async_db, producer_data)
+        await create_farm(async_db, producer.id)
+        versions = await DashboardCache.versions(async_db, "summary")
+        assert (await DashboardCache.get_summary(async_db, versions)).total_farms == 1
+
+        await create_farm(async_db, producer.id, state="MG")
+        versions = await DashboardCache.versions(async_db, "summary")
+        assert (await DashboardCache.get_summary(async_db, versions)).total_farms == 2
+
+
+@pytest.mark.integration
+class TestConditionalDashboard:
+    """304 no dashboard sem ler os rollups"""
+
+    @pytest.mark.parametrize("path", [
+        "/api/dashboard/overview", "/api/dashboard/summary", "/api/dashboard/by-state",
+        "/api/dashboard/land-use", "/api/dashboard/by-crop"
+    ])
+    def test_not_modified(self, client, auth_headers_admin, path, monkeypatch):
+        first = client.get(path, headers=auth_headers_admin)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        # Nenhuma agregacao pode rodar no 304
+        def fail(*args, **kwargs):
+            raise AssertionError("agregacao executada")
+        for name in ("get_overview", "get_summary", "get_state_distribution",
+                     "get_land_use_distribution", "get_crop_distribution"):
+            monkeypatch.setattr(DashboardService, name, fail)
+
+        second = client.get(path, headers={**auth_headers_admin, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_write_changes_etag(self, client, auth_headers_admin):
+        etag = client.get("/api/dashboard/summary", headers=auth_headers_admin).headers["etag"]
+        crop_etag = client.get("/api/dashboard/by-crop", headers=auth_headers_admin).headers["etag"]
+
+        producer = client.post("/api/producers/", json={"document": "11144477735", "name": "Produtor"}, headers=auth_headers_admin).json()
+        client.post("/api/farms/", json={
+            "producer_id": producer["id"], "name": "Fazenda", "city": "Cidade", "state": "SP",
+            "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0
+        }, headers=auth_headers_admin)
+
+        response = client.get("/api/dashboard/summary", headers={**auth_headers_admin, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total_farms"] == 1
+        assert response.headers["etag"] != etag
+
+        # Fazenda nao muda a distribuicao por cultura
+        response = client.get("/api/dashboard/by-crop", headers={**auth_headers_admin, "If-None-Match": crop_etag})
+        assert response.status_code == 304
+
+    def test_cache_stats_admin_only(self, client, auth_headers_admin, auth_headers_user):
+        assert client.get("/api/dashboard/cache/stats").status_code == 401
+        assert client.get("/api/dashboard/cache/stats", headers=auth_headers_user).status_code == 403
+
+        response = client.get("/api/dashboard/cache/stats", headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert {"hits", "misses", "coalesced"} <= set(response.json())
+
+
+@pytest.mark.integration
+class TestConditionalDetail:
+    """ETag pelo updated_at em GET /api/producers/{id} e /api/farms/{id}"""
+
+    def test_producer(self, client, auth_headers_admin):
+        producer = client.post("/api/producers/", json={"document": "11144477735", "name": "Produtor"}, headers=auth_headers_admin).json()
+        path = f"/api/producers/{producer['id']}"
+
+        first = client.get(path, headers=auth_headers_admin)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        assert client.get(path, headers={**auth_headers_admin, "If-None-Match": etag}).status_code == 304
+
+        client.put(path, json={"name": "Produtor Renomeado"}, headers=auth_headers_admin)
+        response = client.get(path, headers={**auth_headers_admin, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Produtor Renomeado"
+        assert response.headers["etag"] != etag
+
+    def test_farm(self, client, auth_headers_admin):
+        producer = client.post("/api/producers/", json={"document": "11144477735", "name": "Produtor"}, headers=auth_headers_admin).json()
+        farm = client.post("/api/farms/", json={
+            "producer_id": producer["id"], "name": "Fazenda", "city": "Cidade", "state": "SP",
+            "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0
+        }, headers=auth_headers_admin).json()
+        path = f"/api/farms/{farm['id']}"
+
+        etag = client.get(path, headers=auth_headers_admin).headers["etag"]
+        assert client.get(path, headers={**auth_headers_admin, "If-None-Match": etag}).status_code == 304
+
+        client.put(path, json={"name": "Fazenda Nova"}, headers=auth_headers_admin)
+        assert client.get(path, headers={**auth_headers_admin, "If-None-Match": etag}).status_code == 200
+
+    def test_missing_is_404(self, client, auth_headers_admin):
+        response = client.get("/api/producers/999999", headers={**auth_headers_admin, "If-None-Match": "*"})
+        assert response.status_code == 404
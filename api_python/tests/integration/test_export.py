@@ -0,0 +1,153 @@
+"""
+Testes de integracao da exportacao em streaming
+"""
+import csv
+import io
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import pytest_asyncio
+
+from app.config import config
+from app.models import Harvest, Crop
+from app.models.crop import CropType
+from app.schemas import ProducerCreate, FarmCreate
+from app.services import ProducerService, FarmService, ExportService
+
+
+async def collect(stream) -> str:
+    """Junta os blocos enviados pelo gerador"""
+    return "".join([chunk async for chunk in stream])
+
+
+async def collect_bytes(stream) -> bytes:
+    """Junta os blocos binarios enviados pelo gerador"""
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Blocos pequenos para a exportacao passar por varias particoes"""
+    monkeypatch.setattr(config, "EXPORT_BATCH_SIZE", 2)
+
+
+@pytest_asyncio.fixture
+async def tree(async_db):
+    """Dois produtores: um com fazenda/safras/culturas e um sem fazendas"""
+    producer = await ProducerService.create(async_db, ProducerCreate(document="11144477735", name="Com Fazenda"))
+    await ProducerService.create(async_db, ProducerCreate(document="12345678909", name="Sem Fazenda"))
+    farm = await FarmService.create(async_db, FarmCreate(
+        producer_id=producer.id, name="Fazenda", city="Cidade", state="GO",
+        total_area=100.0, agricultural_area=60.0, vegetation_area=30.0
+    ))
+    for year in (2023, 2024):
+        harvest = Harvest(farm_id=farm.id, year=year, description=f"Safra {year}")
+        async_db.add(harvest)
+        await async_db.flush()
+        async_db.add_all([
+            Crop(harvest_id=harvest.id, crop_type=CropType.SOJA, planted_area=20.0),
+            Crop(harvest_id=harvest.id, crop_type=CropType.MILHO, planted_area=10.0),
+        ])
+    await async_db.commit()
+    return producer
+
+
+class TestExportService:
+    """Testes da exportacao por entidade e da arvore"""
+    
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_entity_csv(self, async_db, tree, small_batches):
+        """CSV da entidade tem cabecalho e todas as linhas em ordem de id"""
+        body = await collect(ExportService.stream_csv(async_db, ExportService.entity_statement("crops")))
+        
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert len(rows) == 4
+        assert [int(r["id"]) for r in rows] == sorted(int(r["id"]) for r in rows)
+        assert {r["crop_type"] for r in rows} == {"SOJA", "MILHO"}
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_entity_ndjson(self, async_db, tree, small_batches):
+        """NDJSON da entidade tem um objeto por linha com as colunas da tabela"""
+        body = await collect(ExportService.stream_ndjson(async_db, ExportService.entity_statement("producers")))
+        
+        producers = [json.loads(line) for line in body.splitlines()]
+        assert [p["name"] for p in producers] == ["Com Fazenda", "Sem Fazenda"]
+        assert set(producers[0]) == {"id", "document", "name", "created_at", "updated_at"}
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_tree_ndjson(self, async_db, tree, small_batches):
+        """Arvore aninhada por produtor, inclusive quando atravessa blocos"""
+        body = await collect(ExportService.stream_tree_ndjson(async_db))
+        
+        producers = [json.loads(line) for line in body.splitlines()]
+        assert [p["name"] for p in producers] == ["Com Fazenda", "Sem Fazenda"]
+        assert producers[1]["farms"] == []
+        
+        farm = producers[0]["farms"][0]
+        assert farm["state"] == "GO"
+        assert [h["year"] for h in farm["harvests"]] == [2023, 2024]
+        assert [[c["crop_type"] for c in h["crops"]] for h in farm["harvests"]] == [["SOJA", "MILHO"]] * 2
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_tree_csv(self, async_db, tree):
+        """CSV da arvore tem uma linha por cultura e uma para o produtor sem fazendas"""
+        body = await collect(ExportService.stream_csv(async_db, ExportService.tree_statement()))
+        
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert len(rows) == 5
+        assert rows[-1]["producer_name"] == "Sem Fazenda"
+        assert rows[-1]["farm_id"] == ""
+
+
+class TestColumnarExport:
+    """Testes da exportacao Arrow/Parquet e dos filtros"""
+    
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_arrow_stream(self, async_db, tree, small_batches):
+        """Arrow IPC com um record batch por bloco e tipos colunares"""
+        body = await collect_bytes(ExportService.stream_arrow(async_db, ExportService.entity_statement("crops")))
+        
+        reader = pa.ipc.open_stream(body)
+        batches = list(reader)
+        table = pa.Table.from_batches(batches)
+        assert len(batches) == 2
+        assert table.num_rows == 4
+        assert table.schema.field("planted_area").type == pa.float64()
+        assert table.schema.field("created_at").type == pa.timestamp("us")
+        assert table.column("crop_type").to_pylist() == ["SOJA", "MILHO", "SOJA", "MILHO"]
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_parquet_file(self, async_db, tree, small_batches):
+        """Parquet com um row group por bloco"""
+        body = await collect_bytes(ExportService.stream_parquet(async_db, ExportService.entity_statement("harvests")))
+        
+        parquet_file = pq.ParquetFile(pa.BufferReader(body))
+        assert parquet_file.metadata.num_row_groups == 1
+        assert parquet_file.read().column("year").to_pylist() == [2023, 2024]
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_filters(self, async_db, tree):
+        """Filtros por estado, ano e tipo de cultura"""
+        stmt = ExportService.entity_statement("crops", state="GO", year=2024, crop_type=CropType.SOJA)
+        body = await collect_bytes(ExportService.stream_parquet(async_db, stmt))
+        assert pq.ParquetFile(pa.BufferReader(body)).read().num_rows == 1
+        
+        stmt = ExportService.entity_statement("farms", state="SP")
+        body = await collect_bytes(ExportService.stream_arrow(async_db, stmt))
+        assert pa.ipc.open_stream(body).read_all().num_rows == 0
+        
+    @pytest.mark.integration
+    def test_filter_not_applicable(self):
+        """Filtro que nao se aplica a entidade e rejeitado"""
+        with pytest.raises(ValueError):
+            ExportService.entity_statement("farms", year=2024)
+        with pytest.raises(ValueError):
+            ExportService.entity_statement("harvests", crop_type=CropType.SOJA)
@@ -0,0 +1,186 @@
+"""
+Testes dos filtros e da ordenacao da listagem de fazendas
+O plano de execucao dos filtros comuns deve usar os indices
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.models import Producer, Farm
+from app.schemas import FarmFilters, FarmSort
+from app.services import FarmService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+STATES = ("SP", "MG", "GO", "MT", "PR", "BA", "MS", "RS")
+BASE_DATE = datetime(2020, 1, 1)
+
+
+def seed_farms(db, count: int = 400):
+    """Fazendas com estado, cidade, area e data de criacao deterministicos"""
+    db.execute(insert(Producer), [{"document": f"{i:011d}", "name": f"Produtor {i}"} for i in range(1, 21)])
+    db.execute(insert(Farm), [
+        {
+            "producer_id": i % 20 + 1,
+            "name": f"Fazenda {i % 37:02d}",
+            "city": f"Cidade {i % 50}",
+            "state": STATES[i % len(STATES)],
+            "total_area": float((i * 7919) % 10000 + 1),
+            "agricultural_area": 0.0,
+            "vegetation_area": 0.0,
+            "created_at": BASE_DATE + timedelta(hours=i),
+        }
+        for i in range(count)
+    ])
+    db.commit()
+
+
+async def all_pages(db, filters, sort, limit=7):
+    """Percorre todas as paginas com o cursor e retorna as linhas"""
+    rows, after = [], None
+    while True:
+        page, cursor = await FarmService.get_all(db, after, limit, filters=filters, sort=sort)
+        rows.extend(page)
+        if cursor is None:
+            return rows
+        after = decode_cursor(cursor)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestFarmFilters:
+
+    @pytest.fixture(autouse=True)
+    def seeded(self, db):
+        seed_farms(db)
+
+    async def test_filters(self, async_db):
+        rows = await all_pages(async_db, FarmFilters(
+            state="SP", min_total_area=1000, max_total_area=5000
+        ), FarmSort.ID)
+        assert rows
+        assert all(r.state == "SP" and 1000 <= r.total_area <= 5000 for r in rows)
+
+        rows = await all_pages(async_db, FarmFilters(producer_id=3, city="Cidade 2"), FarmSort.ID)
+        assert rows and all(r.producer_id == 3 and r.city == "Cidade 2" for r in rows)
+
+        rows = await all_pages(async_db, FarmFilters(created_after=BASE_DATE + timedelta(hours=389)), FarmSort.ID)
+        assert len(rows) == 10
+
+    @pytest.mark.parametrize("sort,key,reverse", [
+        (FarmSort.ID, lambda f: f.id, False),
+        (FarmSort.ID_DESC, lambda f: f.id, True),
+        (FarmSort.NAME, lambda f: (f.name, f.id), False),
+        (FarmSort.NAME_DESC, lambda f: (f.name, f.id), True),
+        (FarmSort.TOTAL_AREA, lambda f: (f.total_area, f.id), False),
+        (FarmSort.TOTAL_AREA_DESC, lambda f: (f.total_area, f.id), True),
+    ])
+    async def test_sort_with_cursor(self, async_db, sort, key, reverse):
+        """Todas as paginas juntas trazem cada fazenda uma vez, na ordem pedida (nomes repetidos desempatam pelo id)"""
+        filters = FarmFilters(state="MG")
+        rows = await all_pages(async_db, filters, sort)
+        assert len(rows) == 50
+        assert len({r.id for r in rows}) == 50
+        assert rows == sorted(rows, key=key, reverse=reverse)
+
+    async def test_columns_with_sort(self, async_db):
+        """Ordenacao por coluna fora do fields: o valor vai no fim da tupla para o cursor"""
+        page, cursor = await FarmService.get_all(async_db, None, 5, columns=["id"], sort=FarmSort.NAME)
+        assert len(page[0]) == 2
+        assert decode_cursor(cursor)["value"] == page[-1][1]
+
+    async def test_invalid_filters_and_cursor(self, async_db):
+        with pytest.raises(ValueError):
+            await FarmService.get_all(async_db, filters=FarmFilters(min_total_area=10, max_total_area=1))
+
+        _, cursor = await FarmService.get_all(async_db, None, 5, sort=FarmSort.NAME)
+        with pytest.raises(ValueError):
+            await FarmService.get_all(async_db, decode_cursor(cursor), 5, sort=FarmSort.TOTAL_AREA)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestFarmFilterPlans:
+    """EXPLAIN QUERY PLAN (SQLite) das combinacoes comuns, na primeira pagina e com cursor"""
+
+    @pytest.fixture(autouse=True)
+    def seeded(self, db):
+        seed_farms(db, 2000)
+        # Estatisticas para o planner escolher como em producao
+        db.execute(text("ANALYZE"))
+        db.commit()
+
+    @pytest.mark.parametrize("filters,sort,index", [
+        (FarmFilters(producer_id=3), FarmSort.ID, "ix_farms_producer_id"),
+        (FarmFilters(city="Cidade 7"), FarmSort.ID, "ix_farms_city"),
+        (FarmFilters(state="SP", min_total_area=100, max_total_area=400), FarmSort.ID, "ix_farms_state_total_area"),
+        (FarmFilters(state="SP"), FarmSort.TOTAL_AREA, "ix_farms_state_total_area"),
+        (FarmFilters(min_total_area=100, max_total_area=400), FarmSort.TOTAL_AREA, "ix_farms_total_area_id"),
+        (FarmFilters(), FarmSort.TOTAL_AREA_DESC, "ix_farms_total_area_id"),
+        (FarmFilters(), FarmSort.NAME, "ix_farms_name_id"),
+    ])
+    async def test_uses_index(self, async_db, filters, sort, index, capture_sql):
+        if async_db.bind.dialect.name != "sqlite":
+            pytest.skip("Plano verificado no SQLite")
+
+        with capture_sql(async_db) as statements:
+            _, cursor = await FarmService.get_all(async_db, None, 10, filters=filters, sort=sort)
+            await FarmService.get_all(async_db, decode_cursor(cursor), 10, filters=filters, sort=sort)
+        assert len(statements) == 2
+
+        conn = await async_db.connection()
+        for statement, parameters in statements:
+            plan = [row[-1] for row in (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()]
+            farm_steps = [step for step in plan if " farms" in step]
+            assert farm_steps and all(index in step for step in farm_steps), plan
+
+
+@pytest.mark.integration
+class TestFarmFilterRoute:
+
+    def test_query_params(self, client, auth_headers_admin, db):
+        seed_farms(db, 40)
+        response = client.get(
+            "/api/farms/?state=SP&min_total_area=1&sort=-total_area&limit=2&fields=id,total_area",
+            headers=auth_headers_admin
+        )
+        assert response.status_code == 200
+        first_page = response.json()
+        assert len(first_page) == 2
+        assert first_page[0]["total_area"] >= first_page[1]["total_area"]
+
+        cursor = response.headers["X-Next-Cursor"]
+        response = client.get(
+            f"/api/farms/?state=SP&min_total_area=1&sort=-total_area&limit=2&cursor={cursor}",
+            headers=auth_headers_admin
+        )
+        assert response.json()[0]["total_area"] <= first_page[1]["total_area"]
+
+        # Cursor de outra ordenacao e faixa invertida
+        assert client.get(f"/api/farms/?sort=name&cursor={cursor}", headers=auth_headers_admin).status_code == 400
+        assert client.get("/api/farms/?min_total_area=10&max_total_area=1", headers=auth_headers_admin).status_code == 400
+        assert client.get("/api/farms/?sort=city", headers=auth_headers_admin).status_code == 422
+
+    def test_cursor_bound_to_sort(self, client, auth_headers_admin, db):
+        seed_farms(db, 40)
+        by_area = client.get("/api/farms/?sort=total_area&limit=2", headers=auth_headers_admin).headers["X-Next-Cursor"]
+        by_id = client.get("/api/farms/?limit=2", headers=auth_headers_admin).headers["X-Next-Cursor"]
+        assert decode_cursor(by_area)["sort"] == "total_area"
+
+        # Cursor reutilizado com outra ordenacao (inclusive so a direcao)
+        for sort, cursor in (("name", by_area), ("id", by_area), ("-total_area", by_area), ("name", by_id)):
+            response = client.get(f"/api/farms/?sort={sort}&cursor={cursor}", headers=auth_headers_admin)
+            assert response.status_code == 400, (sort, cursor)
+
+        # Cursor adulterado: ordenacao trocada sem trocar o valor, valor ausente ou de outro tipo
+        values = decode_cursor(by_area)
+        for tampered in (
+            {**values, "sort": "name"},
+            {"id": values["id"], "sort": "total_area"},
+            {**values, "value": "muito grande"},
+            {**values, "value": [1, 2]},
+        ):
+            response = client.get(
+                f"/api/farms/?sort={tampered['sort']}&cursor={encode_cursor(tampered)}", headers=auth_headers_admin
+            )
+            assert response.status_code == 400, tampered
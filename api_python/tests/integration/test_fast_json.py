@@ -0,0 +1,124 @@
+"""
+Testes da serializacao das listagens por tuplas de colunas
+O caminho rapido (orjson direto) e o padrao (validado pelo schema) devem gerar
+os mesmos bytes da serializacao via response_model
+"""
+from datetime import datetime
+from typing import List
+
+import pytest
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select
+
+from app.config import config
+from app.models import Producer, Farm, Harvest, Crop
+from app.models.crop import CropType
+from app.schemas import ProducerResponse, FarmResponse, HarvestResponse, CropResponse
+from app.services import ProducerService, FarmService, DashboardService, RollupService
+from app.utils.fast_json import schema_fields, select_columns, rows_response, row_response
+from app.utils.pagination import paginate, NEXT_CURSOR_HEADER
+
+
+def schema_body(schema, objects) -> bytes:
+    """Corpo gerado pelo FastAPI com response_model=List[schema] e JSONResponse"""
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+
+async def seed(db):
+    """Dados com acentos, floats variados e datetimes com e sem microssegundos"""
+    producer = Producer(
+        document="11144477735", name="João Ândrade \"Zé\"",
+        created_at=datetime(2024, 1, 2, 3, 4, 5), updated_at=datetime(2024, 1, 2, 3, 4, 5, 600)
+    )
+    db.add_all([producer, Producer(document="12345678909", name="Maria")])
+    await db.flush()
+    farm = Farm(
+        producer_id=producer.id, name="Fazenda São José", city="Goiânia", state="GO",
+        total_area=1234.5678, agricultural_area=0.1, vegetation_area=1000.0
+    )
+    db.add(farm)
+    await db.flush()
+    harvest = Harvest(farm_id=farm.id, year=2024, description="Safra 2024/25")
+    db.add(harvest)
+    await db.flush()
+    db.add_all([
+        Crop(harvest_id=harvest.id, crop_type=CropType.CANA_DE_ACUCAR, planted_area=12.3),
+        Crop(harvest_id=harvest.id, crop_type=CropType.SOJA, planted_area=700.0),
+    ])
+    await db.commit()
+
+
+@pytest.fixture(params=[False, True], ids=["schema", "fast"])
+def fast_json(request, monkeypatch):
+    """Roda o teste com e sem FAST_JSON_RESPONSES"""
+    monkeypatch.setattr(config, "FAST_JSON_RESPONSES", request.param)
+    return request.param
+
+
+class TestFastListSerialization:
+    """Caminho rapido e caminho padrao x serializacao via schema"""
+    
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("model,schema", [
+        (Producer, ProducerResponse),
+        (Farm, FarmResponse),
+        (Harvest, HarvestResponse),
+        (Crop, CropResponse),
+    ])
+    async def test_rows_match_schema_bytes(self, async_db, fast_json, model, schema):
+        """Tuplas de colunas serializadas geram os mesmos bytes do schema"""
+        await seed(async_db)
+        fields = schema_fields(schema)
+        
+        rows, _ = await paginate(async_db, select_columns(model, fields), model.id, None, 100, scalars=False)
+        objects = (await async_db.execute(select(model).order_by(model.id))).scalars().all()
+        
+        assert rows_response(schema, fields, rows).body == schema_body(schema, objects)
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_service_column_pages(self, async_db, fast_json):
+        """Services retornam tuplas quando recebem as colunas, com o cursor no header"""
+        await seed(async_db)
+        fields = schema_fields(ProducerResponse)
+        
+        rows, next_cursor = await ProducerService.get_all(async_db, None, 1, columns=fields)
+        response = rows_response(ProducerResponse, fields, rows, next_cursor)
+        
+        assert response.headers[NEXT_CURSOR_HEADER] == next_cursor
+        objects, _ = await ProducerService.get_all(async_db, None, 1)
+        assert response.body == schema_body(ProducerResponse, objects)
+        
+        farm_rows, _ = await FarmService.get_by_producer(async_db, rows[0].id, columns=schema_fields(FarmResponse))
+        assert [row.name for row in farm_rows] == ["Fazenda São José"]
+        
+    @pytest.mark.unit
+    def test_schema_validation_is_default(self, monkeypatch):
+        """Sem FAST_JSON_RESPONSES as linhas passam pelo schema (so os campos pedidos)"""
+        row = (1, "SOJA", -5.0)
+        fields = ["id", "crop_type", "planted_area"]
+        with pytest.raises(ValidationError):
+            rows_response(CropResponse, fields, [row])
+        with pytest.raises(ValidationError):
+            row_response(CropResponse, fields, row)
+        assert row_response(CropResponse, ["id"], (1,)).body == b'{"id":1}'
+        
+        monkeypatch.setattr(config, "FAST_JSON_RESPONSES", True)
+        assert isinstance(rows_response(CropResponse, fields, [row]), Response)
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_default_response_class_matches_json(self, async_db):
+        """ORJSONResponse (classe padrao) gera os mesmos bytes do JSONResponse"""
+        await seed(async_db)
+        await async_db.run_sync(RollupService.rebuild)
+        await async_db.commit()
+        
+        content = (await DashboardService.get_overview(async_db)).model_dump(mode="json")
+        
+        assert ORJSONResponse(content).body == JSONResponse(content).body
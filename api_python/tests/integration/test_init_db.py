@@ -0,0 +1,111 @@
+"""
+Testes da inicializacao do banco (migracoes e verificacao de schema no startup)
+"""
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import init_db
+from app.database import Base
+from app.init_db import get_alembic_config, get_head_revision, check_schema_version
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "schema.db"
+
+
+async def run_check(db_path):
+    bind = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    try:
+        return await check_schema_version(bind)
+    finally:
+        await bind.dispose()
+
+
+class TestSchemaVersionCheck:
+    """Testes da verificacao feita no lifespan da API"""
+    
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_migrated_database_passes(self, db_path):
+        """Banco na ultima revisao passa na verificacao"""
+        alembic_config = get_alembic_config(f"sqlite:///{db_path}")
+        alembic_config.attributes["configure_logger"] = False
+        command.upgrade(alembic_config, "head")
+        
+        assert await run_check(db_path) == get_head_revision()
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_unmigrated_database_fails(self, db_path):
+        """Banco sem migracoes (ex.: criado por create_all) impede o startup"""
+        sync_engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=sync_engine)
+        sync_engine.dispose()
+        
+        with pytest.raises(RuntimeError, match="app.init_db migrate"):
+            await run_check(db_path)
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_outdated_database_fails(self, db_path):
+        """Banco em revisao antiga impede o startup"""
+        alembic_config = get_alembic_config(f"sqlite:///{db_path}")
+        alembic_config.attributes["configure_logger"] = False
+        command.upgrade(alembic_config, "0001")
+        
+        with pytest.raises(RuntimeError):
+            await run_check(db_path)
+
+
+class TestMigrateLegacyDatabase:
+    """Banco antigo, criado por create_all e ja com dados, passando pelo migrate()"""
+    
+    @pytest.fixture
+    def legacy_engine(self, db_path, monkeypatch):
+        """Schema da revisao 0001 sem alembic_version, com fazendas e culturas"""
+        url = f"sqlite:///{db_path}"
+        alembic_config = get_alembic_config(url)
+        alembic_config.attributes["configure_logger"] = False
+        command.upgrade(alembic_config, "0001")
+        
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+            conn.execute(text("INSERT INTO producers (id, document, name) VALUES (1, '111.444.777-35', 'Produtor')"))
+            conn.execute(text(
+                "INSERT INTO farms (id, producer_id, name, city, state, total_area, agricultural_area, vegetation_area) "
+                "VALUES (1, 1, 'A', 'Cidade', 'SP', 100, 60, 30), (2, 1, 'B', 'Cidade', 'SP', 50, 20, 20), "
+                "(3, 1, 'C', 'Cidade', 'MT', 200, 150, 40)"
+            ))
+            conn.execute(text("INSERT INTO harvests (id, farm_id, year, description) VALUES (1, 1, 2024, 'Safra 2024')"))
+            conn.execute(text(
+                "INSERT INTO crops (harvest_id, crop_type, planted_area) "
+                "VALUES (1, 'SOJA', 30), (1, 'SOJA', 10), (1, 'MILHO', 15)"
+            ))
+        
+        monkeypatch.setattr(init_db, "engine", engine)
+        monkeypatch.setattr(init_db, "get_alembic_config", lambda url=None: alembic_config)
+        yield engine
+        engine.dispose()
+    
+    @pytest.mark.integration
+    def test_rollups_backfilled(self, legacy_engine):
+        """O upgrade cria os rollups ja com os totais dos dados existentes"""
+        init_db.migrate()
+        
+        with legacy_engine.connect() as conn:
+            states = conn.execute(text(
+                "SELECT state, farm_count, total_area, agricultural_area, vegetation_area FROM state_rollups ORDER BY state"
+            )).all()
+            crops = conn.execute(text(
+                "SELECT crop_type, crop_count, total_area FROM crop_rollups ORDER BY crop_type"
+            )).all()
+            planted_area = conn.execute(text("SELECT planted_area FROM harvests WHERE id = 1")).scalar()
+        
+        assert [tuple(row) for row in states] == [("MT", 1, 200.0, 150.0, 40.0), ("SP", 2, 150.0, 80.0, 50.0)]
+        assert [tuple(row) for row in crops] == [("MILHO", 1, 15.0), ("SOJA", 2, 40.0)]
+        assert planted_area == 55.0
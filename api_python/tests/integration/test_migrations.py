@@ -0,0 +1,105 @@
+"""
+Testes das migracoes do Alembic
+O schema gerado pelas migracoes deve bater com os models
+"""
+import pytest
+from pathlib import Path
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base
+import app.models  # noqa: F401
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    """Configuracao do Alembic apontando para um banco SQLite temporario"""
+    alembic_config = Config(str(ALEMBIC_INI))
+    alembic_config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path / 'migrations.db'}")
+    alembic_config.attributes["configure_logger"] = False
+    return alembic_config
+
+
+@pytest.fixture
+def migrated_engine(alembic_config):
+    """Banco SQLite temporario migrado ate a ultima revisao"""
+    command.upgrade(alembic_config, "head")
+    
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    yield engine
+    engine.dispose()
+
+
+class TestMigrations:
+    """Testes do schema criado pelas migracoes"""
+    
+    @pytest.mark.integration
+    def test_migrations_match_models(self, migrated_engine):
+        """Nao ha diferenca entre o schema migrado e o metadata dos models"""
+        with migrated_engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+        
+        assert diff == []
+        
+    @pytest.mark.integration
+    def test_foreign_key_and_filter_indexes(self, migrated_engine):
+        """Indices das chaves estrangeiras e dos filtros existem"""
+        inspector = inspect(migrated_engine)
+        indexes = {
+            table: {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+            for table in ("farms", "harvests", "crops")
+        }
+        
+        assert indexes["farms"]["ix_farms_producer_id"] == ["producer_id"]
+        assert indexes["farms"]["ix_farms_state_total_area"] == ["state", "total_area"]
+        assert indexes["harvests"]["ix_harvests_farm_id"] == ["farm_id"]
+        assert indexes["harvests"]["ix_harvests_year"] == ["year"]
+        assert indexes["crops"]["ix_crops_harvest_id"] == ["harvest_id"]
+        assert indexes["crops"]["ix_crops_crop_type_planted_area"] == ["crop_type", "planted_area"]
+        
+    @pytest.mark.integration
+    def test_state_aggregate_uses_covering_index(self, migrated_engine):
+        """Agregado por estado e resolvido so pelo indice composto"""
+        with migrated_engine.connect() as conn:
+            plan = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT state, SUM(total_area) FROM farms GROUP BY state"
+            )).all()
+        
+        assert "COVERING INDEX ix_farms_state_total_area" in " ".join(row[-1] for row in plan)
+        
+    @pytest.mark.integration
+    def test_baseline_has_no_rollup_tables(self, alembic_config):
+        """0001 e o schema do create_all antigo; bancos marcados nela recebem os rollups no upgrade"""
+        command.upgrade(alembic_config, "0001")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            tables = set(inspect(engine).get_table_names())
+            assert tables >= {"users", "producers", "farms", "harvests", "crops"}
+            assert not tables & {"state_rollups", "crop_rollups", "table_versions"}
+            
+            command.upgrade(alembic_config, "head")
+            assert {"state_rollups", "crop_rollups", "table_versions"} <= set(inspect(engine).get_table_names())
+        finally:
+            engine.dispose()
+        
+    @pytest.mark.integration
+    def test_duplicate_documents_block_unique_index(self, alembic_config):
+        """Documentos iguais depois de normalizados param a 0006 com os ids, antes do indice unico"""
+        command.upgrade(alembic_config, "0005")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "INSERT INTO producers (document, name) VALUES "
+                    "('111.444.777-35', 'Formatado'), ('12345678909', 'Outro'), ('11144477735', 'Digitos')"
+                ))
+            
+            with pytest.raises(RuntimeError, match=r"\{'11144477735': \[1, 3\]\}"):
+                command.upgrade(alembic_config, "0006")
+        finally:
+            engine.dispose()
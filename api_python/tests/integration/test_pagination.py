@@ -0,0 +1,57 @@
+"""
+Testes de integracao da paginacao por cursor nas listagens
+"""
+import pytest
+
+from app.schemas import ProducerCreate, FarmCreate
+from app.services import ProducerService, FarmService
+from app.utils.pagination import decode_cursor
+
+
+class TestKeysetPagination:
+    """Testes das paginas por keyset em id"""
+    
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_rows_once(self, async_db):
+        """Percorrer as paginas devolve cada fazenda uma vez, em ordem de id"""
+        producer = await ProducerService.create(
+            async_db, ProducerCreate(document="11144477735", name="Produtor Paginado")
+        )
+        for i in range(5):
+            await FarmService.create(async_db, FarmCreate(
+                producer_id=producer.id,
+                name=f"Fazenda {i}",
+                city="Cidade",
+                state="SP",
+                total_area=100.0,
+                agricultural_area=50.0,
+                vegetation_area=20.0
+            ))
+        
+        seen = []
+        after = None
+        pages = 0
+        while True:
+            farms, next_cursor = await FarmService.get_all(async_db, after, 2)
+            seen.extend(f.id for f in farms)
+            pages += 1
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor)
+        
+        assert pages == 3
+        assert seen == sorted(seen)
+        assert len(seen) == len(set(seen)) == 5
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_last_full_page_has_no_cursor(self, async_db):
+        """Pagina que fecha exatamente no fim nao devolve cursor"""
+        await ProducerService.create(async_db, ProducerCreate(document="11144477735", name="A"))
+        await ProducerService.create(async_db, ProducerCreate(document="12345678909", name="B"))
+        
+        producers, next_cursor = await ProducerService.get_all(async_db, None, 2)
+        
+        assert [p.name for p in producers] == ["A", "B"]
+        assert next_cursor is None
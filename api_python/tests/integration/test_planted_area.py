@@ -0,0 +1,161 @@
+"""
+Testes de integracao do limite de area plantada por safra e do relatorio de integridade
+"""
+import pytest
+from sqlalchemy import insert, select, update, func
+
+from app.models import Producer, Farm, Harvest, Crop
+from app.models.crop import CropType
+from app.schemas import CropBase, HarvestBatchItem
+from app.services import HarvestService, IntegrityService
+
+
+@pytest.fixture
+def harvest(db):
+    """Safra 1 de uma fazenda com 100 ha agricultaveis"""
+    db.execute(insert(Producer), [{"document": "11144477735", "name": "Cooperativa"}])
+    db.execute(insert(Farm), [{
+        "producer_id": 1, "name": "Fazenda", "city": "Cidade", "state": "GO",
+        "total_area": 150.0, "agricultural_area": 100.0, "vegetation_area": 40.0
+    }])
+    db.execute(insert(Harvest), [{"farm_id": 1, "year": 2024, "description": "Safra 2024"}])
+    db.commit()
+    return 1
+
+
+async def planted_area(db, harvest_id):
+    return await db.scalar(select(Harvest.planted_area).where(Harvest.id == harvest_id))
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestPlantedAreaLimit:
+
+    async def test_total_maintained_without_summing_crops(self, async_db, harvest, capture_sql):
+        await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="SOJA", planted_area=60.0)])
+
+        with capture_sql(async_db) as statements:
+            await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="MILHO", planted_area=40.0)])
+
+        assert not [s for s, _ in statements if "sum(" in s.lower()]
+        assert await planted_area(async_db, harvest) == 100.0
+
+    async def test_over_limit_rejected(self, async_db, harvest):
+        await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="SOJA", planted_area=80.0)])
+
+        with pytest.raises(ValueError, match="excede a área agricultável"):
+            await HarvestService.create_crops(async_db, harvest, [
+                CropBase(crop_type="MILHO", planted_area=15.0), CropBase(crop_type="CAFE", planted_area=10.0)
+            ])
+        await async_db.rollback()
+
+        assert await planted_area(async_db, harvest) == 80.0
+        assert await async_db.scalar(select(func.count(Crop.id))) == 1
+
+    async def test_harvests_batch_over_limit(self, async_db, harvest):
+        with pytest.raises(ValueError, match="safra 2026"):
+            await HarvestService.create_harvests(async_db, 1, [
+                HarvestBatchItem(year=2025, description="Safra 2025", crops=[CropBase(crop_type="SOJA", planted_area=90.0)]),
+                HarvestBatchItem(year=2026, description="Safra 2026", crops=[
+                    CropBase(crop_type="SOJA", planted_area=60.0), CropBase(crop_type="MILHO", planted_area=50.0)
+                ]),
+            ])
+        assert await async_db.scalar(select(func.count(Harvest.id))) == 1
+
+        created = await HarvestService.create_harvests(async_db, 1, [
+            HarvestBatchItem(year=2025, description="Safra 2025", crops=[CropBase(crop_type="SOJA", planted_area=90.0)]),
+        ])
+        assert created[0].planted_area == 90.0
+
+    async def test_fractional_areas_fill_exactly(self, async_db, db, harvest):
+        db.execute(update(Farm).values(agricultural_area=10.0))
+        db.commit()
+
+        for _ in range(10):
+            await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="SOJA", planted_area=0.1)])
+        for _ in range(10):
+            await HarvestService.subtract_planted_area(async_db, harvest, 0.1)
+        await async_db.commit()
+        assert await planted_area(async_db, harvest) == 0.0
+
+        # Em float, dez vezes 0.9 mais 1.0 passa de 10.0 (10.000000000000002)
+        for _ in range(10):
+            await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="MILHO", planted_area=0.9)])
+        assert await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="CAFE", planted_area=1.0)])
+        assert await planted_area(async_db, harvest) == pytest.approx(10.0)
+
+        with pytest.raises(ValueError, match="excede a área agricultável"):
+            await HarvestService.create_crops(async_db, harvest, [CropBase(crop_type="CAFE", planted_area=0.001)])
+
+    async def test_rebuild(self, async_db, db, harvest):
+        db.execute(insert(Crop), [
+            {"harvest_id": harvest, "crop_type": CropType.SOJA, "planted_area": 30.0},
+            {"harvest_id": harvest, "crop_type": CropType.MILHO, "planted_area": 12.5},
+        ])
+        HarvestService.rebuild_planted_area(db)
+        db.commit()
+        assert await planted_area(async_db, harvest) == 42.5
+
+
+@pytest.mark.integration
+class TestPlantedAreaRoutes:
+
+    def test_crop_create_and_delete(self, client, auth_headers_admin, harvest):
+        created = client.post("/api/crops/", headers=auth_headers_admin,
+                              json={"harvest_id": harvest, "crop_type": "SOJA", "planted_area": 70.0})
+        assert created.status_code == 201
+
+        over = client.post("/api/crops/", headers=auth_headers_admin,
+                           json={"harvest_id": harvest, "crop_type": "MILHO", "planted_area": 40.0})
+        assert over.status_code == 400
+
+        assert client.delete(f"/api/crops/{created.json()['id']}", headers=auth_headers_admin).status_code == 204
+        assert client.get(f"/api/harvests/{harvest}", headers=auth_headers_admin).json()["planted_area"] == 0.0
+
+        retry = client.post("/api/crops/", headers=auth_headers_admin,
+                            json={"harvest_id": harvest, "crop_type": "MILHO", "planted_area": 40.0})
+        assert retry.status_code == 201
+
+    def test_crop_missing_harvest(self, client, auth_headers_admin, harvest):
+        response = client.post("/api/crops/", headers=auth_headers_admin,
+                               json={"harvest_id": 999, "crop_type": "SOJA", "planted_area": 1.0})
+        assert response.status_code == 404
+
+    def test_batch_over_limit(self, client, auth_headers_admin, harvest):
+        response = client.post(f"/api/harvests/{harvest}/crops:batch", headers=auth_headers_admin, json={"crops": [
+            {"crop_type": "SOJA", "planted_area": 60.0}, {"crop_type": "MILHO", "planted_area": 60.0}
+        ]})
+        assert response.status_code == 400
+
+
+@pytest.mark.integration
+class TestIntegrityReport:
+
+    @pytest.fixture
+    def violations(self, db, harvest):
+        """Dados gravados por fora da API: a safra 1 passa do limite, a safra 2 nao"""
+        db.execute(insert(Harvest), [{"farm_id": 1, "year": 2025, "description": "Safra 2025"}])
+        db.execute(insert(Crop), [
+            {"harvest_id": 1, "crop_type": CropType.SOJA, "planted_area": 80.0},
+            {"harvest_id": 1, "crop_type": CropType.MILHO, "planted_area": 45.0},
+            {"harvest_id": 2, "crop_type": CropType.SOJA, "planted_area": 100.0},
+        ])
+        db.commit()
+
+    @pytest.mark.asyncio
+    async def test_single_aggregate_query(self, async_db, violations, capture_sql):
+        with capture_sql(async_db) as statements:
+            found = await IntegrityService.planted_area_violations(async_db)
+
+        assert len(statements) == 1
+        assert [(v.harvest_id, v.planted_area, v.excess) for v in found] == [(1, 125.0, 25.0)]
+
+    def test_route_admin_only(self, client, auth_headers_admin, auth_headers_user, violations):
+        response = client.get("/api/admin/integrity", headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert response.json() == {"planted_area_violations": [{
+            "harvest_id": 1, "farm_id": 1, "year": 2024,
+            "agricultural_area": 100.0, "planted_area": 125.0, "excess": 25.0
+        }]}
+
+        assert client.get("/api/admin/integrity", headers=auth_headers_user).status_code == 403
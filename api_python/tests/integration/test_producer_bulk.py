@@ -0,0 +1,67 @@
+"""
+Testes de integracao da importacao em lote de produtores
+"""
+import pytest
+from sqlalchemy import select, func
+
+from app.models import Producer
+from app.schemas import ProducerCreate
+from app.services import ProducerService
+
+
+def make_cpf(number: int) -> str:
+    """Gera um CPF valido a partir de um numero de 9 digitos"""
+    digits = [int(d) for d in f"{number:09d}"]
+    for weight in (10, 11):
+        check = 11 - sum(d * w for d, w in zip(digits, range(weight, 1, -1))) % 11
+        digits.append(0 if check >= 10 else check)
+    return "".join(map(str, digits))
+
+
+class TestProducerBulkCreate:
+    """Testes do ProducerService.bulk_create"""
+    
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_valid_rows_created_and_errors_per_line(self, async_db):
+        """Linhas validas sao criadas e cada linha invalida e reportada"""
+        await ProducerService.create(async_db, ProducerCreate(document="11144477735", name="Existente"))
+        rows = [
+            (1, {"document": "12345678909", "name": "Novo CPF"}),
+            (2, {"document": "11222333000181", "name": "Novo CNPJ"}),
+            (3, {"document": "12345678901", "name": "CPF invalido"}),
+            (4, {"document": "11144477735", "name": "Ja existe"}),
+            (5, {"document": "12345678909", "name": "Repetido"}),
+            (6, {"name": "Sem documento"}),
+            (7, {"document": "98765432100", "name": ""}),
+        ]
+        
+        result = await ProducerService.bulk_create(async_db, rows)
+        
+        assert result.received == 7
+        assert result.created == 2
+        assert [(e.line, e.error) for e in result.errors] == [
+            (3, "Documento inválido (CPF ou CNPJ)"),
+            (4, "Já existe um produtor com esse documento"),
+            (5, "Documento repetido no arquivo"),
+            (6, "Campo document obrigatório"),
+            (7, "Campo name obrigatório"),
+        ]
+        names = (await async_db.execute(select(Producer.name).order_by(Producer.id))).scalars().all()
+        assert names == ["Existente", "Novo CPF", "Novo CNPJ"]
+        
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_large_batch(self, async_db):
+        """Lote grande e inserido de uma vez e os produtores ficam consultaveis"""
+        rows = [
+            (i + 1, {"document": make_cpf(100000000 + i), "name": f"Produtor {i}"})
+            for i in range(2000)
+        ]
+        
+        result = await ProducerService.bulk_create(async_db, rows)
+        
+        assert result.created == 2000
+        assert result.errors == []
+        assert await async_db.scalar(select(func.count(Producer.id))) == 2000
+        assert (await ProducerService.get_by_document(async_db, make_cpf(100000042))).name == "Produtor 42"
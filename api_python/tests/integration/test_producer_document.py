@@ -0,0 +1,91 @@
+"""
+Testes de integracao do documento normalizado (producers.document_digits)
+"""
+import pytest
+from sqlalchemy import insert, select
+
+from app.models import Producer
+from app.schemas import ProducerCreate, ProducerUpdate
+from app.services import ProducerService
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestDocumentDigits:
+
+    async def test_written_once_on_create(self, async_db):
+        producer = await ProducerService.create(async_db, ProducerCreate(document="111.444.777-35", name="Ana"))
+        assert producer.document == "111.444.777-35"
+        assert producer.document_digits == "11144477735"
+
+    async def test_core_insert_default(self, db, async_db):
+        """insert(Producer) sem document_digits usa o default calculado do documento"""
+        db.execute(insert(Producer), [{"document": "11.222.333/0001-81", "name": "Cooperativa"}])
+        db.commit()
+        digits = (await async_db.execute(select(Producer.document_digits))).scalar_one()
+        assert digits == "11222333000181"
+
+    async def test_lookup_any_formatting(self, async_db):
+        await ProducerService.create(async_db, ProducerCreate(document="11222333000181", name="Cooperativa"))
+        for document in ("11222333000181", "11.222.333/0001-81", " 11 222 333 0001 81 "):
+            assert (await ProducerService.get_by_document(async_db, document)).name == "Cooperativa"
+        assert await ProducerService.get_by_document(async_db, "12345678909") is None
+
+    async def test_duplicate_across_formatting(self, async_db):
+        await ProducerService.create(async_db, ProducerCreate(document="11144477735", name="Ana"))
+        with pytest.raises(ValueError, match="Já existe"):
+            await ProducerService.create(async_db, ProducerCreate(document="111.444.777-35", name="Outra"))
+
+        result = await ProducerService.bulk_create(async_db, [
+            (1, {"document": "111.444.777-35", "name": "Existente formatado"}),
+            (2, {"document": "123.456.789-09", "name": "Novo"}),
+            (3, {"document": "12345678909", "name": "Repetido sem formatacao"}),
+        ])
+        assert result.created == 1
+        assert [(e.line, e.error) for e in result.errors] == [
+            (1, "Já existe um produtor com esse documento"),
+            (3, "Documento repetido no arquivo"),
+        ]
+
+    async def test_update_keeps_digits_and_rejects_duplicate(self, async_db):
+        ana = await ProducerService.create(async_db, ProducerCreate(document="11144477735", name="Ana"))
+        bia = await ProducerService.create(async_db, ProducerCreate(document="12345678909", name="Bia"))
+
+        with pytest.raises(ValueError, match="Já existe"):
+            await ProducerService.update(async_db, bia.id, ProducerUpdate(document="111.444.777-35"))
+
+        # O proprio documento em outra formatacao nao conflita
+        updated = await ProducerService.update(async_db, ana.id, ProducerUpdate(document="111.444.777-35"))
+        assert updated.document == "111.444.777-35"
+        assert updated.document_digits == "11144477735"
+
+    async def test_lookup_uses_unique_index(self, async_db):
+        conn = await async_db.connection()
+        plan = [
+            row[-1] for row in (await conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM producers WHERE document_digits = ?", ("11144477735",)
+            )).all()
+        ]
+        assert any("ix_producers_document_digits" in step for step in plan), plan
+
+
+@pytest.mark.integration
+class TestProducerByDocumentRoute:
+
+    def test_route(self, client, auth_headers_admin):
+        created = client.post(
+            "/api/producers/", json={"document": "11.222.333/0001-81", "name": "Cooperativa"}, headers=auth_headers_admin
+        )
+        assert created.status_code == 201
+
+        for document in ("11222333000181", "11.222.333/0001-81"):
+            response = client.get(f"/api/producers/by-document/{document}", headers=auth_headers_admin)
+            assert response.status_code == 200
+            assert response.json()["id"] == created.json()["id"]
+
+    def test_not_found(self, client, auth_headers_admin):
+        response = client.get("/api/producers/by-document/12345678909", headers=auth_headers_admin)
+        assert response.status_code == 404
+
+    def test_requires_auth(self, client):
+        assert client.get("/api/producers/by-document/12345678909").status_code in (401, 403)
@@ -0,0 +1,104 @@
+"""
+Testes de integracao da arvore do produtor (/api/producers/{id}/tree)
+"""
+import pytest
+
+from app.models import Producer, Farm, Harvest, Crop
+from app.models.crop import CropType
+from app.schemas import ProducerTree
+from app.services import ProducerService
+
+
+async def seed_tree(db, farms=3, harvests=2, crops=2, document="11144477735") -> int:
+    """Produtor com farms fazendas, harvests safras por fazenda e crops culturas por safra"""
+    producer = Producer(document=document, name="Cooperativa")
+    db.add(producer)
+    await db.flush()
+    for f in range(farms):
+        farm = Farm(
+            producer_id=producer.id, name=f"Fazenda {f}", city="Cidade", state="SP",
+            total_area=1000.0, agricultural_area=500.0, vegetation_area=300.0
+        )
+        db.add(farm)
+        await db.flush()
+        for h in range(harvests):
+            harvest = Harvest(farm_id=farm.id, year=2020 + h, description=f"Safra {2020 + h}")
+            db.add(harvest)
+            await db.flush()
+            db.add_all([
+                Crop(harvest_id=harvest.id, crop_type=CropType.SOJA, planted_area=10.0 + c)
+                for c in range(crops)
+            ])
+    await db.commit()
+    db.expunge_all()
+    return producer.id
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestProducerTree:
+
+    async def test_full_tree(self, async_db):
+        producer_id = await seed_tree(async_db)
+        tree = ProducerTree.model_validate(await ProducerService.get_tree(async_db, producer_id))
+
+        assert tree.name == "Cooperativa"
+        assert [farm.name for farm in tree.farms] == ["Fazenda 0", "Fazenda 1", "Fazenda 2"]
+        assert all(len(farm.harvests) == 2 for farm in tree.farms)
+        assert [h.year for h in tree.farms[0].harvests] == [2020, 2021]
+        assert [c.planted_area for c in tree.farms[0].harvests[0].crops] == [10.0, 11.0]
+
+    @pytest.mark.parametrize("depth", [0, 1, 2, 3])
+    async def test_constant_queries(self, async_db, depth, capture_sql):
+        """Uma consulta por nivel, independente do tamanho da arvore"""
+        small_id = await seed_tree(async_db, farms=1, harvests=1, crops=1)
+        big_id = await seed_tree(async_db, farms=20, harvests=3, crops=4, document="12345678909")
+
+        with capture_sql(async_db, "SELECT") as small:
+            await ProducerService.get_tree(async_db, small_id, depth)
+        with capture_sql(async_db, "SELECT") as big:
+            tree = await ProducerService.get_tree(async_db, big_id, depth)
+
+        assert len(small) == len(big) == depth + 1
+        if depth == 3:
+            assert sum(len(h["crops"]) for f in tree["farms"] for h in f["harvests"]) == 20 * 3 * 4
+
+    async def test_depth_limits_levels(self, async_db):
+        producer_id = await seed_tree(async_db)
+
+        producer_only = await ProducerService.get_tree(async_db, producer_id, 0)
+        assert "farms" not in producer_only
+
+        farms_only = await ProducerService.get_tree(async_db, producer_id, 1)
+        assert len(farms_only["farms"]) == 3
+        assert "harvests" not in farms_only["farms"][0]
+
+        harvests = await ProducerService.get_tree(async_db, producer_id, 2)
+        assert "crops" not in harvests["farms"][0]["harvests"][0]
+
+    async def test_missing_producer(self, async_db):
+        assert await ProducerService.get_tree(async_db, 999) is None
+
+
+@pytest.mark.integration
+class TestProducerTreeRoute:
+
+    def test_tree_route(self, client, auth_headers_admin):
+        producer = client.post("/api/producers/", json={"document": "11144477735", "name": "Produtor"}, headers=auth_headers_admin).json()
+        client.post("/api/farms/", json={
+            "producer_id": producer["id"], "name": "Fazenda", "city": "Cidade", "state": "SP",
+            "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0
+        }, headers=auth_headers_admin)
+
+        response = client.get(f"/api/producers/{producer['id']}/tree", headers=auth_headers_admin)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["farms"][0]["name"] == "Fazenda"
+        assert data["farms"][0]["harvests"] == []
+
+        response = client.get(f"/api/producers/{producer['id']}/tree?depth=1", headers=auth_headers_admin)
+        assert "harvests" not in response.json()["farms"][0]
+
+    def test_invalid_depth_and_missing(self, client, auth_headers_admin):
+        assert client.get("/api/producers/1/tree?depth=4", headers=auth_headers_admin).status_code == 422
+        assert client.get("/api/producers/999/tree", headers=auth_headers_admin).status_code == 404
@@ -0,0 +1,84 @@
+"""
+Testes de integracao da busca (/api/search)
+No SQLite a busca usa o indice de trigramas em memoria
+"""
+import pytest
+from sqlalchemy import insert
+
+from app.models import Producer, Farm
+from app.services import SearchService
+from app.services import search_service
+
+
+@pytest.fixture(autouse=True)
+def clear_fallback_indexes():
+    search_service._fallback_indexes.clear()
+    yield
+    search_service._fallback_indexes.clear()
+
+
+@pytest.fixture
+def seeded(db):
+    db.execute(insert(Producer), [
+        {"document": "11144477735", "name": "Maria Oliveira Costa"},
+        {"document": "12345678909", "name": "João Silva Santos"},
+        {"document": "98765432100", "name": "Pedro Souza"},
+    ])
+    db.execute(insert(Farm), [
+        {"producer_id": 1, "name": "Fazenda Oliveiras", "city": "Uberaba", "state": "MG",
+         "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0},
+        {"producer_id": 2, "name": "Sítio Boa Vista", "city": "Ribeirão Preto", "state": "SP",
+         "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0},
+        {"producer_id": 3, "name": "Fazenda Ribeirão", "city": "Franca", "state": "SP",
+         "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0},
+    ])
+    db.commit()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestSearchService:
+
+    async def test_ranked_across_types(self, async_db, seeded):
+        results = await SearchService.search(async_db, "Oliveira", 10)
+        assert [(r.type, r.name) for r in results] == [
+            ("producer", "Maria Oliveira Costa"),
+            ("farm", "Fazenda Oliveiras"),
+        ]
+        assert results[0].score >= results[1].score
+        assert results[1].city == "Uberaba" and results[1].state == "MG"
+
+    async def test_farm_by_name_or_city_once(self, async_db, seeded):
+        """Fazenda que casa pelo nome e outra pela cidade; cada uma aparece uma vez"""
+        results = await SearchService.search(async_db, "ribeirao", 10)
+        assert sorted(r.name for r in results) == ["Fazenda Ribeirão", "Sítio Boa Vista"]
+        assert len({(r.type, r.id) for r in results}) == len(results)
+
+    async def test_limit(self, async_db, seeded):
+        assert len(await SearchService.search(async_db, "Oliveira", 1)) == 1
+
+    async def test_index_follows_writes(self, async_db, seeded):
+        assert await SearchService.search(async_db, "Carvalho", 10) == []
+
+        async_db.add(Producer(document="52998224725", name="Ana Carvalho"))
+        await async_db.commit()
+        assert [r.name for r in await SearchService.search(async_db, "Carvalho", 10)] == ["Ana Carvalho"]
+
+        producer = (await SearchService.search(async_db, "Carvalho", 10))[0]
+        renamed = await async_db.get(Producer, producer.id)
+        renamed.name = "Ana Pereira"
+        await async_db.commit()
+        assert await SearchService.search(async_db, "Carvalho", 10) == []
+
+
+@pytest.mark.integration
+class TestSearchRoute:
+
+    def test_route(self, client, auth_headers_admin, seeded):
+        response = client.get("/api/search/?q=Oliveira&limit=5", headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == "Maria Oliveira Costa"
+
+    def test_query_validation(self, client, auth_headers_admin):
+        assert client.get("/api/search/?q=ab", headers=auth_headers_admin).status_code == 422
+        assert client.get("/api/search/?q=abc&limit=1000", headers=auth_headers_admin).status_code == 422
@@ -0,0 +1,106 @@
+"""
+Testes dos sparse fieldsets (?fields=) nas rotas de listagem e detalhe
+"""
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from app.models import Producer
+from app.schemas import FarmResponse, ProducerResponse
+from app.services import ProducerService
+from app.utils.fast_json import FieldsParam, select_columns, rows_response
+
+
+class TestFieldsParam:
+
+    def test_default_is_all_fields(self):
+        assert FieldsParam(FarmResponse)(None) == list(FarmResponse.model_fields)
+
+    def test_schema_order_and_spaces(self):
+        assert FieldsParam(FarmResponse)(" state, name ,id,") == ["name", "state", "id"]
+
+    def test_unknown_field(self):
+        with pytest.raises(HTTPException) as exc:
+            FieldsParam(FarmResponse)("name,password")
+        assert exc.value.status_code == 400
+        assert "password" in exc.value.detail
+
+
+class TestSelectColumns:
+
+    def test_only_requested_columns_and_id(self):
+        stmt = select_columns(Producer, ["name"])
+        assert [column.name for column in stmt.selected_columns] == ["name", "id"]
+
+    def test_id_not_duplicated(self):
+        stmt = select_columns(Producer, ["id", "name"])
+        assert [column.name for column in stmt.selected_columns] == ["id", "name"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_cursor_without_id_field(self, async_db):
+        """O id vai no fim da tupla para o cursor, mas nao entra no JSON"""
+        async_db.add_all([Producer(document="11144477735", name="A"), Producer(document="12345678909", name="B")])
+        await async_db.commit()
+
+        rows, next_cursor = await ProducerService.get_all(async_db, None, 1, columns=["name"])
+        assert next_cursor is not None
+        assert orjson.loads(rows_response(ProducerResponse, ["name"], rows, next_cursor).body) == [{"name": "A"}]
+
+
+@pytest.mark.integration
+class TestSparseRoutes:
+
+    @pytest.fixture
+    def tree(self, client, auth_headers_admin):
+        producer = client.post("/api/producers/", json={"document": "11144477735", "name": "Produtor"}, headers=auth_headers_admin).json()
+        farm = client.post("/api/farms/", json={
+            "producer_id": producer["id"], "name": "Fazenda", "city": "Cidade", "state": "SP",
+            "total_area": 100.0, "agricultural_area": 50.0, "vegetation_area": 30.0
+        }, headers=auth_headers_admin).json()
+        harvest = client.post("/api/harvests/", json={"farm_id": farm["id"], "year": 2024, "description": "Safra 2024"}, headers=auth_headers_admin).json()
+        crop = client.post("/api/crops/", json={"harvest_id": harvest["id"], "crop_type": "SOJA", "planted_area": 10.0}, headers=auth_headers_admin).json()
+        return producer, farm, harvest, crop
+
+    def test_list_routes(self, client, auth_headers_admin, tree):
+        producer, farm, harvest, crop = tree
+        cases = [
+            ("/api/producers/", "name", [{"name": "Produtor"}]),
+            ("/api/farms/", "id,name,state", [{"id": farm["id"], "name": "Fazenda", "state": "SP"}]),
+            (f"/api/farms/?producer_id={producer['id']}", "state", [{"state": "SP"}]),
+            ("/api/harvests/", "year", [{"year": 2024}]),
+            (f"/api/harvests/farm/{farm['id']}", "id", [{"id": harvest["id"]}]),
+            ("/api/crops/", "crop_type,planted_area", [{"crop_type": "SOJA", "planted_area": 10.0}]),
+            (f"/api/crops/harvest/{harvest['id']}", "planted_area", [{"planted_area": 10.0}]),
+        ]
+        for path, fields, expected in cases:
+            separator = "&" if "?" in path else "?"
+            response = client.get(f"{path}{separator}fields={fields}", headers=auth_headers_admin)
+            assert response.status_code == 200, path
+            assert response.json() == expected, path
+
+    def test_detail_routes(self, client, auth_headers_admin, tree):
+        producer, farm, harvest, crop = tree
+        assert client.get(f"/api/producers/{producer['id']}?fields=name", headers=auth_headers_admin).json() == {"name": "Produtor"}
+        assert client.get(f"/api/farms/{farm['id']}?fields=city", headers=auth_headers_admin).json() == {"city": "Cidade"}
+        assert client.get(f"/api/harvests/{harvest['id']}?fields=description", headers=auth_headers_admin).json() == {"description": "Safra 2024"}
+        assert client.get(f"/api/crops/{crop['id']}?fields=harvest_id", headers=auth_headers_admin).json() == {"harvest_id": harvest["id"]}
+
+    def test_full_detail_unchanged(self, client, auth_headers_admin, tree):
+        producer = tree[0]
+        assert client.get(f"/api/producers/{producer['id']}", headers=auth_headers_admin).json() == producer
+
+    def test_etag_depends_on_fields(self, client, auth_headers_admin, tree):
+        path = f"/api/producers/{tree[0]['id']}"
+        full = client.get(path, headers=auth_headers_admin).headers["etag"]
+        sparse = client.get(f"{path}?fields=name", headers=auth_headers_admin).headers["etag"]
+        assert full != sparse
+        response = client.get(f"{path}?fields=name", headers={**auth_headers_admin, "If-None-Match": full})
+        assert response.status_code == 200
+        response = client.get(f"{path}?fields=name", headers={**auth_headers_admin, "If-None-Match": sparse})
+        assert response.status_code == 304
+
+    def test_unknown_field(self, client, auth_headers_admin):
+        response = client.get("/api/farms/?fields=name,secret", headers=auth_headers_admin)
+        assert response.status_code == 400
+        assert client.get("/api/producers/999?fields=name", headers=auth_headers_admin).status_code == 404
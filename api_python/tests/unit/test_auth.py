@@ -1,16 +1,23 @@
 """
 Testes unitarios de autenticacao
 """
+import asyncio
+import threading
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, AsyncMock
 from fastapi import HTTPException
 from app.utils.security import (
     verify_password, 
     get_password_hash, 
     authenticate_user, 
     create_access_token,
-    get_current_user
+    create_user_token,
+    get_current_user,
+    get_current_admin_user,
+    get_password_hash_async,
+    verify_password_async
 )
+from app.utils.worker_pool import BoundedThreadPool, PoolOverloaded
 from app.models.user import User
 from datetime import datetime, timedelta
 
@@ -142,7 +149,7 @@ class TestJWTToken:
         
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_get_current_user_valid_token(self, db):
+    async def test_get_current_user_valid_token(self, db, async_db):
         """Testa obtencao de usuario com token valido"""
         # Criar usuario de teste
         user = User(
@@ -159,37 +166,37 @@ class TestJWTToken:
         token = create_access_token({"sub": "testuser"})
         
         # Obter usuario atual
-        current_user = await get_current_user(token, db)
+        current_user = await get_current_user(token, async_db)
         
         assert current_user.username == "testuser"
         assert current_user.email == "test@test.com"
         
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_get_current_user_invalid_token(self, db):
+    async def test_get_current_user_invalid_token(self, db, async_db):
         """Testa obtencao de usuario com token invalido"""
         invalid_token = "invalid.token.here"
         
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(invalid_token, db)
+            await get_current_user(invalid_token, async_db)
             
         assert exc_info.value.status_code == 401
         
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_get_current_user_nonexistent_user(self, db):
+    async def test_get_current_user_nonexistent_user(self, db, async_db):
         """Testa obtencao de usuario inexistente com token valido"""
         # Criar token para usuario que nao existe no banco
         token = create_access_token({"sub": "nonexistent_user"})
         
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token, db)
+            await get_current_user(token, async_db)
             
         assert exc_info.value.status_code == 401
         
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_get_current_user_inactive_user(self, db):
+    async def test_get_current_user_inactive_user(self, db, async_db):
         """Testa obtencao de usuario inativo"""
         # Criar usuario inativo
         user = User(
@@ -205,6 +212,168 @@ class TestJWTToken:
         token = create_access_token({"sub": "inactive_user"})
         
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token, db)
+            await get_current_user(token, async_db)
+            
+        assert exc_info.value.status_code == 400
+
+
+class TestUserClaims:
+    """Testes da autenticacao pelas claims, conferidas pelo token_version"""
+    
+    @staticmethod
+    def version_db(version=0):
+        """Sessao que so responde a consulta do token_version"""
+        db = Mock()
+        db.scalar = AsyncMock(return_value=version)
+        return db
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_claims_token_checks_only_version(self):
+        """Token com claims autentica com uma consulta, so do token_version pela chave primaria"""
+        user = User(id=7, username="claims_user", token_version=3, is_active=True, is_admin=True)
+        token = create_user_token(user)
+        db = self.version_db(3)
+        
+        current_user = await get_current_user(token, db)
+        
+        assert current_user.id == 7
+        assert current_user.username == "claims_user"
+        assert (await get_current_admin_user(current_user)).is_admin
+        
+        db.scalar.assert_awaited_once()
+        statement = str(db.scalar.await_args.args[0])
+        assert "users.token_version" in statement and "users.id" in statement
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_inactive_claim_is_rejected(self):
+        """Claim de usuario inativo e rejeitada"""
+        user = User(id=7, username="claims_user", token_version=0, is_active=False, is_admin=False)
+        token = create_user_token(user)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(token, self.version_db(0))
+            
+        assert exc_info.value.status_code == 400
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_user_update_invalidates_claims(self, db, async_db):
+        """Desativar o usuario invalida as claims dos tokens ja emitidos"""
+        user = User(
+            username="changed_user",
+            email="changed@test.com",
+            hashed_password="hash",
+            is_active=True
+        )
+        db.add(user)
+        db.commit()
+        token = create_user_token(user)
+        assert (await get_current_user(token, async_db)).is_active
+        
+        user.is_active = False
+        db.commit()
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(token, async_db)
+            
+        assert exc_info.value.status_code == 400
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_demotion_seen_by_other_sessions(self, db, async_db):
+        """Rebaixar o admin vale para tokens ja emitidos, sem depender de cache do processo"""
+        user = User(
+            username="demoted_user",
+            email="demoted@test.com",
+            hashed_password="hash",
+            is_active=True,
+            is_admin=True
+        )
+        db.add(user)
+        db.commit()
+        token = create_user_token(user)
+        assert (await get_current_user(token, async_db)).is_admin
+        
+        user.is_admin = False
+        db.commit()
+        assert user.token_version == 1
+        
+        current_user = await get_current_user(token, async_db)
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_admin_user(current_user)
             
-        assert exc_info.value.status_code == 400
\ No newline at end of file
+        assert exc_info.value.status_code == 403
+        
+    @pytest.mark.unit
+    def test_unrelated_update_keeps_version(self, db):
+        """Alterar o email nao invalida os tokens"""
+        user = User(username="email_user", email="old@test.com", hashed_password="hash")
+        db.add(user)
+        db.commit()
+        
+        user.email = "new@test.com"
+        db.commit()
+        
+        assert user.token_version == 0
+
+
+class TestPasswordHashingPool:
+    """Testes do bcrypt fora do event loop"""
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_async_hash_and_verify(self):
+        """Hash e verificacao pelo pool funcionam como as versoes sincronas"""
+        hashed = await get_password_hash_async("password123")
+        
+        assert await verify_password_async("password123", hashed) == True
+        assert await verify_password_async("wrongpassword", hashed) == False
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pool_rejects_when_queue_is_full(self):
+        """Com workers e fila ocupados o pool rejeita em vez de enfileirar"""
+        pool = BoundedThreadPool(max_workers=1, max_queue=1, name="test")
+        release = threading.Event()
+        
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        
+        with pytest.raises(PoolOverloaded):
+            await pool.run(release.wait)
+        
+        release.set()
+        await asyncio.gather(*running)
+        
+        metrics = pool.metrics()
+        assert metrics["rejected"] == 1
+        assert metrics["completed"] == 2
+        assert metrics["in_flight"] == 0
+        assert metrics["latency_ms"]["max"] > 0
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_job_in_flight(self):
+        """Cancelar quem aguardava nao libera a vaga enquanto o job roda na thread"""
+        pool = BoundedThreadPool(max_workers=1, max_queue=0, name="test")
+        release = threading.Event()
+        
+        caller = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.01)
+        
+        assert pool.metrics()["in_flight"] == 1
+        with pytest.raises(PoolOverloaded):
+            await pool.run(release.wait)
+        
+        release.set()
+        for _ in range(100):
+            if pool.metrics()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.metrics()["in_flight"] == 0
+        assert pool.metrics()["completed"] == 1
+        assert await pool.run(lambda: "ok") == "ok"
@@ -0,0 +1,44 @@
+"""
+Testes unitarios da leitura de arquivos de importacao em lote
+"""
+import pytest
+from app.utils.bulk_import import parse_bulk_rows, UnsupportedBulkFormat
+
+
+class TestParseBulkRows:
+    """Testes do parser NDJSON/CSV"""
+    
+    @pytest.mark.unit
+    def test_ndjson(self):
+        """NDJSON ignora linhas vazias e reporta JSON invalido pela linha"""
+        body = b'{"document": "11144477735", "name": "A"}\n\nnao json\n[1, 2]\n'
+        
+        rows, errors = parse_bulk_rows(body, "application/x-ndjson; charset=utf-8")
+        
+        assert rows == [(1, {"document": "11144477735", "name": "A"})]
+        assert errors == [(3, "JSON inválido"), (4, "Linha deve ser um objeto JSON")]
+        
+    @pytest.mark.unit
+    def test_csv_with_bom(self):
+        """CSV com BOM usa o cabecalho e numera as linhas do arquivo"""
+        body = "﻿document,name\n11144477735,João\n12345678909,Maria\n".encode("utf-8")
+        
+        rows, errors = parse_bulk_rows(body, "text/csv")
+        
+        assert rows == [
+            (2, {"document": "11144477735", "name": "João"}),
+            (3, {"document": "12345678909", "name": "Maria"})
+        ]
+        assert errors == []
+        
+    @pytest.mark.unit
+    def test_unsupported_content_type(self):
+        """Formatos diferentes de NDJSON/CSV sao rejeitados"""
+        with pytest.raises(UnsupportedBulkFormat):
+            parse_bulk_rows(b"{}", "application/json")
+            
+    @pytest.mark.unit
+    def test_invalid_encoding(self):
+        """Arquivo fora de UTF-8 e rejeitado"""
+        with pytest.raises(ValueError):
+            parse_bulk_rows("document,name\n1,Jo\xe3o\n".encode("latin-1"), "text/csv")
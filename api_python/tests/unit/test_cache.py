@@ -0,0 +1,142 @@
+"""
+Testes unitarios do cache TTL
+"""
+import asyncio
+import pytest
+from app.utils.cache import TTLCache
+
+
+class FakeTimer:
+    """Relogio controlado pelo teste"""
+    
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Testes do cache com TTL, LRU e coalescencia"""
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_counters(self):
+        """Primeira chamada e miss, a segunda e hit"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            return "valor"
+        
+        assert await cache.get_or_load("k", loader) == "valor"
+        assert await cache.get_or_load("k", loader) == "valor"
+        
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ttl_expiration(self):
+        """Entradas vencidas sao recarregadas"""
+        timer = FakeTimer()
+        cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+        
+        async def loader():
+            return timer.now
+        
+        assert await cache.get_or_load("k", loader) == 0.0
+        timer.now = 4.9
+        assert await cache.get_or_load("k", loader) == 0.0
+        timer.now = 5.0
+        assert await cache.get_or_load("k", loader) == 5.0
+        
+    @pytest.mark.unit
+    def test_maxsize_evicts_least_recently_used(self):
+        """Acima do limite sai a entrada usada ha mais tempo"""
+        cache = TTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        """Misses concorrentes da mesma chave executam o loader uma vez"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "valor"
+        
+        results = await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(20)])
+        
+        assert results == ["valor"] * 20
+        assert len(calls) == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["coalesced"] == 19
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_clear_forces_reload(self):
+        """Depois do clear a chave e carregada de novo"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        values = iter([1, 2])
+        
+        async def loader():
+            return next(values)
+        
+        assert await cache.get_or_load("k", loader) == 1
+        cache.clear()
+        assert await cache.get_or_load("k", loader) == 2
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_loader_error_propagates_to_waiters(self):
+        """Erro do loader chega a todos que aguardavam e nada e gravado"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("falhou")
+        
+        results = await asyncio.gather(
+            cache.get_or_load("k", loader),
+            cache.get_or_load("k", loader),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.get("k") is None
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancelled_load_is_retried_by_waiters(self):
+        """Cancelar quem carregava nao cancela os que aguardavam: um deles carrega de novo"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+        
+        leader = asyncio.ensure_future(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.get_or_load("k", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        assert await asyncio.gather(*waiters) == [2, 2, 2]
+        assert leader.cancelled()
+        assert len(calls) == 2
+        assert cache.get("k") == 2
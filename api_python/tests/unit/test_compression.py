@@ -0,0 +1,124 @@
+"""
+Testes unitarios do middleware de compressao
+"""
+import gzip
+import zlib
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import CompressionMiddleware, select_encoding
+
+BIG_TEXT = "fazenda " * 1000
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, gzip_level=5)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG_TEXT)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(["linha 1\n", "linha 2\n", "linha 3\n"]), media_type="text/plain")
+
+    return TestClient(app)
+
+
+async def run_streaming(encoding: str, chunks):
+    """Chama o middleware direto e retorna as mensagens enviadas"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", encoding.encode())]}
+    await CompressionMiddleware(app, minimum_size=10_000)(scope, None, send)
+    return sent
+
+
+class TestSelectEncoding:
+    """Testes da negociacao pelo Accept-Encoding"""
+    
+    @pytest.mark.unit
+    def test_prefers_brotli_when_available(self):
+        pytest.importorskip("brotli")
+        assert select_encoding("gzip, deflate, br") == "br"
+        
+    @pytest.mark.unit
+    def test_gzip_without_brotli(self):
+        assert select_encoding("gzip, br", brotli_available=False) == "gzip"
+        
+    @pytest.mark.unit
+    def test_quality_zero_and_unknown(self):
+        assert select_encoding("gzip;q=0") is None
+        assert select_encoding("identity") is None
+        assert select_encoding("") is None
+
+
+class TestCompressionMiddleware:
+    """Testes do middleware"""
+    
+    @pytest.mark.unit
+    def test_gzip_large_response(self):
+        """Resposta acima do limite e comprimida com gzip"""
+        response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(BIG_TEXT)
+        assert response.text == BIG_TEXT
+        
+    @pytest.mark.unit
+    def test_small_response_not_compressed(self):
+        """Resposta abaixo do limite sai sem compressao"""
+        response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+        
+        assert "content-encoding" not in response.headers
+        assert response.text == "ok"
+        
+    @pytest.mark.unit
+    def test_brotli(self):
+        """Brotli e usado quando aceito e instalado"""
+        brotli = pytest.importorskip("brotli")
+        client = make_client()
+        with client.stream("GET", "/big", headers={"Accept-Encoding": "br"}) as response:
+            raw = b"".join(response.iter_raw())
+        
+        assert response.headers["content-encoding"] == "br"
+        assert brotli.decompress(raw).decode() == BIG_TEXT
+        
+    @pytest.mark.unit
+    def test_streaming_response(self):
+        """Streaming e comprimido sem Content-Length"""
+        response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == "linha 1\nlinha 2\nlinha 3\n"
+        
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_streaming_chunks_flushed_individually(self):
+        """Cada bloco sai comprimido assim que chega, mesmo abaixo do limite"""
+        chunks = [b"id,name\n", b"1,a\n", b"2,b\n"]
+        
+        sent = await run_streaming("gzip", chunks)
+        
+        bodies = [m for m in sent if m["type"] == "http.response.body"]
+        assert len(bodies) == 3
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert [decompressor.decompress(m["body"]) for m in bodies] == chunks
+        assert gzip.decompress(b"".join(m["body"] for m in bodies)) == b"".join(chunks)
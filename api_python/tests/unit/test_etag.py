@@ -0,0 +1,73 @@
+"""
+Testes unitarios dos helpers de ETag
+"""
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.utils.etag import make_etag, etag_matches, not_modified, set_etag
+
+
+def make_client(etag: str) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/item")
+    def item(request: Request, response: Response):
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        set_etag(response, etag)
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestMakeEtag:
+
+    def test_weak_and_deterministic(self):
+        etag = make_etag("summary", 3)
+        assert etag.startswith('W/"') and etag.endswith('"')
+        assert etag == make_etag("summary", 3)
+
+    def test_changes_with_parts(self):
+        assert make_etag("summary", 3) != make_etag("summary", 4)
+        assert make_etag("summary", 3) != make_etag("by_state", 3)
+
+
+class TestEtagMatches:
+
+    def test_missing_header(self):
+        assert not etag_matches(None, make_etag(1))
+        assert not etag_matches("", make_etag(1))
+
+    def test_weak_comparison(self):
+        etag = make_etag(1)
+        assert etag_matches(etag, etag)
+        assert etag_matches(etag.removeprefix("W/"), etag)
+
+    def test_list_and_wildcard(self):
+        etag = make_etag(1)
+        assert etag_matches(f'{make_etag(2)}, {etag}', etag)
+        assert not etag_matches(f'{make_etag(2)}, {make_etag(3)}', etag)
+        assert etag_matches("*", etag)
+
+
+class TestConditionalResponse:
+
+    def test_sets_etag(self):
+        etag = make_etag("item", 1)
+        response = make_client(etag).get("/item")
+        assert response.status_code == 200
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_not_modified_without_body(self):
+        etag = make_etag("item", 1)
+        response = make_client(etag).get("/item", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_stale_etag_returns_body(self):
+        response = make_client(make_etag("item", 2)).get("/item", headers={"If-None-Match": make_etag("item", 1)})
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
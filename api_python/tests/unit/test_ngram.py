@@ -0,0 +1,50 @@
+"""
+Testes unitarios do indice de trigramas (fallback da busca)
+"""
+import pytest
+
+from app.utils.ngram import NgramIndex, normalize_text, trigrams
+
+
+class TestTrigrams:
+
+    @pytest.mark.unit
+    def test_normalize(self):
+        assert normalize_text("João CONCEIÇÃO") == "joao conceicao"
+
+    @pytest.mark.unit
+    def test_pg_trgm_padding(self):
+        """Mesmo preenchimento do pg_trgm: dois espacos antes e um depois de cada palavra"""
+        assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+        assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+        assert trigrams("!!!") == set()
+
+
+class TestNgramIndex:
+
+    @pytest.fixture
+    def index(self):
+        return NgramIndex([
+            (1, "Maria Oliveira Costa"),
+            (2, "João Silva Santos"),
+            (3, "Fazenda Oliveiras"),
+            (4, "Olaria Ribeirão"),
+        ])
+
+    @pytest.mark.unit
+    def test_partial_word(self, index):
+        results = index.search("Oliveira", 10, 0.6)
+        assert [key for key, _ in results][:2] == [1, 3]
+        assert results[0][1] == 1.0
+
+    @pytest.mark.unit
+    def test_accents_and_case(self, index):
+        assert index.search("JOAO", 10, 0.6)[0][0] == 2
+        assert index.search("ribeirao", 10, 0.6)[0][0] == 4
+
+    @pytest.mark.unit
+    def test_threshold_and_limit(self, index):
+        assert index.search("xyzw", 10, 0.6) == []
+        assert len(index.search("oliv", 1, 0.6)) == 1
+        # Score exige a maioria dos trigramas da busca
+        assert all(score >= 0.6 for _, score in index.search("oliv", 10, 0.6))
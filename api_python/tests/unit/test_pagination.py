@@ -0,0 +1,55 @@
+"""
+Testes unitarios da paginacao por cursor
+"""
+import pytest
+from fastapi import HTTPException
+from app.utils.pagination import encode_cursor, decode_cursor, PageParams
+
+
+class TestCursor:
+    """Testes do cursor opaco"""
+    
+    @pytest.mark.unit
+    def test_cursor_roundtrip(self):
+        """Cursor codificado volta com os mesmos valores"""
+        cursor = encode_cursor({"id": 42})
+        
+        assert "42" not in cursor
+        assert decode_cursor(cursor) == {"id": 42}
+        
+    @pytest.mark.unit
+    def test_invalid_cursor(self):
+        """Cursor corrompido ou sem id e rejeitado"""
+        with pytest.raises(ValueError):
+            decode_cursor("nao-e-um-cursor")
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor({"name": "x"}))
+            
+    @pytest.mark.unit
+    @pytest.mark.parametrize("values", [
+        {"id": True},
+        {"id": 1, "sort": ["name"], "value": "x"},
+        {"id": 1, "sort": "name"},
+        {"id": 1, "sort": "name", "value": None},
+        {"id": 1, "sort": "-total_area", "value": [1, 2]},
+        {"id": 1, "sort": "total_area", "value": {"a": 1}},
+        {"id": 1, "sort": "total_area", "value": False},
+    ])
+    def test_invalid_cursor_values(self, values):
+        """Cursor ordenado sem valor, ou com valor que nao e texto/numero, e rejeitado"""
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(values))
+            
+    @pytest.mark.unit
+    def test_sorted_cursor(self):
+        """Cursor ordenado leva a ordenacao e o valor da coluna"""
+        values = {"id": 7, "sort": "-total_area", "value": 12.5}
+        assert decode_cursor(encode_cursor(values)) == values
+            
+    @pytest.mark.unit
+    def test_page_params_invalid_cursor_is_400(self):
+        """Parametro de cursor invalido vira erro 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            PageParams(cursor="%%%", limit=10)
+            
+        assert exc_info.value.status_code == 400
@@ -1,8 +1,25 @@
 """
 Testes unitarios dos validadores
 """
+import random
 import pytest
-from app.utils.validators import validate_cpf, validate_cnpj, validate_document, format_document
+from app.utils.validators import (
+    normalize_document, validate_cpf, validate_cnpj, validate_document, validate_document_digits,
+    validate_documents, format_document
+)
+
+
+def with_check_digits(base: str, weights_list) -> str:
+    """Completa o documento com os digitos verificadores (para gerar casos validos)"""
+    digits = [int(d) for d in base]
+    for weights in weights_list:
+        resto = sum(d * w for d, w in zip(digits, weights)) % 11
+        digits.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digits))
+
+
+CPF_WEIGHTS = [range(10, 1, -1), range(11, 1, -1)]
+CNPJ_WEIGHTS = [[5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]]
 
 class TestCPFValidator:
     """Testes de validacao de CPF"""
@@ -107,6 +124,65 @@ class TestDocumentValidator:
         assert validate_document("123456789") == False    # nem CPF nem CNPJ
         assert validate_document("123456789012345") == False # muito grande
 
+class TestDocumentNormalization:
+    """Testes da normalizacao gravada em document_digits"""
+    
+    @pytest.mark.unit
+    def test_normalize_strips_formatting(self):
+        """Remove pontuacao e espacos"""
+        assert normalize_document("111.444.777-35") == "11144477735"
+        assert normalize_document("11.222.333/0001-81") == "11222333000181"
+        assert normalize_document(" 11144477735 ") == "11144477735"
+        assert normalize_document("11144477735") == "11144477735"
+        
+    @pytest.mark.unit
+    def test_normalize_unicode_digits_to_ascii(self):
+        """Digitos unicode viram ASCII (mesmo documento, mesma chave)"""
+        assert normalize_document("١١١٤٤٤٧٧٧٣٥") == "11144477735"
+        
+    @pytest.mark.unit
+    def test_validate_document_digits(self):
+        """Valida digitos ja normalizados com o mesmo resultado de validate_document"""
+        for document in ["111.444.777-35", "11.222.333/0001-81", "12345678901", "123", "", "١١١٤٤٤٧٧٧٣٥"]:
+            assert validate_document_digits(normalize_document(document)) == validate_document(document)
+
+class TestBatchDocumentValidator:
+    """Testes da validacao vetorizada em lote"""
+    
+    @pytest.mark.unit
+    def test_matches_scalar_on_known_documents(self):
+        """Mesmo resultado do validador escalar nos casos conhecidos"""
+        documents = [
+            "11144477735", "111.444.777-35", "12345678901", "11111111111",
+            "11222333000181", "11.222.333/0001-81", "11222333000182", "00000000000000",
+            "123", "", "abc", "123456789012345", " 98765432100 ", "١١١٤٤٤٧٧٧٣٥"
+        ]
+        
+        mask = validate_documents(documents)
+        
+        assert mask.tolist() == [validate_document(d) for d in documents]
+        
+    @pytest.mark.unit
+    def test_matches_scalar_on_random_documents(self):
+        """Mesmo resultado do validador escalar em documentos aleatorios validos e invalidos"""
+        rng = random.Random(42)
+        documents = []
+        for _ in range(2000):
+            cpf = with_check_digits("".join(rng.choice("0123456789") for _ in range(9)), CPF_WEIGHTS)
+            cnpj = with_check_digits("".join(rng.choice("0123456789") for _ in range(12)), CNPJ_WEIGHTS)
+            noise = "".join(rng.choice("0123456789") for _ in range(rng.choice([10, 11, 13, 14])))
+            documents.extend([cpf, cnpj, noise])
+        
+        mask = validate_documents(documents)
+        
+        assert mask.tolist() == [validate_document(d) for d in documents]
+        assert mask.sum() >= 4000
+        
+    @pytest.mark.unit
+    def test_empty_batch(self):
+        """Lote vazio retorna mascara vazia"""
+        assert validate_documents([]).tolist() == []
+
 class TestDocumentFormatter:
     """Testes do formatador de documentos"""
     